@@ -4,20 +4,128 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import Counter
 import re
+import time
+import hashlib
+import functools
 import numpy as np
 from datetime import datetime, timedelta
 import warnings
 
 warnings.filterwarnings('ignore')
 
+# 자리 간 시차 상관관계를 계산할 최대 시차 (회차)
+DEFAULT_MAX_LAG = 30
+
+# 유사 번호 검색: 반환할 최근접 회차 수, 한 번에 비교할 (질의 × 회차) 쌍 수
+DEFAULT_TOP_K = 5
+SIMILARITY_CHUNK_PAIRS = 1 << 16
+
+# 1등 번호 압축 부호: 6자리 숫자를 4비트씩(1자리가 상위), 조를 그 위 4비트에 배치
+DIGIT_NIBBLE_SHIFTS = np.arange(20, -1, -4, dtype=np.uint32)
+JO_NIBBLE_SHIFT = np.uint32(24)
+DIGIT_NIBBLE_MASK = np.uint32(0x111111)
+
 # 한글 폰트 설정 (matplotlib)
 plt.rcParams['font.family'] = 'DejaVu Sans'
 plt.rcParams['axes.unicode_minus'] = False
 
 
+def memoized(method):
+    """데이터 내용 해시별로 분석 결과를 한 번만 계산하는 데코레이터"""
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        key = (self.data_hash, method.__name__, args)
+        if key in self.result_cache:
+            self.cache_hits += 1
+        else:
+            self.result_cache[key] = method(self, *args)
+        return self.result_cache[key]
+
+    return wrapper
+
+
+def lagged_correlations(series, max_lag=DEFAULT_MAX_LAG):
+    """회차×자리(N×P) 행렬에서 시차 0~max_lag의 자리 간 교차 상관계수 배열 ((L+1)×P×P)
+
+    result[k, p, q]는 t회차의 p자리와 t+k회차의 q자리의 상관계수이다.
+    자리별로 평균을 뺀 열의 FFT를 한 번씩 구하고, 켤레 곱의 역변환으로 모든 시차의 곱합을
+    O(N log N)에 얻는다 (시차마다 곱합을 계산하는 O(N·L) 대신). 시차 k의 곱합은 겹치는
+    N-k개 회차로 나누어 평균을 내며, 시차 0은 pandas corr()와 같은 피어슨 상관계수이다.
+    """
+    values = np.asarray(series, dtype=np.float64)
+    num_rounds, num_positions = values.shape
+    max_lag = max(min(max_lag, num_rounds - 1), 0)
+
+    centered = values - values.mean(axis=0)
+    std = centered.std(axis=0)
+
+    # 순환 상관이 섞이지 않도록 N + max_lag 이상의 2의 거듭제곱 길이로 0을 채운다
+    size = 1 << int(num_rounds + max_lag).bit_length()
+    spectra = np.fft.rfft(centered, n=size, axis=0)
+
+    # p <= q인 쌍만 역변환: 앞쪽은 p -> q의 시차 0~L, 뒤쪽(음의 시차)은 q -> p의 시차 1~L
+    products = np.empty((max_lag + 1, num_positions, num_positions))
+    backward = (-np.arange(max_lag + 1)) % size
+    for p in range(num_positions):
+        sums = np.fft.irfft(np.conj(spectra[:, p, None]) * spectra[:, p:], n=size, axis=0)
+        products[:, p, p:] = sums[:max_lag + 1]
+        products[:, p:, p] = sums[backward]
+
+    overlaps = (num_rounds - np.arange(max_lag + 1))[:, None, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return products / overlaps / (std[:, None] * std[None, :])
+
+
+def pack_draws(rows):
+    """조 + 6자리 숫자 행렬(N×7)을 회차당 uint32 부호 하나로 압축 (자리마다 4비트)"""
+    rows = np.asarray(rows, dtype=np.uint32).reshape(-1, 7)
+    return (rows[:, 0] << JO_NIBBLE_SHIFT) | np.bitwise_or.reduce(rows[:, 1:] << DIGIT_NIBBLE_SHIFTS, axis=1)
+
+
+def nearest_draws(draw_codes, query_codes, k=DEFAULT_TOP_K, chunk_pairs=SIMILARITY_CHUNK_PAIRS):
+    """질의별로 같은 자리 숫자가 가장 많이 일치하는 회차 k개 (회차 인덱스, 일치 자리 수, 조 일치 여부)
+
+    두 부호를 XOR하면 일치하는 자리의 4비트가 0이 되므로, 자리별 "0이 아님" 비트를 모아
+    곱셈 한 번으로 더해 불일치 자리 수를 구한다. 질의 × 회차 비교는 chunk_pairs 쌍씩 나누어
+    브로드캐스팅하며, 일치 자리 수 -> 조 일치 -> 최근 회차 순으로 순위를 매긴다.
+    """
+    draw_codes = np.asarray(draw_codes, dtype=np.uint32)
+    query_codes = np.asarray(query_codes, dtype=np.uint32)
+    num_draws = len(draw_codes)
+    k = min(k, num_draws)
+
+    indices = np.zeros((len(query_codes), k), dtype=np.int64)
+    matches = np.zeros((len(query_codes), k), dtype=np.int64)
+    jo_matches = np.zeros((len(query_codes), k), dtype=bool)
+    if k == 0:
+        return indices, matches, jo_matches
+
+    # 순위 점수 (일치 자리 수 * 2 + 조 일치) * N + 회차 인덱스가 int32에 들어가면 int32로 계산
+    score_dtype = np.int32 if 13 * num_draws < np.iinfo(np.int32).max else np.int64
+    recency = np.arange(num_draws, dtype=score_dtype)
+    step = max(chunk_pairs // num_draws, 1)
+    for start in range(0, len(query_codes), step):
+        diff = query_codes[start:start + step, None] ^ draw_codes[None, :]
+        nonzero = (diff | (diff >> np.uint32(1)) | (diff >> np.uint32(2)) | (diff >> np.uint32(3))) & DIGIT_NIBBLE_MASK
+        digit_matches = 6 - ((nonzero * DIGIT_NIBBLE_MASK) >> np.uint32(20) & np.uint32(0xF)).astype(score_dtype)
+        jo_match = (diff >> JO_NIBBLE_SHIFT) == 0
+
+        score = (digit_matches * 2 + jo_match) * score_dtype(num_draws) + recency
+        top = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(score, top, axis=1), axis=1), axis=1)
+
+        indices[start:start + step] = top
+        matches[start:start + step] = np.take_along_axis(digit_matches, top, axis=1)
+        jo_matches[start:start + step] = np.take_along_axis(jo_match, top, axis=1)
+
+    return indices, matches, jo_matches
+
+
 class LotteryAnalyzer:
     def __init__(self, db_name="lottery_data.db"):
         self.db_name = db_name
+        self.result_cache = {}
+        self.cache_hits = 0
         self.load_data()
 
     def load_data(self):
@@ -31,6 +139,116 @@ class LotteryAnalyzer:
             print(f"데이터 로드 실패: {e}")
             self.df = pd.DataFrame()
 
+        self.parse_number_columns()
+        self.build_window_counts()
+
+    def parse_number_columns(self):
+        """1등/보너스 번호 문자열을 한 번만 해석하여 정수 행렬로 저장
+
+        first_matrix, bonus_matrix는 회차×자리 정수 행렬(빈 자리는 -1)이고,
+        first_lengths, bonus_lengths는 회차별로 추출된 숫자 개수이다.
+        data_hash는 두 열의 내용 해시로, 분석 결과 캐시의 키로 사용한다.
+        """
+        self.first_matrix, self.first_lengths = self.decode_number_column('first_prize_numbers', 7)
+        self.bonus_matrix, self.bonus_lengths = self.decode_number_column('bonus_numbers', 6)
+
+        digest = hashlib.sha256()
+        for column in ('round_number', 'first_prize_numbers', 'bonus_numbers'):
+            if column in self.df:
+                digest.update(self.df[column].astype(str).str.cat(sep='\n').encode('utf-8'))
+            digest.update(b'\0')
+        self.data_hash = digest.hexdigest()
+
+        self.build_number_index()
+
+    def build_number_index(self):
+        """1등 번호(조 + 6자리)를 정수(조 * 10^6 + 번호)로 부호화하여 정렬한 색인 생성
+
+        number_codes는 정렬된 부호, number_rounds는 같은 순서의 회차 번호이며
+        번호별 출현 이력은 searchsorted로 전체 탐색 없이 조회한다.
+        """
+        valid = self.first_lengths == 7
+        rows = self.first_matrix[valid, :7]
+        codes = rows[:, 0] * 10 ** 6 + rows[:, 1:] @ (10 ** np.arange(5, -1, -1))
+        rounds = self.df['round_number'].to_numpy(dtype=np.int64)[valid] if valid.any() else np.zeros(0, np.int64)
+
+        order = np.lexsort((rounds, codes))
+        self.number_codes, self.number_rounds = codes[order], rounds[order]
+
+        # 유사 번호 검색용 회차 순서의 압축 부호
+        self.draw_codes, self.draw_rounds = pack_draws(rows), rounds
+
+    def find_number_history(self, jo, number):
+        """1등 번호의 출현 횟수와 출현 회차 목록 (첫/마지막 출현 회차 포함)"""
+        code = int(jo) * 10 ** 6 + int(number)
+        start, end = np.searchsorted(self.number_codes, [code, code + 1])
+        rounds = self.number_rounds[start:end].tolist()
+        return {
+            'count': len(rounds),
+            'first_round': rounds[0] if rounds else None,
+            'last_round': rounds[-1] if rounds else None,
+            'rounds': rounds
+        }
+
+    def decode_number_column(self, column, min_width=0):
+        """번호 문자열 열을 (회차×자리 정수 행렬, 회차별 숫자 개수)로 변환 (최소 min_width자리)"""
+        parsed = [self.extract_individual_numbers(numbers) or [] for numbers in self.df[column]] \
+            if column in self.df else []
+
+        lengths = np.array([len(numbers) for numbers in parsed], dtype=np.int64)
+        matrix = np.full((len(parsed), max(int(lengths.max(initial=0)), min_width)), -1, dtype=np.int64)
+        for i, numbers in enumerate(parsed):
+            matrix[i, :len(numbers)] = numbers
+
+        return matrix, lengths
+
+    @staticmethod
+    def valid_numbers(matrix, lengths, rows=slice(None)):
+        """선택한 회차들의 추출된 숫자를 회차 순서대로 펼친 리스트"""
+        matrix, lengths = matrix[rows], lengths[rows]
+        return matrix[np.arange(matrix.shape[1]) < lengths[:, None]].tolist()
+
+    def build_window_counts(self):
+        """회차별 숫자 빈도 누적 카운트 생성
+
+        first_cumsum[t], bonus_cumsum[t]는 앞에서부터 t개 회차의 숫자(0~9) 출현 횟수이며,
+        임의 구간 [start, end)의 빈도는 두 누적값의 차이로 바로 계산한다.
+        """
+        self.first_cumsum = np.zeros((len(self.df) + 1, 10), dtype=np.int64)
+        self.bonus_cumsum = np.zeros((len(self.df) + 1, 10), dtype=np.int64)
+
+        # 빈 자리(-1)는 어떤 숫자와도 일치하지 않으므로 행렬 전체를 바로 비교
+        for matrix, cumsum in ((self.first_matrix, self.first_cumsum), (self.bonus_matrix, self.bonus_cumsum)):
+            cumsum[1:] = (matrix[:, :, None] == np.arange(10)).sum(axis=1)
+            np.cumsum(cumsum, axis=0, out=cumsum)
+
+    def recent_window_bounds(self, window=20, offset=0):
+        """최근 offset회차를 건너뛴 직전 window개 회차의 [start, end) 인덱스 (데이터 범위로 제한)"""
+        end = max(len(self.df) - offset, 0)
+        return max(end - window, 0), end
+
+    def window_number_counts(self, start, end):
+        """구간 [start, end)의 1등/보너스 숫자 빈도 (각 길이 10 배열)"""
+        return self.first_cumsum[end] - self.first_cumsum[start], self.bonus_cumsum[end] - self.bonus_cumsum[start]
+
+    def window_label(self, start, end, offset=0):
+        """구간 [start, end)의 표시 문자열 (실제 회차 수와 회차 범위, 건너뛴 최근 회차 수)"""
+        if end <= start:
+            return "0회차"
+        rounds = self.df['round_number']
+        label = f"{end - start}회차 ({rounds.iloc[start]}회 ~ {rounds.iloc[end - 1]}회"
+        return f"{label}, 최근 {offset}회차 제외)" if offset else f"최근 {label})"
+
+    @staticmethod
+    def top_numbers(counts, numbers, n=5):
+        """빈도 내림차순 상위 n개 숫자 (numbers: 구간의 숫자를 회차 순서대로 펼친 목록)
+
+        같은 빈도는 구간에서 먼저 나온 숫자 우선 (Counter.most_common과 같은 순서)
+        """
+        values, first_seen = np.unique(np.asarray(numbers, dtype=np.int64), return_index=True)
+        order = np.lexsort((first_seen, -counts[values]))
+        return values[order][:n].tolist()
+
     def extract_individual_numbers(self, number_string):
         """번호 문자열에서 개별 숫자 추출"""
         if pd.isna(number_string) or not number_string:
@@ -163,27 +381,18 @@ class LotteryAnalyzer:
 
         return numbers
 
+    @memoized
+    def number_frequency(self):
+        """1등/보너스 번호 출현 빈도 (Counter 쌍)"""
+        first_counter = Counter(self.valid_numbers(self.first_matrix, self.first_lengths))
+        bonus_counter = Counter(self.valid_numbers(self.bonus_matrix, self.bonus_lengths))
+        return first_counter, bonus_counter
+
     def analyze_number_frequency(self):
         """번호 출현 빈도 분석"""
         print("\n=== 번호 출현 빈도 분석 ===")
 
-        # 1등 번호 분석
-        first_numbers = []
-        for numbers in self.df['first_prize_numbers']:
-            extracted = self.extract_individual_numbers(numbers)
-            if extracted:  # 빈 리스트가 아닌 경우만
-                first_numbers.extend(extracted)
-
-        first_counter = Counter(first_numbers)
-
-        # 보너스 번호 분석
-        bonus_numbers = []
-        for numbers in self.df['bonus_numbers']:
-            extracted = self.extract_individual_numbers(numbers)
-            if extracted:  # 빈 리스트가 아닌 경우만
-                bonus_numbers.extend(extracted)
-
-        bonus_counter = Counter(bonus_numbers)
+        first_counter, bonus_counter = self.number_frequency()
 
         print("1등 당첨번호 빈도 (상위 10개):")
         if first_counter:
@@ -201,17 +410,18 @@ class LotteryAnalyzer:
 
         return first_counter, bonus_counter
 
+    @memoized
+    def position_frequency(self):
+        """1등 번호(7자리)/보너스 번호(6자리)의 자리별 숫자 리스트"""
+        first_positions = [self.first_matrix[self.first_lengths >= 7, i].tolist() for i in range(7)]
+        bonus_positions = [self.bonus_matrix[self.bonus_lengths >= 6, i].tolist() for i in range(6)]
+        return first_positions, bonus_positions
+
     def analyze_position_frequency(self):
         """자리별 숫자 출현 빈도 분석"""
         print("\n=== 자리별 숫자 출현 빈도 분석 ===")
 
-        # 1등 번호 자리별 분석 (7자리)
-        first_positions = [[] for _ in range(7)]
-        for numbers_str in self.df['first_prize_numbers']:
-            numbers = self.extract_individual_numbers(numbers_str)
-            if len(numbers) >= 7:
-                for i, num in enumerate(numbers[:7]):
-                    first_positions[i].append(num)
+        first_positions, bonus_positions = self.position_frequency()
 
         print("1등 번호 자리별 분석:")
         for i, position_nums in enumerate(first_positions):
@@ -222,14 +432,6 @@ class LotteryAnalyzer:
                     print(f"    숫자 {num}: {count}회 ({count / len(position_nums) * 100:.1f}%)")
                 print()
 
-        # 보너스 번호 자리별 분석 (6자리)
-        bonus_positions = [[] for _ in range(6)]
-        for numbers_str in self.df['bonus_numbers']:
-            numbers = self.extract_individual_numbers(numbers_str)
-            if len(numbers) >= 6:
-                for i, num in enumerate(numbers[:6]):
-                    bonus_positions[i].append(num)
-
         print("보너스 번호 자리별 분석:")
         for i, position_nums in enumerate(bonus_positions):
             if position_nums:
@@ -241,13 +443,18 @@ class LotteryAnalyzer:
 
         return first_positions, bonus_positions
 
+    @memoized
+    def complete_number_frequency(self):
+        """1등/보너스 완전 번호 문자열 출현 횟수 (Counter 쌍)"""
+        first_complete = Counter(self.df['first_prize_numbers'].dropna())
+        bonus_complete = Counter(self.df['bonus_numbers'].dropna())
+        return first_complete, bonus_complete
+
     def analyze_complete_number_frequency(self):
         """완전한 번호별 출현 횟수 분석"""
         print("\n=== 완전한 번호별 출현 횟수 분석 ===")
 
-        # 1등 완전 번호 빈도
-        valid_first_numbers = self.df['first_prize_numbers'].dropna()
-        first_complete = Counter(valid_first_numbers)
+        first_complete, bonus_complete = self.complete_number_frequency()
 
         print("1등 완전 번호 출현 횟수:")
         duplicates_found = False
@@ -259,10 +466,6 @@ class LotteryAnalyzer:
         if not duplicates_found:
             print("  중복 출현한 1등 번호 없음")
 
-        # 보너스 완전 번호 빈도
-        valid_bonus_numbers = self.df['bonus_numbers'].dropna()
-        bonus_complete = Counter(valid_bonus_numbers)
-
         print("\n보너스 완전 번호 출현 횟수:")
         duplicates_found = False
         for number, count in bonus_complete.most_common(20):
@@ -275,29 +478,100 @@ class LotteryAnalyzer:
 
         return first_complete, bonus_complete
 
+    def analyze_number_history(self, number_string):
+        """번호 당첨 이력 조회 ("5조162265" 형태)"""
+        print("\n=== 번호 당첨 이력 조회 ===")
+
+        numbers = self.extract_individual_numbers(number_string)
+        if not numbers or len(numbers) != 7:
+            print("번호 형식이 올바르지 않습니다. (예: 5조162265)")
+            return None
+
+        jo, number = numbers[0], int(''.join(str(num) for num in numbers[1:]))
+        history = self.find_number_history(jo, number)
+
+        if history['count']:
+            print(f"{jo}조{number:06d}: {history['count']}회 당첨 "
+                  f"(처음 {history['first_round']}회, 마지막 {history['last_round']}회)")
+            print(f"  당첨 회차: {history['rounds']}")
+        else:
+            print(f"{jo}조{number:06d}: 당첨 이력 없음")
+
+        return history
+
+    def find_similar_draws(self, queries, k=DEFAULT_TOP_K):
+        """질의 번호들("5조162265" 문자열 또는 N×7 [조, 6자리] 배열)과 가장 비슷한 과거 1등 번호 k개
+
+        반환값의 rounds, matches, jo_matches는 질의×k 배열이며 일치 자리 수 내림차순이다.
+        """
+        if isinstance(queries, str):
+            queries = [queries]
+        if len(queries) and isinstance(queries[0], str):
+            parsed = [self.extract_individual_numbers(query) or [] for query in queries]
+            if any(len(numbers) != 7 for numbers in parsed):
+                raise ValueError("번호 형식이 올바르지 않습니다. (예: 5조162265)")
+            queries = parsed
+
+        indices, matches, jo_matches = nearest_draws(self.draw_codes, pack_draws(queries), k)
+        return {
+            'rounds': self.draw_rounds[indices],
+            'codes': self.draw_codes[indices],
+            'matches': matches,
+            'jo_matches': jo_matches
+        }
+
+    def analyze_similar_draws(self, number_string, k=DEFAULT_TOP_K):
+        """번호와 같은 자리 숫자가 가장 많이 일치하는 과거 1등 번호 조회 ("5조162265" 형태)"""
+        print("\n=== 유사 당첨번호 검색 ===")
+
+        try:
+            result = self.find_similar_draws(number_string, k)
+        except ValueError as e:
+            print(e)
+            return None
+
+        print(f"{number_string}와 가장 비슷한 1등 번호 (상위 {result['rounds'].shape[1]}개):")
+        for round_number, code, matches, jo_match in zip(result['rounds'][0], result['codes'][0],
+                                                         result['matches'][0], result['jo_matches'][0]):
+            jo, number = divmod(int(code), 1 << 24)
+            digits = ''.join(str(number >> int(shift) & 0xF) for shift in DIGIT_NIBBLE_SHIFTS)
+            print(f"  {round_number}회 {jo}조{digits}: 6자리 중 {matches}자리 일치{' (조 일치)' if jo_match else ''}")
+
+        return result
+
+    def benchmark_similarity_search(self, num_queries=100000, k=DEFAULT_TOP_K, seed=0):
+        """임의 질의 num_queries개의 일괄 유사 번호 검색 처리량 (질의/초)"""
+        print("\n=== 유사 번호 일괄 검색 성능 ===")
+
+        rng = np.random.default_rng(seed)
+        queries = np.column_stack([rng.integers(1, 6, num_queries), rng.integers(0, 10, (num_queries, 6))])
+
+        started = time.perf_counter()
+        result = self.find_similar_draws(queries, k)
+        seconds = time.perf_counter() - started
+
+        print(f"질의 {num_queries:,}개 × 회차 {len(self.draw_codes):,}개, 상위 {k}개: "
+              f"{seconds * 1000:.1f}ms ({num_queries / seconds:,.0f} 질의/초)")
+        return result, num_queries / seconds
+
     def analyze_number_pattern_frequency(self):
         """특정 숫자 패턴의 출현 빈도 분석"""
         print("\n=== 숫자 패턴 출현 빈도 분석 ===")
 
         # 연속 숫자 패턴 분석
-        consecutive_patterns = []
-        same_digit_patterns = []
-        valid_count = 0
+        valid = self.first_lengths >= 2
+        matrix, lengths = self.first_matrix[valid], self.first_lengths[valid]
+        valid_count = len(matrix)
 
-        for numbers_str in self.df['first_prize_numbers']:
-            numbers = self.extract_individual_numbers(numbers_str)
-            if numbers and len(numbers) >= 2:
-                valid_count += 1
-                # 연속 숫자 개수
-                consecutive_count = 0
-                for i in range(len(numbers) - 1):
-                    if abs(numbers[i + 1] - numbers[i]) == 1:
-                        consecutive_count += 1
-                consecutive_patterns.append(consecutive_count)
-
-                # 같은 숫자 개수
-                same_count = len(numbers) - len(set(numbers))
-                same_digit_patterns.append(same_count)
+        # 연속 숫자 개수 (추출된 숫자 범위 안의 인접 쌍만)
+        pair_mask = np.arange(1, matrix.shape[1]) < lengths[:, None]
+        consecutive_patterns = ((np.abs(np.diff(matrix, axis=1)) == 1) & pair_mask).sum(axis=1).tolist()
+
+        # 같은 숫자 개수 = 숫자 개수 - 서로 다른 숫자 개수
+        digit_mask = np.arange(matrix.shape[1]) < lengths[:, None]
+        values = np.arange(int(matrix.max(initial=0)) + 1)
+        distinct = ((matrix[:, :, None] == values) & digit_mask[:, :, None]).any(axis=1).sum(axis=1)
+        same_digit_patterns = (lengths - distinct).tolist()
 
         print(f"패턴 분석 (유효한 데이터: {valid_count}개):")
 
@@ -317,43 +591,33 @@ class LotteryAnalyzer:
         else:
             print("\n중복 숫자 패턴: 분석할 데이터 없음")
 
-    def analyze_hot_cold_numbers(self):
-        """핫/콜드 번호 분석"""
+    def analyze_hot_cold_numbers(self, window=20, offset=0):
+        """핫/콜드 번호 분석
+
+        전체 기간과 최근 offset회차를 제외한 직전 window회차의 빈도를 비교한다.
+        """
         print("\n=== 핫/콜드 번호 분석 ===")
 
         # 전체 기간 분석
-        first_counter, bonus_counter = self.analyze_number_frequency()
+        first_counter, bonus_counter = self.number_frequency()
 
         if not first_counter and not bonus_counter:
             print("분석할 데이터가 없습니다.")
             return
 
-        # 최근 20회차 분석
-        recent_data = self.df.tail(20) if len(self.df) >= 20 else self.df
-        recent_first_numbers = []
-        recent_bonus_numbers = []
-
-        for numbers in recent_data['first_prize_numbers']:
-            extracted = self.extract_individual_numbers(numbers)
-            if extracted:
-                recent_first_numbers.extend(extracted)
-
-        for numbers in recent_data['bonus_numbers']:
-            extracted = self.extract_individual_numbers(numbers)
-            if extracted:
-                recent_bonus_numbers.extend(extracted)
+        # 최근 window회차 분석 (누적 카운트 차이로 구간 빈도 계산)
+        start, end = self.recent_window_bounds(window, offset)
+        recent_first_counts, recent_bonus_counts = self.window_number_counts(start, end)
 
-        recent_first_counter = Counter(recent_first_numbers)
-        recent_bonus_counter = Counter(recent_bonus_numbers)
-
-        print(f"전체 기간 vs 최근 {len(recent_data)}회차 비교:")
+        print(f"전체 기간 vs {self.window_label(start, end, offset)} 비교:")
 
         if first_counter:
             print("\n1등 번호:")
             top_5_all = [num for num, _ in first_counter.most_common(5)]
-            top_5_recent = [num for num, _ in recent_first_counter.most_common(5)]
+            top_5_recent = self.top_numbers(recent_first_counts,
+                                            self.valid_numbers(self.first_matrix, self.first_lengths, slice(start, end)))
             bottom_5_all = [num for num, _ in first_counter.most_common()[-5:]]
-            cold_recent = [i for i in range(10) if recent_first_counter.get(i, 0) == 0]
+            cold_recent = np.flatnonzero(recent_first_counts == 0).tolist()
 
             print(f"  전체 핫 번호 (상위 5개): {top_5_all}")
             print(f"  최근 핫 번호 (상위 5개): {top_5_recent}")
@@ -363,9 +627,10 @@ class LotteryAnalyzer:
         if bonus_counter:
             print("\n보너스 번호:")
             top_5_all = [num for num, _ in bonus_counter.most_common(5)]
-            top_5_recent = [num for num, _ in recent_bonus_counter.most_common(5)]
+            top_5_recent = self.top_numbers(recent_bonus_counts,
+                                            self.valid_numbers(self.bonus_matrix, self.bonus_lengths, slice(start, end)))
             bottom_5_all = [num for num, _ in bonus_counter.most_common()[-5:]]
-            cold_recent = [i for i in range(10) if recent_bonus_counter.get(i, 0) == 0]
+            cold_recent = np.flatnonzero(recent_bonus_counts == 0).tolist()
 
             print(f"  전체 핫 번호 (상위 5개): {top_5_all}")
             print(f"  최근 핫 번호 (상위 5개): {top_5_recent}")
@@ -374,7 +639,7 @@ class LotteryAnalyzer:
 
     def plot_number_frequency(self):
         """번호 빈도 시각화"""
-        first_counter, bonus_counter = self.analyze_number_frequency()
+        first_counter, bonus_counter = self.number_frequency()
 
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
 
@@ -402,7 +667,7 @@ class LotteryAnalyzer:
 
     def plot_position_frequency(self):
         """자리별 번호 빈도 시각화"""
-        first_positions, bonus_positions = self.analyze_position_frequency()
+        first_positions, bonus_positions = self.position_frequency()
 
         # 1등 번호 자리별 히트맵
         if any(first_positions):
@@ -446,9 +711,31 @@ class LotteryAnalyzer:
             plt.savefig('position_frequency.png', dpi=300, bbox_inches='tight')
             plt.show()
 
-    def plot_hot_cold_comparison(self):
+    def plot_lag_correlations(self, max_lag=DEFAULT_MAX_LAG):
+        """자리쌍 × 시차 상관계수 히트맵"""
+        correlations = self.lagged_position_correlations(max_lag)
+        if len(correlations) < 2:
+            return
+
+        num_positions = correlations.shape[1]
+        # 행: t회차 p자리 -> t+k회차 q자리 (자리쌍), 열: 시차 1~L
+        heatmap_data = correlations[1:].reshape(len(correlations) - 1, -1).T
+        pair_labels = [f'자리{p + 1}→자리{q + 1}' for p in range(num_positions) for q in range(num_positions)]
+
+        fig, ax = plt.subplots(figsize=(15, 14))
+        sns.heatmap(heatmap_data, xticklabels=list(range(1, len(correlations))), yticklabels=pair_labels,
+                    cmap='RdBu_r', center=0, ax=ax)
+        ax.set_title('자리 간 시차 상관관계')
+        ax.set_xlabel('시차 (회차)')
+        ax.set_ylabel('자리쌍')
+
+        plt.tight_layout()
+        plt.savefig('lag_correlation_heatmap.png', dpi=300, bbox_inches='tight')
+        plt.show()
+
+    def plot_hot_cold_comparison(self, window=20, offset=0):
         """핫/콜드 번호 비교 차트"""
-        first_counter, bonus_counter = self.analyze_number_frequency()
+        first_counter, bonus_counter = self.number_frequency()
 
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
 
@@ -477,31 +764,23 @@ class LotteryAnalyzer:
         ax2.set_ylabel('출현 횟수')
         ax2.set_xticks(numbers)
 
-        # 최근 20회차 분석
-        recent_data = self.df.tail(20)
-        recent_first_numbers = []
-        recent_bonus_numbers = []
-
-        for numbers in recent_data['first_prize_numbers']:
-            recent_first_numbers.extend(self.extract_individual_numbers(numbers))
-        for numbers in recent_data['bonus_numbers']:
-            recent_bonus_numbers.extend(self.extract_individual_numbers(numbers))
-
-        recent_first_counter = Counter(recent_first_numbers)
-        recent_bonus_counter = Counter(recent_bonus_numbers)
+        # 최근 window회차 분석 (누적 카운트 차이로 구간 빈도 계산)
+        start, end = self.recent_window_bounds(window, offset)
+        recent_first_counts, recent_bonus_counts = self.window_number_counts(start, end)
+        recent_label = self.window_label(start, end, offset)
 
         # 최근 1등 번호
-        recent_first_freq = [recent_first_counter.get(i, 0) for i in numbers]
+        recent_first_freq = recent_first_counts.tolist()
         ax3.bar(numbers, recent_first_freq, color='orange', alpha=0.7)
-        ax3.set_title('1등 번호 빈도 (최근 20회차)')
+        ax3.set_title(f'1등 번호 빈도 ({recent_label})')
         ax3.set_xlabel('숫자')
         ax3.set_ylabel('출현 횟수')
         ax3.set_xticks(numbers)
 
         # 최근 보너스 번호
-        recent_bonus_freq = [recent_bonus_counter.get(i, 0) for i in numbers]
+        recent_bonus_freq = recent_bonus_counts.tolist()
         ax4.bar(numbers, recent_bonus_freq, color='green', alpha=0.7)
-        ax4.set_title('보너스 번호 빈도 (최근 20회차)')
+        ax4.set_title(f'보너스 번호 빈도 ({recent_label})')
         ax4.set_xlabel('숫자')
         ax4.set_ylabel('출현 횟수')
         ax4.set_xticks(numbers)
@@ -515,32 +794,18 @@ class LotteryAnalyzer:
         print("\n=== 패턴 분석 ===")
 
         # 연속된 숫자 패턴 분석
-        consecutive_patterns = []
-
-        for numbers_str in self.df['first_prize_numbers']:
-            numbers = self.extract_individual_numbers(numbers_str)
-            if len(numbers) >= 2:
-                consecutive_count = 0
-                for i in range(len(numbers) - 1):
-                    if numbers[i + 1] == numbers[i] + 1:
-                        consecutive_count += 1
-                consecutive_patterns.append(consecutive_count)
+        valid = self.first_lengths >= 2
+        pair_mask = np.arange(1, self.first_matrix.shape[1]) < self.first_lengths[valid, None]
+        consecutive_patterns = ((np.diff(self.first_matrix[valid], axis=1) == 1) & pair_mask).sum(axis=1)
 
-        if consecutive_patterns:
+        if len(consecutive_patterns):
             avg_consecutive = np.mean(consecutive_patterns)
             print(f"평균 연속 숫자 패턴: {avg_consecutive:.2f}")
 
         # 홀짝 패턴 분석
-        odd_even_patterns = {'odd': 0, 'even': 0}
-
-        for numbers_str in self.df['first_prize_numbers']:
-            numbers = self.extract_individual_numbers(numbers_str)
-            if numbers:
-                last_digit = numbers[-1]  # 마지막 자리 숫자
-                if last_digit % 2 == 0:
-                    odd_even_patterns['even'] += 1
-                else:
-                    odd_even_patterns['odd'] += 1
+        valid = self.first_lengths > 0
+        last_digits = self.first_matrix[valid, self.first_lengths[valid] - 1]  # 마지막 자리 숫자
+        odd_even_patterns = {'odd': int((last_digits % 2 == 1).sum()), 'even': int((last_digits % 2 == 0).sum())}
 
         print(f"마지막 자리 홀수: {odd_even_patterns['odd']}회")
         print(f"마지막 자리 짝수: {odd_even_patterns['even']}회")
@@ -559,50 +824,49 @@ class LotteryAnalyzer:
             for period, count in monthly_draws.tail(12).items():
                 print(f"  {period}: {count}회")
 
-    def find_number_correlations(self):
-        """숫자 간 상관관계 분석"""
+    @memoized
+    def lagged_position_correlations(self, max_lag=DEFAULT_MAX_LAG):
+        """7자리 1등 번호(조 + 6자리)의 자리 간 시차 0~max_lag 상관계수 ((L+1)×7×7)"""
+        position_data = self.first_matrix[self.first_lengths >= 7, :7]  # 7자리 숫자인 경우
+        if len(position_data) < 2:
+            return np.zeros((0, 7, 7))
+        return lagged_correlations(position_data, max_lag)
+
+    def find_number_correlations(self, max_lag=DEFAULT_MAX_LAG, top=5):
+        """숫자 간 상관관계 분석 (같은 회차 및 1~max_lag회차 후 자리 간 상관관계)"""
         print("\n=== 숫자 상관관계 분석 ===")
 
-        # 각 자리별 숫자 추출
-        position_data = []
+        correlations = self.lagged_position_correlations(max_lag)
+        if not len(correlations):
+            return
 
-        for numbers_str in self.df['first_prize_numbers']:
-            numbers = self.extract_individual_numbers(numbers_str)
-            if len(numbers) >= 7:  # 7자리 숫자인 경우
-                position_data.append(numbers[:7])
-
-        if position_data:
-            position_df = pd.DataFrame(position_data,
-                                       columns=[f'Position_{i + 1}' for i in range(7)])
-
-            # 상관관계 계산
-            correlation_matrix = position_df.corr()
-
-            print("자리별 숫자 상관관계 (높은 상관관계 상위 5개):")
-            correlations = []
-            for i in range(len(correlation_matrix.columns)):
-                for j in range(i + 1, len(correlation_matrix.columns)):
-                    corr_value = correlation_matrix.iloc[i, j]
-                    correlations.append((
-                        correlation_matrix.columns[i],
-                        correlation_matrix.columns[j],
-                        abs(corr_value)
-                    ))
-
-            correlations.sort(key=lambda x: x[2], reverse=True)
-            for pos1, pos2, corr in correlations[:5]:
-                print(f"  {pos1} - {pos2}: {corr:.3f}")
+        labels = [f'Position_{i + 1}' for i in range(correlations.shape[1])]
+
+        # 같은 회차: 대칭 행렬의 위쪽 삼각형만 사용 (자리 순서대로 나열한 뒤 절댓값 내림차순)
+        first, second = np.triu_indices(correlations.shape[1], k=1)
+        same_round = np.abs(correlations[0, first, second])
+        print(f"자리별 숫자 상관관계 (높은 상관관계 상위 {top}개):")
+        for i in np.argsort(-same_round, kind='stable')[:top]:
+            print(f"  {labels[first[i]]} - {labels[second[i]]}: {same_round[i]:.3f}")
+
+        # 시차 상관관계: t회차 p자리 -> t+k회차 q자리 (k >= 1, 모든 자리쌍)
+        if len(correlations) > 1:
+            lagged = np.abs(correlations[1:]).ravel()
+            print(f"\n시차 상관관계 (1~{len(correlations) - 1}회차 후, 높은 상관관계 상위 {top}개):")
+            for i in np.argsort(-lagged, kind='stable')[:top]:
+                lag, p, q = np.unravel_index(i, correlations[1:].shape)
+                print(f"  {labels[p]} -> {lag + 1}회차 후 {labels[q]}: {lagged[i]:.3f}")
+
+        np.save('position_lag_correlations.npy', correlations)
+        print("\n시차 상관관계 배열(시차×자리×자리)이 position_lag_correlations.npy로 저장되었습니다.")
+        return correlations
 
     def predict_next_numbers(self):
         """다음 번호 예측 (통계적 접근)"""
         print("\n=== 다음 번호 예측 (참고용) ===")
 
         # 최근 패턴 분석
-        recent_data = self.df.tail(20)  # 최근 20회차
-
-        recent_numbers = []
-        for numbers_str in recent_data['first_prize_numbers']:
-            recent_numbers.extend(self.extract_individual_numbers(numbers_str))
+        recent_numbers = self.valid_numbers(self.first_matrix, self.first_lengths, slice(-20, None))  # 최근 20회차
 
         if recent_numbers:
             recent_counter = Counter(recent_numbers)
@@ -635,7 +899,7 @@ class LotteryAnalyzer:
             report.append("")
 
         # 번호 빈도 분석 결과 추가
-        first_counter, bonus_counter = self.analyze_number_frequency()
+        first_counter, bonus_counter = self.number_frequency()
 
         report.append("1등 당첨번호 빈도 분석:")
         for num, count in first_counter.most_common(10):
@@ -648,7 +912,7 @@ class LotteryAnalyzer:
         report.append("")
 
         # 완전 번호 빈도 분석
-        first_complete, bonus_complete = self.analyze_complete_number_frequency()
+        first_complete, bonus_complete = self.complete_number_frequency()
         report.append("완전 번호 중복 출현:")
         duplicates_found = False
         for number, count in first_complete.most_common(10):
@@ -677,7 +941,7 @@ class LotteryAnalyzer:
     def export_analysis_data(self):
         """분석 결과를 CSV로 내보내기"""
         # 번호별 통계
-        first_counter, bonus_counter = self.analyze_number_frequency()
+        first_counter, bonus_counter = self.number_frequency()
 
         # 기본 번호별 통계
         analysis_data = []
@@ -695,7 +959,7 @@ class LotteryAnalyzer:
         print(f"기본 번호 분석 데이터가 {filename1}으로 저장되었습니다.")
 
         # 자리별 분석 데이터
-        first_positions, bonus_positions = self.analyze_position_frequency()
+        first_positions, bonus_positions = self.position_frequency()
 
         # 1등 자리별 데이터
         if any(first_positions):
@@ -717,7 +981,7 @@ class LotteryAnalyzer:
             print(f"자리별 분석 데이터가 {filename2}으로 저장되었습니다.")
 
         # 완전 번호 분석 데이터
-        first_complete, bonus_complete = self.analyze_complete_number_frequency()
+        first_complete, bonus_complete = self.complete_number_frequency()
 
         complete_data = []
         for number, count in first_complete.most_common():
@@ -740,6 +1004,39 @@ class LotteryAnalyzer:
             complete_df.to_csv(filename3, index=False, encoding='utf-8-sig')
             print(f"완전 번호 분석 데이터가 {filename3}으로 저장되었습니다.")
 
+    def run_full_analysis(self):
+        """전체 분석 실행 (단계별 소요 시간과 캐시 재사용 횟수 출력)"""
+        steps = [
+            ('번호 빈도 분석', self.analyze_number_frequency),
+            ('자리별 번호 출현 빈도', self.analyze_position_frequency),
+            ('완전 번호별 출현 횟수', self.analyze_complete_number_frequency),
+            ('패턴 분석', self.analyze_number_pattern_frequency),
+            ('핫/콜드 번호 분석', self.analyze_hot_cold_numbers),
+            ('시간별 트렌드 분석', self.analyze_trends),
+            ('숫자 상관관계 분석', self.find_number_correlations),
+            ('다음 번호 예측', self.predict_next_numbers),
+            ('기본 빈도 차트', self.plot_number_frequency),
+            ('자리별 빈도 히트맵', self.plot_position_frequency),
+            ('핫/콜드 비교 차트', self.plot_hot_cold_comparison),
+            ('시차 상관관계 히트맵', self.plot_lag_correlations),
+            ('종합 분석 보고서', self.generate_analysis_report),
+            ('분석 데이터 내보내기', self.export_analysis_data)
+        ]
+
+        timings = []
+        for name, step in steps:
+            hits_before = self.cache_hits
+            started = time.perf_counter()
+            step()
+            timings.append((name, time.perf_counter() - started, self.cache_hits - hits_before))
+
+        print("\n=== 단계별 소요 시간 ===")
+        for name, seconds, hits in timings:
+            reused = f" (캐시 재사용 {hits}회)" if hits else ""
+            print(f"  {name}: {seconds * 1000:.1f}ms{reused}")
+        print(f"  합계: {sum(seconds for _, seconds, _ in timings) * 1000:.1f}ms, "
+              f"캐시 재사용 {self.cache_hits}회")
+
 
 def main():
     """메인 실행 함수"""
@@ -765,8 +1062,12 @@ def main():
     print("12. 종합 분석 보고서")
     print("13. 분석 데이터 내보내기")
     print("14. 전체 분석 실행")
+    print("15. 번호 당첨 이력 조회")
+    print("16. 시차 상관관계 히트맵")
+    print("17. 유사 당첨번호 검색")
+    print("18. 유사 번호 일괄 검색 성능 측정")
 
-    choice = input("선택하세요 (0-14): ").strip()
+    choice = input("선택하세요 (0-18): ").strip()
 
     if choice == '0':
         analyzer.debug_data_structure()
@@ -798,19 +1099,15 @@ def main():
         analyzer.export_analysis_data()
     elif choice == '14':
         print("전체 분석을 실행합니다...")
-        analyzer.analyze_number_frequency()
-        analyzer.analyze_position_frequency()
-        analyzer.analyze_complete_number_frequency()
-        analyzer.analyze_number_pattern_frequency()
-        analyzer.analyze_hot_cold_numbers()
-        analyzer.analyze_trends()
-        analyzer.find_number_correlations()
-        analyzer.predict_next_numbers()
-        analyzer.plot_number_frequency()
-        analyzer.plot_position_frequency()
-        analyzer.plot_hot_cold_comparison()
-        analyzer.generate_analysis_report()
-        analyzer.export_analysis_data()
+        analyzer.run_full_analysis()
+    elif choice == '15':
+        analyzer.analyze_number_history(input("조회할 번호 (예: 5조162265): ").strip())
+    elif choice == '16':
+        analyzer.plot_lag_correlations()
+    elif choice == '17':
+        analyzer.analyze_similar_draws(input("검색할 번호 (예: 5조162265): ").strip())
+    elif choice == '18':
+        analyzer.benchmark_similarity_search()
     else:
         print("잘못된 선택입니다.")
 
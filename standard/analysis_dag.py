@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 분석 DAG 실행 스크립트
+- 분석 단계(노드)마다 입력(회차 데이터 지문, 다른 노드의 결과, 파라미터)과 결과 파일을 선언
+- 노드 지문 = 코드(분석기 모듈과 그 모듈이 가져오는 저장소 모듈 소스)·파라미터·분석기 설정·입력 지문의 해시
+  (실행 전에 결정되므로 무엇이 바뀔지 미리 알 수 있음)
+- 저장된 지문과 다르거나 결과 파일이 없는 노드만 다시 실행하고, 나머지는 캐시된 결과를 하위 노드에 전달
+- 입력이 모두 준비된 노드는 스레드 풀에서 동시에 실행 (같은 분석기의 노드는 지연 생성 캐시를 공유하므로 차례로 실행)
+- --explain: 실행하지 않고 재계산될 노드와 이유만 출력
+
+사용법: python analysis_dag.py [--type 720] [--explain] [--force] [--incremental] [--workers N]
+                              [--trend-method ratio|decay] [--half-life 20]
+"""
+
+import os
+import sys
+import ast
+import json
+import time
+import pickle
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+from analysis_state import KEY_COLUMNS, data_fingerprint
+from analysis_orchestrator import load_analyzer_class, load_keys
+from decay_scores import DEFAULT_HALF_LIFE
+
+DRAWS = 'draws'  # 회차 데이터 입력 (값은 전달하지 않고 지문만 사용)
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = 'analysis_results'
+STATE_DIR = 'analysis_state'
+
+
+def node(analyzer, method, inputs=(), params=None, settings=(), outputs=(), incremental=False):
+    """분석 노드 선언
+
+    inputs의 노드 결과는 선언 순서대로 메서드의 위치 인수로, params는 키워드 인수로 전달된다.
+    settings는 결과에 영향을 주는 분석기 생성 설정 이름 (해당 값만 지문에 포함). (이름, {설정: 값}) 형태는
+    다른 설정이 모두 그 값일 때만 결과에 영향을 주는 설정이다.
+    incremental이 True이면 실행 시 증분 여부를 incremental 인수로 넘긴다 (결과에 영향이 없으므로 지문 제외).
+    """
+    return {'analyzer': analyzer, 'method': method, 'inputs': [DRAWS, *inputs], 'params': params or {},
+            'settings': list(settings), 'outputs': list(outputs), 'incremental': incremental}
+
+
+# 노드 이름: 선언 (분석기의 analyze_all 단계와 같은 구성)
+NODES = {
+    'basic.jo_frequency': node('basic', 'analyze_jo_frequency', params={'recent_window': 50}),
+    'basic.second_number': node('basic', 'analyze_second_number_pattern'),
+    'basic.trends': node('basic', 'analyze_trends', params={'window': 50}),
+    'basic.repeats': node('basic', 'analyze_repeat_numbers', outputs=['repeat_numbers.json']),
+    'basic.report': node('basic', 'generate_statistics_report',
+                         inputs=['basic.jo_frequency', 'basic.second_number', 'basic.trends'],
+                         outputs=['statistics_report.json']),
+
+    'number.frequency': node('number', 'analyze_number_frequency_by_position', outputs=['number_frequency.json']),
+    'number.companion': node('number', 'analyze_companion_numbers',
+                             outputs=['companion_numbers.json', 'companion_tensor.npy']),
+    'number.decay': node('number', 'calculate_decay_scores', settings=['half_life'], outputs=['decay_scores.json'],
+                         incremental=True),
+    'number.trends': node('number', 'calculate_number_trends', params={'window': 30},
+                          settings=['trend_method', ('half_life', {'trend_method': 'decay'})]),
+    'number.markov': node('number', 'analyze_markov_transitions', params={'steps': (1, 2, 5)},
+                          outputs=['markov_transitions.json']),
+    'number.recurrence': node('number', 'analyze_recurrence_intervals', outputs=['recurrence_intervals.json'],
+                              incremental=True),
+    'number.randomness': node('number', 'analyze_randomness', outputs=['randomness_tests.json']),
+    'number.summary': node('number', 'generate_analysis_summary',
+                           inputs=['number.frequency', 'number.companion', 'number.trends'],
+                           outputs=['number_analysis_summary.json']),
+
+    'pattern.odd_even': node('pattern', 'analyze_odd_even_patterns', outputs=['odd_even_patterns.json']),
+    'pattern.consecutive': node('pattern', 'analyze_consecutive_patterns', outputs=['consecutive_patterns.json']),
+    'pattern.gaps': node('pattern', 'analyze_number_gaps', outputs=['number_gaps.json']),
+    'pattern.jo_combinations': node('pattern', 'analyze_jo_number_combinations',
+                                    outputs=['jo_number_combinations.json']),
+    'pattern.pair_combinations': node('pattern', 'analyze_position_pair_combinations',
+                                      outputs=['position_pair_combinations.json', 'jo_pair_counts.npy']),
+    'pattern.summary': node('pattern', 'generate_pattern_summary',
+                            inputs=['pattern.odd_even', 'pattern.consecutive', 'pattern.gaps',
+                                    'pattern.jo_combinations'],
+                            outputs=['pattern_analysis_summary.json'])
+}
+
+# 분석기 생성 설정 기본값 (노드가 settings로 선언한 값만 지문에 포함)
+DEFAULT_SETTINGS = {
+    'basic': {},
+    'number': {'trend_method': 'ratio', 'half_life': DEFAULT_HALF_LIFE},
+    'pattern': {}
+}
+
+
+def topological_order(nodes):
+    """입력이 먼저 오도록 정렬한 노드 이름 목록 (없는 입력이나 순환이 있으면 ValueError)"""
+    order, visiting, done = [], set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"분석 노드에 순환 의존성이 있습니다: {name}")
+        visiting.add(name)
+        for source in nodes[name]['inputs']:
+            if source != DRAWS:
+                if source not in nodes:
+                    raise ValueError(f"{name}의 입력 노드가 없습니다: {source}")
+                visit(source)
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in nodes:
+        visit(name)
+    return order
+
+
+def stable_hash(value):
+    """JSON으로 표현한 값의 SHA-256 (키 정렬, 튜플은 목록으로)"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+
+def local_imports(module):
+    """저장소 모듈 소스가 가져오는 저장소 모듈 이름 (함수 안의 import 포함)"""
+    with open(os.path.join(SOURCE_DIR, f'{module}.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    names = set()
+    for item in ast.walk(tree):
+        if isinstance(item, ast.Import):
+            names.update(alias.name for alias in item.names)
+        elif isinstance(item, ast.ImportFrom) and item.module and not item.level:
+            names.add(item.module)
+    return {name for name in names if os.path.exists(os.path.join(SOURCE_DIR, f'{name}.py'))}
+
+
+def module_closure(module):
+    """모듈과 그 모듈이 직간접으로 가져오는 저장소 모듈 이름 목록 (정렬)"""
+    seen, pending = set(), [module]
+    while pending:
+        name = pending.pop()
+        if name not in seen:
+            seen.add(name)
+            pending.extend(local_imports(name) - seen)
+    return sorted(seen)
+
+
+def node_settings(spec, settings):
+    """노드 지문에 포함할 분석기 설정 값 (조건부 설정은 조건이 맞을 때만)"""
+    values = {}
+    for item in spec['settings']:
+        key, condition = item if isinstance(item, tuple) else (item, {})
+        if all(settings[name] == value for name, value in condition.items()):
+            values[key] = settings[key]
+    return values
+
+
+def code_hash(spec):
+    """노드 코드의 해시 (분석기 모듈과 그 모듈이 직간접으로 가져오는 저장소 모듈 소스 전체)
+
+    digit_engine, window_counts 등 분석기가 쓰는 모듈이 바뀌어도 결과가 달라질 수 있으므로 어느 모듈이든 바뀌면 다시 실행한다.
+    """
+    digest = hashlib.sha256(spec['method'].encode('utf-8'))
+    for module in module_closure(load_analyzer_class(spec['analyzer']).__module__):
+        with open(os.path.join(SOURCE_DIR, f'{module}.py'), 'rb') as f:
+            digest.update(module.encode('utf-8'))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class AnalysisDAG:
+    """선언된 분석 노드를 입력 지문 기준으로 필요한 것만 실행하는 실행기"""
+
+    def __init__(self, lottery_type="720", data_file=None, settings=None, nodes=None,
+                 results_dir=RESULTS_DIR, state_dir=STATE_DIR):
+        self.lottery_type = lottery_type
+        self.data_file = data_file or f'lottery_data/pension_lottery_{lottery_type}_all.csv'
+        self.nodes = nodes or NODES
+        self.order = topological_order(self.nodes)
+        self.settings = {name: {**defaults, **(settings or {}).get(name, {})}
+                         for name, defaults in DEFAULT_SETTINGS.items()}
+        self.results_dir = results_dir
+        self.cache_dir = os.path.join(state_dir, f'analysis_dag_{lottery_type}')
+        self.manifest_file = os.path.join(state_dir, f'analysis_dag_{lottery_type}.json')
+
+        self.data = None
+        self.analyzers = {}
+        self.locks = {name: threading.Lock() for name in DEFAULT_SETTINGS}
+
+    def load_data(self):
+        """데이터 파일을 정제하여 키 열 데이터프레임으로 로드"""
+        keys = load_keys(self.data_file)
+        self.data = pd.DataFrame(keys, columns=KEY_COLUMNS)
+        return data_fingerprint(keys)
+
+    def load_manifest(self):
+        """노드별 마지막 실행 지문 기록"""
+        try:
+            with open(self.manifest_file, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, manifest):
+        """노드별 실행 지문 기록 저장 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(os.path.dirname(self.manifest_file) or '.', exist_ok=True)
+        temp_file = f'{self.manifest_file}.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.manifest_file)
+
+    def cache_file(self, name):
+        return os.path.join(self.cache_dir, f'{name}.pkl')
+
+    def plan(self, draws_fingerprint, force=False):
+        """노드별 지문과 재계산 여부·이유 ({이름: {'fingerprint', 'components', 'stale', 'reasons'}})"""
+        manifest = self.load_manifest()
+        plan = {}
+
+        for name in self.order:
+            spec = self.nodes[name]
+            components = {
+                'code': code_hash(spec),
+                'params': json.loads(json.dumps(spec['params'], default=str)),
+                'settings': node_settings(spec, self.settings[spec['analyzer']]),
+                'inputs': {source: draws_fingerprint if source == DRAWS else plan[source]['fingerprint']
+                           for source in spec['inputs']}
+            }
+
+            reasons = []
+            previous = manifest.get(name)
+            if force:
+                reasons.append('강제 재계산')
+            elif previous is None:
+                reasons.append('이전 실행 기록 없음')
+            else:
+                old = previous['components']
+                if old.get('code') != components['code']:
+                    reasons.append('코드 변경')
+                if old.get('params') != components['params']:
+                    reasons.append('파라미터 변경')
+                if old.get('settings') != components['settings']:
+                    reasons.append('분석기 설정 변경')
+                for source, fingerprint in components['inputs'].items():
+                    if old.get('inputs', {}).get(source) != fingerprint:
+                        reasons.append('회차 데이터 변경' if source == DRAWS else f'입력 변경: {source}')
+                missing = [output for output in spec['outputs']
+                           if not os.path.exists(os.path.join(self.results_dir, output))]
+                if missing:
+                    reasons.append(f"결과 파일 없음: {', '.join(missing)}")
+                if not os.path.exists(self.cache_file(name)):
+                    reasons.append('캐시 결과 없음')
+
+            plan[name] = {'fingerprint': stable_hash(components), 'components': components,
+                          'stale': bool(reasons), 'reasons': reasons}
+
+        return plan
+
+    def analyzer(self, name, incremental):
+        """분석기 인스턴스 (처음 사용할 때 생성·데이터 연결·충분통계 준비, 해당 분석기 잠금 안에서 호출)"""
+        if name not in self.analyzers:
+            analyzer = load_analyzer_class(name)(self.lottery_type, data_file=self.data_file, **self.settings[name])
+            analyzer.use_data(self.data)
+            analyzer.get_statistics(incremental)
+            self.analyzers[name] = analyzer
+        return self.analyzers[name]
+
+    def cached_result(self, name):
+        with open(self.cache_file(name), 'rb') as f:
+            return pickle.load(f)
+
+    def execute(self, name, arguments, incremental):
+        """노드 하나 실행 후 결과를 캐시 파일에 저장 (반환값: (결과, 실행 시간))"""
+        spec = self.nodes[name]
+        started = time.perf_counter()
+        with self.locks[spec['analyzer']]:
+            method = getattr(self.analyzer(spec['analyzer'], incremental), spec['method'])
+            keywords = dict(spec['params'])
+            if spec['incremental']:
+                keywords['incremental'] = incremental
+            result = method(*arguments, **keywords)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_file = f'{self.cache_file(name)}.tmp'
+        with open(temp_file, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self.cache_file(name))
+        return result, time.perf_counter() - started
+
+    def run(self, force=False, incremental=False, workers=None):
+        """오래된 노드만 실행 (입력이 준비된 노드는 동시에 실행)
+
+        반환값: {'nodes': {이름: {'status', 'seconds', 'reasons'}}, 'wall_seconds', 'success'}
+        """
+        started = time.perf_counter()
+        plan = self.plan(self.load_data(), force)
+        manifest = self.load_manifest()
+
+        results, status = {}, {}
+        for name in self.order:
+            if not plan[name]['stale']:
+                status[name] = {'status': 'cached', 'seconds': 0.0, 'reasons': []}
+
+        def argument(source):
+            if source not in results:
+                results[source] = self.cached_result(source)
+            return results[source]
+
+        waiting = [name for name in self.order if plan[name]['stale']]
+        running = {}
+        with ThreadPoolExecutor(max_workers=workers or len(DEFAULT_SETTINGS)) as executor:
+            while waiting or running:
+                for name in list(waiting):
+                    sources = [source for source in self.nodes[name]['inputs'] if source != DRAWS]
+                    broken = [source for source in sources
+                              if status.get(source, {}).get('status') in ('failed', 'skipped')]
+                    if broken:
+                        waiting.remove(name)
+                        status[name] = {'status': 'skipped', 'seconds': 0.0,
+                                        'reasons': [f"입력 노드 실패: {', '.join(broken)}"]}
+                    elif all(source in status for source in sources):
+                        waiting.remove(name)
+                        try:
+                            arguments = [argument(source) for source in sources]
+                        except (OSError, pickle.UnpicklingError) as e:
+                            status[name] = {'status': 'failed', 'seconds': 0.0, 'reasons': [f'입력 캐시 로드 실패: {e}']}
+                            continue
+                        running[executor.submit(self.execute, name, arguments, incremental)] = name
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name], seconds = future.result()
+                        status[name] = {'status': 'ran', 'seconds': seconds, 'reasons': plan[name]['reasons']}
+                        manifest[name] = {'fingerprint': plan[name]['fingerprint'],
+                                          'components': plan[name]['components']}
+                    except Exception as e:
+                        status[name] = {'status': 'failed', 'seconds': 0.0,
+                                        'reasons': plan[name]['reasons'] + [f'실행 오류: {e}']}
+
+        self.save_manifest(manifest)
+        return {
+            'nodes': {name: status[name] for name in self.order},
+            'wall_seconds': time.perf_counter() - started,
+            'success': all(entry['status'] in ('ran', 'cached') for entry in status.values())
+        }
+
+    def explain(self, force=False):
+        """실행하지 않고 노드별 재계산 여부와 이유 계산"""
+        return self.plan(self.load_data(), force)
+
+
+def print_plan(dag, plan):
+    """--explain 출력"""
+    stale = [name for name in dag.order if plan[name]['stale']]
+    print(f"=== 연금복권{dag.lottery_type} 분석 DAG: 노드 {len(dag.order)}개 중 {len(stale)}개 재계산 예정 ===")
+    for name in dag.order:
+        sources = [source for source in dag.nodes[name]['inputs'] if source != DRAWS]
+        depends = f" ← {', '.join(sources)}" if sources else ''
+        if plan[name]['stale']:
+            print(f"🔄 {name}{depends}: {'; '.join(plan[name]['reasons'])}")
+        else:
+            print(f"✅ {name}{depends}: 최신 (캐시 사용)")
+
+
+def print_report(dag, report):
+    """실행 결과 출력"""
+    icons = {'ran': '🔄', 'cached': '✅', 'failed': '❌', 'skipped': '⏭️'}
+    print(f"\n=== 연금복권{dag.lottery_type} 분석 DAG 실행 결과 ===")
+    for name, entry in report['nodes'].items():
+        detail = f"{entry['seconds']:.3f}초 ({'; '.join(entry['reasons'])})" if entry['status'] == 'ran' else \
+            '; '.join(entry['reasons']) or '캐시 사용'
+        print(f"{icons[entry['status']]} {name}: {detail}")
+
+    counts = {key: sum(entry['status'] == key for entry in report['nodes'].values()) for key in icons}
+    print(f"실행 {counts['ran']}개, 캐시 {counts['cached']}개, 실패 {counts['failed']}개, 건너뜀 {counts['skipped']}개 "
+          f"- 전체 {report['wall_seconds']:.3f}초")
+
+
+def main():
+    """메인 함수"""
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    incremental = os.environ.get('ANALYSIS_INCREMENTAL') == '1'
+    number_settings = {}
+    workers = None
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--incremental':
+            incremental = True
+        elif arg == '--workers' and i + 1 < len(sys.argv):
+            workers = int(sys.argv[i + 1])
+        elif arg == '--trend-method' and i + 1 < len(sys.argv):
+            number_settings['trend_method'] = sys.argv[i + 1]
+        elif arg == '--half-life' and i + 1 < len(sys.argv):
+            number_settings['half_life'] = float(sys.argv[i + 1])
+
+    force = '--force' in sys.argv
+    dag = AnalysisDAG(lottery_type, settings={'number': number_settings})
+
+    try:
+        if '--explain' in sys.argv:
+            print_plan(dag, dag.explain(force))
+            return
+        report = dag.run(force, incremental, workers)
+    except FileNotFoundError:
+        print(f"❌ 데이터 파일을 찾을 수 없습니다: {dag.data_file}")
+        sys.exit(1)
+
+    print_report(dag, report)
+    if not report['success']:
+        print("❌ 분석 중 오류가 발생했습니다. 로그를 확인해주세요.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 통합 분석 실행 스크립트
+- 데이터 파일을 한 번만 읽어 회차별 키 행렬(N×4)을 공유 메모리에 올림
+- 기본·번호·패턴 분석을 프로세스 풀에서 동시에 실행
+- 작업 프로세스는 공유 버퍼를 복사 없이 연결하여 데이터프레임으로 사용
+- 작업별 실행 시간과 최대 메모리(RSS) 보고, 순차 실행과 비교(--compare)
+"""
+
+import os
+import sys
+import time
+import importlib
+import resource
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from analysis_state import KEY_COLUMNS, row_keys
+
+# 분석 이름: (모듈, 클래스)
+ANALYZERS = {
+    'basic': ('pension_lottery_analyzer', 'PensionLotteryAnalyzer'),
+    'number': ('number_analyzer', 'NumberAnalyzer'),
+    'pattern': ('pattern_analyzer', 'PatternAnalyzer')
+}
+
+
+def load_analyzer_class(name):
+    """분석 이름에 해당하는 분석기 클래스"""
+    module_name, class_name = ANALYZERS[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def load_keys(data_file):
+    """데이터 파일을 분석기와 같은 규칙으로 정제한 회차별 키 행렬 (N×4)"""
+    data = pd.read_csv(data_file, encoding='utf-8')
+
+    data['round'] = pd.to_numeric(data['round'], errors='coerce')
+    data['jo'] = pd.to_numeric(data['jo'], errors='coerce')
+    data = data.dropna(subset=['round', 'jo'])
+
+    return row_keys(data)
+
+
+def load_shared_data(data_file):
+    """데이터 파일을 분석기와 같은 규칙으로 정제하여 공유 메모리에 올림
+
+    반환값은 (공유 메모리, 키 행렬 shape) 이며 해제(unlink)는 호출한 쪽의 책임이다.
+    """
+    keys = load_keys(data_file)
+    shm = shared_memory.SharedMemory(create=True, size=max(keys.nbytes, 1))
+    np.ndarray(keys.shape, dtype=np.int64, buffer=shm.buf)[:] = keys
+
+    return shm, keys.shape
+
+
+def shared_dataframe(shm, shape):
+    """공유 메모리의 키 행렬을 복사 없이 감싼 읽기 전용 데이터프레임"""
+    keys = np.ndarray(shape, dtype=np.int64, buffer=shm.buf)
+    keys.flags.writeable = False
+    return pd.DataFrame(keys, columns=KEY_COLUMNS, copy=False)
+
+
+def run_shared_analysis(name, shm_name, shape, lottery_type, incremental, charts):
+    """작업 프로세스: 공유 메모리에 연결하여 분석 하나를 실행"""
+    started = time.perf_counter()
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+        analyzer = load_analyzer_class(name)(lottery_type)
+        data = shared_dataframe(shm, shape)
+
+        if charts:
+            success = analyzer.run_full_analysis(incremental, data=data)
+        else:
+            success = analyzer.use_data(data) and analyzer.analyze_all(incremental) is not None
+
+        # 공유 버퍼를 참조하는 객체를 먼저 정리해야 연결을 닫을 수 있음
+        del analyzer, data
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # 남은 참조가 있으면 프로세스 종료 시 해제됨
+
+    return {
+        'name': name,
+        'success': bool(success),
+        'seconds': time.perf_counter() - started,
+        'peak_rss_mb': peak_rss_mb(),
+        'pid': os.getpid()
+    }
+
+
+def run_parallel(lottery_type="720", names=None, incremental=False, charts=True, workers=None, data_file=None):
+    """데이터를 공유 메모리에 한 번만 올리고 분석들을 동시에 실행"""
+    names = list(names or ANALYZERS)
+    if data_file is None:
+        data_file = f'lottery_data/pension_lottery_{lottery_type}_all.csv'
+
+    started = time.perf_counter()
+    shm, shape = load_shared_data(data_file)
+    load_seconds = time.perf_counter() - started
+
+    # fork 방식에서는 작업 프로세스가 이미 import된 분석 모듈을 그대로 물려받음
+    for name in names:
+        load_analyzer_class(name)
+
+    try:
+        results = []
+        with ProcessPoolExecutor(max_workers=workers or len(names)) as executor:
+            futures = [executor.submit(run_shared_analysis, name, shm.name, shape, lottery_type, incremental, charts)
+                       for name in names]
+            for future in as_completed(futures):
+                results.append(future.result())
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return {
+        'rows': shape[0],
+        'load_seconds': load_seconds,
+        'wall_seconds': time.perf_counter() - started,
+        'results': sorted(results, key=lambda result: names.index(result['name']))
+    }
+
+
+def run_sequential(lottery_type="720", names=None, incremental=False, charts=True, data_file=None):
+    """비교용: 분석마다 데이터를 따로 읽어 차례로 실행"""
+    names = list(names or ANALYZERS)
+    started = time.perf_counter()
+
+    results = []
+    for name in names:
+        analyzer_started = time.perf_counter()
+        analyzer = load_analyzer_class(name)(lottery_type, data_file=data_file)
+        if charts:
+            success = analyzer.run_full_analysis(incremental)
+        else:
+            success = analyzer.load_data() and analyzer.analyze_all(incremental) is not None
+        results.append({'name': name, 'success': bool(success),
+                        'seconds': time.perf_counter() - analyzer_started})
+
+    return {'wall_seconds': time.perf_counter() - started, 'results': results}
+
+
+def print_report(report, title):
+    """실행 결과 출력"""
+    print(f"\n=== {title} ===")
+    if 'load_seconds' in report:
+        print(f"데이터 로드 (공유 메모리): {report['rows']}개 회차, {report['load_seconds']:.3f}초")
+
+    for result in report['results']:
+        status = '✅' if result['success'] else '❌'
+        rss = f", 최대 RSS {result['peak_rss_mb']:.1f}MB (PID {result['pid']})" if 'peak_rss_mb' in result else ''
+        print(f"{status} {result['name']}: {result['seconds']:.3f}초{rss}")
+
+    slowest = max(result['seconds'] for result in report['results'])
+    print(f"전체 소요 시간: {report['wall_seconds']:.3f}초 (가장 느린 분석: {slowest:.3f}초)")
+
+
+def main():
+    """메인 함수"""
+    # 환경변수에서 연금복권 타입 및 증분 분석 여부 확인
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    incremental = os.environ.get('ANALYSIS_INCREMENTAL') == '1'
+    names = list(ANALYZERS)
+    workers = None
+    charts = True
+
+    # 명령행 인수 처리
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--only' and i + 1 < len(sys.argv):
+            names = [name for name in sys.argv[i + 1].split(',') if name in ANALYZERS]
+        elif arg == '--workers' and i + 1 < len(sys.argv):
+            workers = int(sys.argv[i + 1])
+        elif arg == '--incremental':
+            incremental = True
+        elif arg == '--no-charts':
+            charts = False
+
+    report = run_parallel(lottery_type, names, incremental, charts, workers)
+    print_report(report, f"연금복권{lottery_type} 병렬 분석")
+
+    if '--compare' in sys.argv:
+        print_report(run_sequential(lottery_type, names, incremental, charts), f"연금복권{lottery_type} 순차 분석")
+
+    if all(result['success'] for result in report['results']):
+        print(f"\n🎉 연금복권{lottery_type} 전체 분석이 성공적으로 완료되었습니다!")
+    else:
+        print("❌ 분석 중 오류가 발생했습니다. 로그를 확인해주세요.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
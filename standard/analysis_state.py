@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 증분 분석 상태 관리 모듈
+- 분석별 충분통계(빈도, 합계, 최소/최대, 텐서)를 상태 파일로 저장
+- 마지막 처리 회차와 처리한 데이터의 지문(fingerprint)을 함께 기록
+- 새 회차만 계산하여 기존 통계에 병합, 이전 회차가 바뀐 경우에만 전체 재계산
+- 증분 결과와 전체 재계산 결과가 일치하는지 확인하는 속성 검사(--check)
+- 스트리밍 상태(감쇠 점수, 재출현 간격, 비트맵 색인)용 지문 포함 .npz 저장·로드
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+import shutil
+
+import numpy as np
+import pandas as pd
+
+STATE_VERSION = 1
+KEY_COLUMNS = ['round', 'jo', 'first_number', 'second_number']
+
+
+def row_keys(data):
+    """데이터프레임의 분석 대상 열을 회차별 정수 키 행렬(N×4)로 변환"""
+    columns = [pd.to_numeric(data[column], errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+               for column in KEY_COLUMNS]
+    return np.column_stack(columns) if columns[0].size else np.zeros((0, len(KEY_COLUMNS)), dtype=np.int64)
+
+
+def data_fingerprint(keys):
+    """회차별 키 행렬의 SHA-256 지문"""
+    return hashlib.sha256(np.ascontiguousarray(keys, dtype=np.int64).tobytes()).hexdigest()
+
+
+def write_npz(path, **arrays):
+    """배열들을 .npz 파일로 저장 (저장 도중 중단되어도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.tmp.npz'
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, path)
+
+
+def save_arrays(path, fingerprint='', **arrays):
+    """상태 배열들을 반영한 회차들의 데이터 지문과 함께 .npz 파일로 저장"""
+    write_npz(path, fingerprint=np.array(fingerprint or ''), **arrays)
+
+
+def load_arrays(path):
+    """save_arrays로 저장한 .npz 파일 로드 (반환값: (배열 딕셔너리, 데이터 지문))"""
+    with np.load(path, allow_pickle=False) as stored:
+        arrays = {key: stored[key] for key in stored.files if key != 'fingerprint'}
+        return arrays, str(stored['fingerprint'])
+
+
+def merge_statistics(old, new, rules):
+    """병합 규칙('sum', 'min', 'max', 'concat')에 따라 두 충분통계를 합친다"""
+    merged = {}
+    for key, rule in rules.items():
+        a, b = np.asarray(old[key]), np.asarray(new[key])
+
+        if rule == 'concat':
+            merged[key] = np.concatenate([a, b])
+            continue
+
+        # 1차원 빈도 배열은 새 값이 나타나 길이가 늘어날 수 있으므로 0으로 맞춘다
+        if a.ndim == 1 and a.shape != b.shape:
+            length = max(len(a), len(b))
+            a = np.pad(a, (0, length - len(a)))
+            b = np.pad(b, (0, length - len(b)))
+
+        if rule == 'sum':
+            merged[key] = a + b
+        elif rule == 'min':
+            merged[key] = np.minimum(a, b)
+        elif rule == 'max':
+            merged[key] = np.maximum(a, b)
+        else:
+            raise ValueError(f"알 수 없는 병합 규칙입니다: {rule}")
+
+    return merged
+
+
+class AnalysisState:
+    """분석기별 충분통계 상태 파일 (.npz)"""
+
+    def __init__(self, name, lottery_type, state_dir='analysis_state'):
+        self.path = os.path.join(state_dir, f'{name}_{lottery_type}_state.npz')
+        self.statistics = None
+        self.row_count = 0
+        self.last_round = None
+        self.fingerprint = None
+
+    def load(self):
+        """상태 파일 로드 (없거나 버전이 다르면 False)"""
+        if not os.path.exists(self.path):
+            return False
+
+        try:
+            with np.load(self.path, allow_pickle=False) as archive:
+                meta = json.loads(str(archive['__meta__']))
+                if meta.get('version') != STATE_VERSION:
+                    return False
+
+                self.statistics = {key: archive[key] for key in archive.files if key != '__meta__'}
+        except Exception:
+            return False
+
+        self.row_count = meta['row_count']
+        self.last_round = meta['last_round']
+        self.fingerprint = meta['fingerprint']
+        return True
+
+    def save(self, statistics, keys):
+        """충분통계를 마지막 처리 회차·지문과 함께 저장"""
+        meta = {
+            'version': STATE_VERSION,
+            'row_count': int(len(keys)),
+            'last_round': int(keys[-1, 0]) if len(keys) else None,
+            'fingerprint': data_fingerprint(keys)
+        }
+
+        write_npz(self.path, __meta__=np.array(json.dumps(meta)), **statistics)
+
+        self.statistics = statistics
+        self.row_count = meta['row_count']
+        self.last_round = meta['last_round']
+        self.fingerprint = meta['fingerprint']
+
+    def can_extend(self, keys):
+        """저장된 상태가 현재 데이터의 앞부분과 일치하고 이후 회차만 추가되었는지 확인"""
+        if self.statistics is None or self.row_count > len(keys):
+            return False
+
+        if data_fingerprint(keys[:self.row_count]) != self.fingerprint:
+            return False
+
+        # 새 행은 마지막 처리 회차 이후 회차여야 함
+        return self.row_count == len(keys) or self.row_count == 0 or keys[self.row_count, 0] > self.last_round
+
+
+def update_statistics(state, keys, compute, rules, incremental=True):
+    """상태 파일을 이용해 충분통계 갱신
+
+    compute(start)는 start번째 행부터의 충분통계를 반환해야 한다.
+    반환값은 (전체 충분통계, 처리 방식) 이며 처리 방식은 'full', 'incremental', 'unchanged' 중 하나이다.
+    """
+    # 저장된 통계 항목이 현재 병합 규칙과 다르면 (분석 항목 추가 등) 전체를 다시 계산
+    if incremental and state.load() and set(state.statistics) == set(rules) and state.can_extend(keys):
+        if state.row_count == len(keys):
+            return state.statistics, 'unchanged'
+
+        statistics = merge_statistics(state.statistics, compute(state.row_count), rules)
+        mode = 'incremental'
+    else:
+        statistics = compute(0)
+        mode = 'full'
+
+    state.save(statistics, keys)
+    return statistics, mode
+
+
+def _random_history(rng, num_rounds):
+    """속성 검사용 임의 회차 데이터 생성"""
+    return pd.DataFrame({
+        'round': np.arange(1, num_rounds + 1),
+        'first_number': rng.integers(0, 10 ** 6, num_rounds),
+        'second_number': rng.integers(0, 10, num_rounds),
+        'jo': rng.integers(1, 6, num_rounds),
+        'lottery_type': '720',
+        'crawl_date': '2025-06-05'
+    })
+
+
+def _run_analyzers(data, work_dir, incremental):
+    """세 분석기의 분석 단계(차트 제외)를 실행하고 결과 JSON을 읽어 반환"""
+    from pension_lottery_analyzer import PensionLotteryAnalyzer
+    from number_analyzer import NumberAnalyzer
+    from pattern_analyzer import PatternAnalyzer
+
+    data_file = os.path.join(work_dir, 'history.csv')
+    data.to_csv(data_file, index=False, encoding='utf-8')
+
+    current_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        for analyzer_class in (PensionLotteryAnalyzer, NumberAnalyzer, PatternAnalyzer):
+            analyzer = analyzer_class('720', data_file=data_file)
+            if not analyzer.load_data():
+                raise RuntimeError(f"{analyzer_class.__name__} 데이터 로드 실패")
+            analyzer.analyze_all(incremental=incremental)
+
+        outputs = {}
+        for filename in sorted(os.listdir('analysis_results')):
+            if filename.endswith('.json'):
+                with open(os.path.join('analysis_results', filename), encoding='utf-8') as f:
+                    outputs[filename] = _strip_dates(json.load(f))
+        return outputs
+    finally:
+        os.chdir(current_dir)
+
+
+def _strip_dates(value):
+    """실행 시각에 따라 달라지는 analysis_date 항목 제거"""
+    if isinstance(value, dict):
+        return {k: _strip_dates(v) for k, v in value.items() if k != 'analysis_date'}
+    if isinstance(value, list):
+        return [_strip_dates(v) for v in value]
+    return value
+
+
+def check_incremental_consistency(trials=20, seed=0):
+    """증분 갱신 결과가 전체 재계산 결과와 정확히 일치하는지 임의 데이터로 검사"""
+    rng = np.random.default_rng(seed)
+    failures = 0
+
+    for trial in range(trials):
+        num_rounds = int(rng.integers(60, 400))
+        data = _random_history(rng, num_rounds)
+        split = int(rng.integers(1, num_rounds + 1))
+        mutate = bool(rng.integers(0, 4) == 0)
+
+        incremental_dir = tempfile.mkdtemp(prefix='incremental_')
+        full_dir = tempfile.mkdtemp(prefix='full_')
+        try:
+            # 1) 앞부분만으로 상태 생성 (가끔 이전 회차를 수정해 전체 재계산 경로도 검사)
+            prefix = data.iloc[:split].copy()
+            if mutate:
+                prefix.loc[prefix.index[int(rng.integers(0, split))], 'first_number'] = int(rng.integers(0, 10 ** 6))
+            _run_analyzers(prefix, incremental_dir, incremental=True)
+
+            # 2) 전체 데이터로 증분 실행 vs 새 디렉토리에서 전체 재계산
+            incremental_outputs = _run_analyzers(data, incremental_dir, incremental=True)
+            full_outputs = _run_analyzers(data, full_dir, incremental=False)
+
+            if incremental_outputs != full_outputs:
+                failures += 1
+                different = [name for name in full_outputs
+                             if incremental_outputs.get(name) != full_outputs[name]]
+                print(f"❌ 시도 {trial + 1}: {num_rounds}회차, 분할 {split}, 수정 {mutate} - 불일치 {different}")
+            else:
+                print(f"✅ 시도 {trial + 1}: {num_rounds}회차, 분할 {split}, 수정 {mutate}")
+        finally:
+            shutil.rmtree(incremental_dir, ignore_errors=True)
+            shutil.rmtree(full_dir, ignore_errors=True)
+
+    return failures == 0
+
+
+def main():
+    """메인 함수"""
+    trials = 20
+    seed = 0
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--trials' and i + 1 < len(sys.argv):
+            trials = int(sys.argv[i + 1])
+        elif arg == '--seed' and i + 1 < len(sys.argv):
+            seed = int(sys.argv[i + 1])
+
+    if '--check' not in sys.argv:
+        print("사용법: python analysis_state.py --check [--trials N] [--seed S]")
+        return
+
+    if check_incremental_consistency(trials, seed):
+        print("\n🎉 증분 분석 결과가 전체 재계산 결과와 모두 일치합니다.")
+    else:
+        print("\n❌ 증분 분석 결과가 전체 재계산 결과와 다릅니다.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
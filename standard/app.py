@@ -11,10 +11,17 @@ import threading
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, send_from_directory
 import logging
+import pandas as pd
 from config import config
+from window_counts import RoundWindowCounts, number_trend_scores, jo_trends, hot_cold_digits
+from draw_index import DrawIndex
+from ticket_checker import Draws, read_tickets, check_tickets, tier_summary, ticket_rows
+from bitmap_index import BitmapIndex
+from ticket_generator import TicketGenerator, CONSTRAINTS, generated_rows
 
 # 전역 변수
 running_tasks = {}  # 실행 중인 작업 추적
+data_cache = {}  # (종류, 연금복권 타입)별 (데이터 수정 시각, 회차 데이터에서 만든 객체)
 
 
 def create_app(config_name=None):
@@ -78,15 +85,16 @@ def register_utility_functions(app):
             pass
         return None
 
-    def run_python_script(script_name, task_id, lottery_type="720"):
+    def run_python_script(script_name, task_id, lottery_type="720", incremental=False):
         """Python 스크립트 실행 (백그라운드)"""
         try:
-            app.logger.info(f"스크립트 실행 시작: {script_name} (타입: {lottery_type})")
+            app.logger.info(f"스크립트 실행 시작: {script_name} (타입: {lottery_type}, 증분: {incremental})")
             running_tasks[task_id] = {'status': 'running', 'start_time': datetime.now()}
 
-            # 환경변수로 연금복권 타입 전달
+            # 환경변수로 연금복권 타입 및 증분 분석 여부 전달
             env = os.environ.copy()
             env['LOTTERY_TYPE'] = lottery_type
+            env['ANALYSIS_INCREMENTAL'] = '1' if incremental else '0'
 
             result = subprocess.run(
                 ['python', script_name],
@@ -123,8 +131,59 @@ def register_utility_functions(app):
             }
             app.logger.error(f"스크립트 실행 중 예외 발생: {script_name} - {e}")
 
+    def load_lottery_data(lottery_type="720"):
+        """크롤링 데이터 로드 (분석기와 같은 정제 규칙 적용)"""
+        data_file = os.path.join(app.config['LOTTERY_DATA_DIR'], f'pension_lottery_{lottery_type}_all.csv')
+        data = pd.read_csv(data_file, encoding='utf-8')
+
+        data['round'] = pd.to_numeric(data['round'], errors='coerce')
+        data['jo'] = pd.to_numeric(data['jo'], errors='coerce')
+        data = data.dropna(subset=['round', 'jo'])
+        data['round'] = data['round'].astype(int)
+        data['jo'] = data['jo'].astype(int)
+        return data, os.path.getmtime(data_file)
+
+    def get_cached(kind, lottery_type, build):
+        """회차 데이터에서 만든 객체를 (종류, 연금복권 타입)별로 캐시 (데이터 파일이 바뀐 경우에만 build(data)로 다시 생성)"""
+        data_file = os.path.join(app.config['LOTTERY_DATA_DIR'], f'pension_lottery_{lottery_type}_all.csv')
+        key = (kind, lottery_type)
+        cached = data_cache.get(key)
+        if cached is None or cached[0] != os.path.getmtime(data_file):
+            data, modified = load_lottery_data(lottery_type)
+            data_cache[key] = (modified, build(data))
+        return data_cache[key][1]
+
+    def get_window_counts(lottery_type="720"):
+        """회차 구간 누적 카운트 반환"""
+        return get_cached('window_counts', lottery_type, RoundWindowCounts.from_dataframe)
+
+    def get_draw_index(lottery_type="720"):
+        """1등 번호 색인 반환"""
+        return get_cached('draw_index', lottery_type, DrawIndex.from_dataframe)
+
+    def get_draws(lottery_type="720"):
+        """당첨 조회용 회차 데이터 반환"""
+        return get_cached('draws', lottery_type, Draws.from_dataframe)
+
+    def get_bitmap_index(lottery_type="720"):
+        """회차 비트맵 역색인 반환 (저장된 색인이 데이터와 같으면 재사용)"""
+        return get_cached('bitmap_index', lottery_type,
+                          lambda data: BitmapIndex.load_or_build(data, lottery_type, app.config['ANALYSIS_STATE_DIR']))
+
+    def get_ticket_generator(lottery_type="720"):
+        """조건부 번호 생성기 반환"""
+        table_dir = os.path.join(app.config['ANALYSIS_STATE_DIR'], 'feature_tables')
+        return get_cached('ticket_generator', lottery_type,
+                          lambda data: TicketGenerator.from_dataframe(data, table_dir))
+
     # 함수들을 앱 컨텍스트에 등록
     app.load_json_file = load_json_file
+    app.load_lottery_data = load_lottery_data
+    app.get_window_counts = get_window_counts
+    app.get_draw_index = get_draw_index
+    app.get_draws = get_draws
+    app.get_bitmap_index = get_bitmap_index
+    app.get_ticket_generator = get_ticket_generator
     app.get_file_modified_time = get_file_modified_time
     app.run_python_script = run_python_script
 
@@ -179,7 +238,10 @@ def register_routes(app):
                 os.path.join(app.config['ANALYSIS_RESULTS_DIR'], 'number_frequency.json')),
             'companion_numbers': app.load_json_file(
                 os.path.join(app.config['ANALYSIS_RESULTS_DIR'], 'companion_numbers.json')),
-            'number_trends': app.load_json_file(os.path.join(app.config['ANALYSIS_RESULTS_DIR'], 'number_trends.json'))
+            'number_trends': app.load_json_file(os.path.join(app.config['ANALYSIS_RESULTS_DIR'], 'number_trends.json')),
+            'decay_scores': app.load_json_file(os.path.join(app.config['ANALYSIS_RESULTS_DIR'], 'decay_scores.json')),
+            'recurrence': app.load_json_file(
+                os.path.join(app.config['ANALYSIS_RESULTS_DIR'], 'recurrence_intervals.json'))
         }
 
         return render_template('dashboard.html', **data)
@@ -212,15 +274,17 @@ def register_routes(app):
         """분석 작업 실행 API (연금복권 타입 지원)"""
         task_id = f"{action}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-        # 요청 본문에서 연금복권 타입 가져오기
+        # 요청 본문에서 연금복권 타입 및 증분 분석 여부 가져오기
         request_data = request.get_json() or {}
         lottery_type = request_data.get('lottery_type', '720')
+        incremental = bool(request_data.get('incremental', False))
 
         script_map = {
             'crawl': 'pension_lottery_crawler.py',
             'analyze': 'pension_lottery_analyzer.py',
             'number_analyze': 'number_analyzer.py',
-            'pattern_analyze': 'pattern_analyzer.py'
+            'pattern_analyze': 'pattern_analyzer.py',
+            'analyze_all': 'analysis_orchestrator.py'
         }
 
         if action not in script_map:
@@ -232,7 +296,8 @@ def register_routes(app):
                 return jsonify({'status': 'error', 'message': '이미 실행 중인 작업이 있습니다.', 'task_id': tid})
 
         # 백그라운드로 스크립트 실행 (연금복권 타입 포함)
-        thread = threading.Thread(target=app.run_python_script, args=(script_map[action], task_id, lottery_type))
+        thread = threading.Thread(target=app.run_python_script,
+                                  args=(script_map[action], task_id, lottery_type, incremental))
         thread.daemon = True
         thread.start()
 
@@ -276,6 +341,7 @@ def register_routes(app):
             'winning_numbers_frequency.png',
             'duplicated_winning_numbers.png',
             'number_trends.png',
+            'decay_score_history.png',
             'pattern_analysis.png',
             'gap_analysis.png'
         ]
@@ -315,12 +381,21 @@ def register_routes(app):
             'frequency': 'number_frequency.json',
             'companion': 'companion_numbers.json',
             'trends': 'number_trends.json',
+            'decay': 'decay_scores.json',
             'summary': 'number_analysis_summary.json',
             'patterns': 'pattern_analysis_summary.json',
             'odd_even': 'odd_even_patterns.json',
             'consecutive': 'consecutive_patterns.json',
             'gaps': 'number_gaps.json',
-            'combinations': 'jo_number_combinations.json'
+            'combinations': 'jo_number_combinations.json',
+            'pair_combinations': 'position_pair_combinations.json',
+            'repeats': 'repeat_numbers.json',
+            'null_distribution': 'null_distribution.json',
+            'feature_distributions': 'feature_distributions.json',
+            'markov': 'markov_transitions.json',
+            'recurrence': 'recurrence_intervals.json',
+            'randomness': 'randomness_tests.json',
+            'backtest': 'backtest_results.json'
         }
 
         if data_type not in data_files:
@@ -353,6 +428,138 @@ def register_routes(app):
 
         return jsonify(result)
 
+    @app.route('/api/window/<query>')
+    def get_window_query(query):
+        """임의 회차 구간 빈도 질의 API (window: 구간 크기, offset: 건너뛸 최근 회차 수)"""
+        queries = {
+            'trends': (number_trend_scores, 30),
+            'jo_trends': (jo_trends, 50),
+            'hot_cold': (hot_cold_digits, 20)
+        }
+
+        if query not in queries:
+            return jsonify({'error': '잘못된 질의 타입'}), 400
+
+        compute, default_window = queries[query]
+        lottery_type = request.args.get('lottery_type', '720')
+        window = request.args.get('window', default_window, type=int)
+        offset = request.args.get('offset', 0, type=int)
+
+        try:
+            counts = app.get_window_counts(lottery_type)
+            result = compute(counts, window, offset)
+        except FileNotFoundError:
+            return jsonify({'error': '데이터를 찾을 수 없습니다.'}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({'window': window, 'offset': offset, 'lottery_type': lottery_type, 'result': result})
+
+    @app.route('/api/draws/lookup')
+    def lookup_draw_number():
+        """1등 번호 출현 이력 조회 API (jo: 조, number: 6자리 번호)"""
+        lottery_type = request.args.get('lottery_type', '720')
+        jo = request.args.get('jo', type=int)
+        number = request.args.get('number', '')
+
+        if jo is None or not number.isdigit() or len(number) > 6:
+            return jsonify({'error': '조(jo)와 6자리 번호(number)를 입력해주세요.'}), 400
+
+        try:
+            result = app.get_draw_index(lottery_type).lookup(jo, int(number))
+        except FileNotFoundError:
+            return jsonify({'error': '데이터를 찾을 수 없습니다.'}), 404
+
+        return jsonify({'lottery_type': lottery_type, 'result': result})
+
+    @app.route('/api/draws/duplicates')
+    def get_duplicate_draws():
+        """중복 출현한 1등 번호 목록 API (min_count: 최소 출현 횟수, limit: 최대 개수)"""
+        lottery_type = request.args.get('lottery_type', '720')
+        min_count = max(request.args.get('min_count', 2, type=int), 1)
+        limit = request.args.get('limit', 100, type=int)
+
+        try:
+            draw_index = app.get_draw_index(lottery_type)
+        except FileNotFoundError:
+            return jsonify({'error': '데이터를 찾을 수 없습니다.'}), 404
+
+        return jsonify({
+            'lottery_type': lottery_type,
+            'total_draws': len(draw_index),
+            'min_count': min_count,
+            'result': draw_index.duplicate_summary(min_count, limit)
+        })
+
+    @app.route('/api/query')
+    def query_rounds():
+        """회차 조건 조회 API (q: 조건식 예) p3=7 & jo=2, limit: 반환할 회차 수)"""
+        lottery_type = request.args.get('lottery_type', '720')
+        expression = request.args.get('q', '').strip()
+        limit = max(request.args.get('limit', 100, type=int), 0)
+
+        if not expression:
+            return jsonify({'error': '조건식(q)을 입력해주세요. 예) p3=7 & jo=2'}), 400
+
+        try:
+            result = app.get_bitmap_index(lottery_type).search(expression, limit)
+        except FileNotFoundError:
+            return jsonify({'error': '데이터를 찾을 수 없습니다.'}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({'lottery_type': lottery_type, 'result': result})
+
+    @app.route('/api/tickets/generate')
+    def generate_tickets():
+        """조건부 번호 생성 API (조건 이름=값, 예) odd_count=3&digit_sum=20-35&exclude_drawn=1, count: 티켓 수)"""
+        lottery_type = request.args.get('lottery_type', '720')
+        count = min(max(request.args.get('count', 10, type=int), 0), 10000)
+        seed = request.args.get('seed', type=int)
+        constraints = {name: value for name, value in request.args.items() if name in CONSTRAINTS}
+
+        try:
+            result = app.get_ticket_generator(lottery_type).generate(constraints, count, seed)
+        except FileNotFoundError:
+            return jsonify({'error': '데이터를 찾을 수 없습니다.'}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'lottery_type': lottery_type,
+            'constraints': constraints,
+            'candidates': result['candidates'],
+            'elapsed_ms': round(result['seconds'] * 1000, 3),
+            'tickets': generated_rows(result)
+        })
+
+    @app.route('/api/tickets/check', methods=['POST'])
+    def check_uploaded_tickets():
+        """티켓 파일 당첨 조회 API (file: jo/number 열 CSV 또는 N×2 .npy, limit: 반환할 티켓 수)"""
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            return jsonify({'error': '티켓 파일(file)을 업로드해주세요.'}), 400
+
+        lottery_type = request.form.get('lottery_type', '720')
+        limit = request.form.get('limit', 1000, type=int)
+
+        try:
+            jos, numbers = read_tickets(upload)
+            draws = app.get_draws(lottery_type)
+            result = check_tickets(jos, numbers, draws)
+        except FileNotFoundError:
+            return jsonify({'error': '데이터를 찾을 수 없습니다.'}), 404
+        except (ValueError, pd.errors.ParserError) as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'lottery_type': lottery_type,
+            'total_tickets': len(jos),
+            'rounds': len(draws),
+            'summary': tier_summary(result),
+            'tickets': ticket_rows(jos, numbers, result, limit)
+        })
+
 
 def register_error_handlers(app):
     """에러 핸들러 등록"""
@@ -410,6 +617,7 @@ def get_chart_title(filename):
         'winning_numbers_frequency.png': '당첨번호 출현 빈도',
         'duplicated_winning_numbers.png': '중복 출현 당첨번호',
         'number_trends.png': '번호별 트렌드 점수',
+        'decay_score_history.png': '감쇠 점수 이력',
         'pattern_analysis.png': '홀짝 패턴 분석',
         'gap_analysis.png': '간격 패턴 분석'
     }
@@ -422,7 +630,8 @@ def get_action_name(action):
         'crawl': '데이터 크롤링',
         'analyze': '기본 분석',
         'number_analyze': '번호별 분석',
-        'pattern_analyze': '패턴 분석'
+        'pattern_analyze': '패턴 분석',
+        'analyze_all': '전체 분석 (병렬)'
     }
     return names.get(action, action)
 
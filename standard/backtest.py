@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 예측 전략 전진(walk-forward) 백테스트 엔진
+- t회차마다 전략에는 t회차 이전의 당첨번호만 주고 예측 티켓을 받아 t회차 당첨번호로 등급을 매김
+  (등급 규칙은 ticket_checker의 끝자리 일치 + 조 일치 표와 동일)
+- 전략 상태(최근 구간 빈도, 전이 횟수 등)는 회차를 하나씩 반영하여 증분 갱신
+- (전략, 회차 구간) 작업을 프로세스 풀에서 병렬 평가하며, 회차마다 (시드, 전략, 회차)로 난수 스트림을
+  정하므로 구간 분할·작업 수와 관계없이 같은 시드는 같은 결과
+- 전략별 등급 분포, 당첨률(7등 이상), 균등 무작위 기준(이론값과 random 전략)과의 비교, 실행 시간 보고
+  (한 회차의 티켓들은 같은 당첨번호로 채점되어 서로 독립이 아니므로 유의성은 회차별 당첨률을 단위로 검정)
+- --check: 균등 무작위 합성 회차에서 어떤 전략도 유의하게 나오지 않는지 검정 보정 확인
+
+사용법: python backtest.py [--type 720] [--strategies random,hot,cold,markov] [--tickets 100] [--warmup 20]
+                          [--seed 0] [--workers N] [--segments 8] [--db lottery_data.db]
+       python backtest.py --check [--rounds 1000] [--tickets 2000] [--seed 0] [--workers N]
+  (--db: 6자리 보너스 번호가 있는 lottery_results 데이터베이스로 평가하여 보너스 등급까지 채점)
+"""
+
+import os
+import sys
+import json
+import math
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from digit_engine import NUM_POSITIONS, NUM_DIGITS, NUM_JOS, POSITION_SCALES
+from ticket_checker import Draws, trailing_matches, tier_amounts, TIER_TABLE, PRIZE_TIERS, NUM_TIERS, BONUS_TIER
+
+DEFAULT_TICKETS = 100
+DEFAULT_WARMUP = 20
+DEFAULT_SEED = 0
+RECENT_WINDOW = 20
+CHECK_ROUNDS = 1000
+CHECK_TICKETS = 2000
+CHECK_ALPHA = 0.001
+
+# 균등 무작위 티켓 한 장의 등급별 확률: 끝자리 정확히 k개 일치 = (1/10)^k × 9/10, 6자리 모두 일치 = 10^-6
+# (6자리 일치는 조 일치 1/5이면 1등, 아니면 2등), 보너스 번호 6자리 일치 = 10^-6
+# (보너스 번호와 일치한 티켓은 원래 받았을 3등 이하 등급에서 빠지므로 3등 이하 확률에 1 - 10^-6을 곱한다)
+UNIFORM_TIER_PROBABILITIES = np.zeros(NUM_TIERS)
+for _matched in range(NUM_POSITIONS):
+    UNIFORM_TIER_PROBABILITIES[TIER_TABLE[0, _matched]] = 0.1 ** _matched * 0.9
+UNIFORM_TIER_PROBABILITIES[TIER_TABLE[0, NUM_POSITIONS]] = 0.1 ** NUM_POSITIONS * (NUM_JOS - 1) / NUM_JOS
+UNIFORM_TIER_PROBABILITIES[TIER_TABLE[1, NUM_POSITIONS]] = 0.1 ** NUM_POSITIONS / NUM_JOS
+UNIFORM_TIER_PROBABILITIES[:BONUS_TIER] *= 1 - 0.1 ** NUM_POSITIONS
+UNIFORM_TIER_PROBABILITIES[BONUS_TIER] = 0.1 ** NUM_POSITIONS
+
+
+def weighted_digits(rng, weights, count):
+    """자리별 가중치(6×10)에 비례하여 숫자를 뽑은 count×6 행렬"""
+    cumulative = np.cumsum(weights, axis=1)
+    cumulative /= cumulative[:, -1:]
+    draws = rng.random((count, NUM_POSITIONS))
+    digits = (draws[:, :, None] >= cumulative[None, :, :]).sum(axis=2)
+    return np.minimum(digits, NUM_DIGITS - 1)
+
+
+def weighted_jos(rng, weights, count):
+    """조별 가중치(5)에 비례하여 뽑은 조 배열 (1~5)"""
+    weights = np.asarray(weights, dtype=np.float64)
+    return rng.choice(NUM_JOS, size=count, p=weights / weights.sum()) + 1
+
+
+class Strategy:
+    """예측 전략 기본 클래스
+
+    update(jo, digits)로 회차를 하나씩 반영하고, predict(rng, count)로 다음 회차 티켓
+    (조 배열, 6자리 번호 배열)을 만든다. 상태는 반영한 회차들에서만 계산해야 한다.
+    """
+
+    description = ''
+
+    def update(self, jo, digits):
+        """당첨번호 한 회차(조, 길이 6 숫자 배열)를 상태에 반영"""
+
+    def predict(self, rng, count):
+        """다음 회차 예측 티켓 count장 (조 배열, 번호 배열)"""
+        raise NotImplementedError
+
+
+class RandomStrategy(Strategy):
+    """균등 무작위 티켓 (기준 전략)"""
+
+    description = '균등 무작위'
+
+    def predict(self, rng, count):
+        return rng.integers(1, NUM_JOS + 1, count), rng.integers(0, 10 ** NUM_POSITIONS, count)
+
+
+class RecentWindowStrategy(Strategy):
+    """최근 RECENT_WINDOW회차의 자리별 숫자·조 빈도로 가중치를 정하는 전략
+
+    순환 버퍼에 최근 회차를 두고, 새 회차를 더하면서 구간을 벗어난 회차를 빼서 빈도를 갱신한다.
+    """
+
+    def __init__(self, window=RECENT_WINDOW):
+        self.window = window
+        self.history_digits = np.zeros((window, NUM_POSITIONS), dtype=np.int64)
+        self.history_jos = np.zeros(window, dtype=np.int64)
+        self.size = 0
+        self.cursor = 0
+        self.digit_counts = np.zeros((NUM_POSITIONS, NUM_DIGITS), dtype=np.int64)
+        self.jo_counts = np.zeros(NUM_JOS, dtype=np.int64)
+
+    def update(self, jo, digits):
+        positions = np.arange(NUM_POSITIONS)
+        if self.size == self.window:
+            self.digit_counts[positions, self.history_digits[self.cursor]] -= 1
+            self.jo_counts[self.history_jos[self.cursor] - 1] -= 1
+        else:
+            self.size += 1
+
+        self.history_digits[self.cursor] = digits
+        self.history_jos[self.cursor] = jo
+        self.digit_counts[positions, digits] += 1
+        self.jo_counts[jo - 1] += 1
+        self.cursor = (self.cursor + 1) % self.window
+
+    def weights(self, counts):
+        """빈도 -> 뽑기 가중치"""
+        raise NotImplementedError
+
+    def predict(self, rng, count):
+        digits = weighted_digits(rng, self.weights(self.digit_counts), count)
+        return weighted_jos(rng, self.weights(self.jo_counts), count), digits @ POSITION_SCALES
+
+
+class HotStrategy(RecentWindowStrategy):
+    """최근 구간에서 자주 나온 숫자·조를 우선 (빈도 + 0.5에 비례)"""
+
+    description = f'최근 {RECENT_WINDOW}회차 빈출 숫자 우선'
+
+    def weights(self, counts):
+        return counts + 0.5
+
+
+class ColdStrategy(RecentWindowStrategy):
+    """최근 구간에서 잘 안 나온 숫자·조를 우선 (최대 빈도 - 빈도 + 0.5에 비례)"""
+
+    description = f'최근 {RECENT_WINDOW}회차 미출현 숫자 우선'
+
+    def weights(self, counts):
+        return counts.max(axis=-1, keepdims=True) - counts + 0.5
+
+
+class MarkovStrategy(Strategy):
+    """직전 회차의 자리별 숫자·조에서 누적 전이 횟수(+1 평활)에 비례하여 뽑는 전략"""
+
+    description = '직전 회차 기준 자리별 전이 빈도'
+
+    def __init__(self):
+        self.position_counts = np.ones((NUM_POSITIONS, NUM_DIGITS, NUM_DIGITS))
+        self.jo_counts = np.ones((NUM_JOS, NUM_JOS))
+        self.previous = None
+
+    def update(self, jo, digits):
+        if self.previous is not None:
+            previous_jo, previous_digits = self.previous
+            self.position_counts[np.arange(NUM_POSITIONS), previous_digits, digits] += 1
+            self.jo_counts[previous_jo - 1, jo - 1] += 1
+        self.previous = (jo, np.array(digits))
+
+    def predict(self, rng, count):
+        if self.previous is None:
+            return RandomStrategy().predict(rng, count)
+        previous_jo, previous_digits = self.previous
+        weights = self.position_counts[np.arange(NUM_POSITIONS), previous_digits]
+        digits = weighted_digits(rng, weights, count)
+        return weighted_jos(rng, self.jo_counts[previous_jo - 1], count), digits @ POSITION_SCALES
+
+
+# 전략 이름: 전략 클래스 (random은 균등 무작위 기준)
+STRATEGIES = {
+    'random': RandomStrategy,
+    'hot': HotStrategy,
+    'cold': ColdStrategy,
+    'markov': MarkovStrategy
+}
+
+
+def score_tickets(jos, numbers, draw_jo, draw_code, bonus_code=-1):
+    """예측 티켓들의 한 회차 등급 코드 배열
+
+    보너스 번호(bonus_code, 없으면 -1)와 6자리가 모두 일치하면 2등 이상이 아닌 경우 보너스 등급으로 올린다.
+    """
+    numbers = np.asarray(numbers, dtype=np.int32)
+    matched = trailing_matches(numbers, np.int32(draw_code))
+    tiers = TIER_TABLE[(np.asarray(jos) == draw_jo).view(np.int8), matched]
+    if bonus_code >= 0:
+        np.maximum(tiers, np.where(numbers == bonus_code, np.int8(BONUS_TIER), np.int8(0)), out=tiers)
+    return tiers
+
+
+def round_bonus_codes(draws):
+    """회차 순서의 보너스 번호 배열 (Draws의 정렬된 보너스 번호를 회차 위치로 되돌림, 없는 회차는 -1)
+
+    보너스 번호가 없는 데이터(크롤링 CSV)면 None
+    """
+    if draws.bonus_codes is None:
+        return None
+    codes = np.full(len(draws), -1, dtype=np.int64)
+    codes[draws.bonus_order] = draws.bonus_codes
+    return codes
+
+
+def round_generator(seed, strategy_index, round_index):
+    """(시드, 전략, 회차)별 독립 난수 생성기 (구간 분할과 무관하게 같은 회차는 같은 난수)"""
+    return np.random.default_rng([seed, strategy_index, round_index])
+
+
+def run_segment(name, jos, digits, start, end, tickets_per_round, seed, bonus_codes=None):
+    """작업 프로세스: 전략 하나로 [start, end) 회차를 평가 (bonus_codes: 회차별 보너스 번호, 없으면 None)
+
+    0 ~ start-1 회차를 증분 반영하여 상태를 만든 뒤, 회차마다 예측 -> 채점 -> 반영을 반복한다.
+    반환값: (등급별 티켓 수, 회차별 당첨(7등 이상) 티켓 수 배열, 실행 시간(초))
+    """
+    started = time.perf_counter()
+    strategy = STRATEGIES[name]()
+    strategy_index = list(STRATEGIES).index(name)
+    codes = digits @ POSITION_SCALES
+
+    for t in range(start):
+        strategy.update(int(jos[t]), digits[t])
+
+    tier_counts = np.zeros(NUM_TIERS, dtype=np.int64)
+    round_wins = np.zeros(end - start, dtype=np.int64)
+    for t in range(start, end):
+        ticket_jos, ticket_numbers = strategy.predict(round_generator(seed, strategy_index, t), tickets_per_round)
+        bonus_code = bonus_codes[t] if bonus_codes is not None else -1
+        tiers = score_tickets(ticket_jos, ticket_numbers, jos[t], codes[t], bonus_code)
+        counts = np.bincount(tiers, minlength=NUM_TIERS)
+        tier_counts += counts
+        round_wins[t - start] = counts[1:].sum()
+        strategy.update(int(jos[t]), digits[t])
+
+    return tier_counts, round_wins, time.perf_counter() - started
+
+
+def segment_bounds(start, end, segments):
+    """평가 회차 [start, end)를 segments개 이하의 구간으로 분할"""
+    bounds = np.unique(np.linspace(start, end, max(segments, 1) + 1).astype(int))
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def win_rate_comparison(round_wins, tickets_per_round, probability):
+    """회차별 당첨 티켓 수를 균등 무작위 이론 당첨률과 비교 (비율, z 점수, 정규 근사 양측 p-value)
+
+    한 회차의 티켓들은 같은 전략 분포에서 나와 같은 당첨번호로 채점되므로 서로 강하게 상관되어 있다
+    (예: 끝자리를 모두 같게 뽑으면 그 회차는 전부 당첨이거나 전부 낙첨). 당첨번호가 과거와 무관하게
+    균등하면 회차별 당첨률은 서로 독립이고 평균이 이론 당첨률이므로, 회차별 당첨률의 표본 분산으로
+    평균의 표준오차를 구해 검정한다.
+    """
+    rates = np.asarray(round_wins, dtype=np.float64) / tickets_per_round
+    num_rounds = len(rates)
+    mean = float(rates.mean()) if num_rounds else 0.0
+    std_error = float(rates.std(ddof=1)) / math.sqrt(num_rounds) if num_rounds > 1 else 0.0
+    z_score = (mean - probability) / std_error if std_error else 0.0
+    return {
+        'ratio_to_uniform': round(mean / probability, 4) if probability and num_rounds else None,
+        'rounds': num_rounds,
+        'round_std_error': round(std_error, 6),
+        'z_score': round(z_score, 4),
+        'p_value': round(math.erfc(abs(z_score) / math.sqrt(2)), 6)
+    }
+
+
+def run_backtest(jos, digits, rounds, strategies=None, tickets_per_round=DEFAULT_TICKETS, warmup=DEFAULT_WARMUP,
+                 seed=DEFAULT_SEED, workers=1, segments=None, bonus_codes=None):
+    """전략별 전진 백테스트 결과
+
+    warmup개 회차는 상태만 만들고 그 이후 회차를 평가한다. (전략, 구간) 작업을 workers개
+    프로세스에서 나누어 실행하며, segments를 주지 않으면 작업 수만큼 회차를 나눈다.
+    bonus_codes(회차별 보너스 번호, 없는 회차는 -1)를 주면 보너스 등급까지 채점하고, 주지 않으면
+    균등 무작위 기준에서도 보너스 등급 확률을 뺀다.
+    """
+    strategies = list(strategies or STRATEGIES)
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"알 수 없는 전략입니다: {', '.join(unknown)} (가능: {', '.join(STRATEGIES)})")
+
+    order = np.argsort(rounds, kind='stable')
+    jos, digits, rounds = np.asarray(jos)[order], np.asarray(digits, dtype=np.int64)[order], np.asarray(rounds)[order]
+    if bonus_codes is not None:
+        bonus_codes = np.asarray(bonus_codes, dtype=np.int64)[order]
+    warmup = max(warmup, 0)
+    if warmup >= len(rounds):
+        raise ValueError(f"평가할 회차가 없습니다 (전체 {len(rounds)}회차, 준비 {warmup}회차).")
+    bounds = segment_bounds(warmup, len(rounds), segments or workers)
+    jobs = [(name, start, end) for name in strategies for start, end in bounds]
+
+    started = time.perf_counter()
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_segment, name, jos, digits, start, end, tickets_per_round, seed,
+                                       bonus_codes)
+                       for name, start, end in jobs]
+            parts = [future.result() for future in futures]
+    else:
+        parts = [run_segment(name, jos, digits, start, end, tickets_per_round, seed, bonus_codes)
+                 for name, start, end in jobs]
+    wall_seconds = time.perf_counter() - started
+
+    evaluated = len(rounds) - warmup
+    amounts = tier_amounts()
+    probabilities = UNIFORM_TIER_PROBABILITIES.copy()
+    if bonus_codes is None:
+        probabilities[BONUS_TIER] = 0.0
+    uniform_win_rate = float(probabilities[1:].sum())
+    uniform_prize = float(probabilities @ amounts)
+
+    results = {}
+    for name in strategies:
+        selected = [part for (job_name, _, _), part in zip(jobs, parts) if job_name == name]
+        tier_counts = sum((part[0] for part in selected), np.zeros(NUM_TIERS, dtype=np.int64))
+        round_wins = np.concatenate([part[1] for part in selected])
+        seconds = sum(part[2] for part in selected)
+        tickets = int(tier_counts.sum())
+        wins = int(tier_counts[1:].sum())
+
+        results[name] = {
+            'description': STRATEGIES[name].description,
+            'tickets': tickets,
+            'tier_counts': {tier: int(tier_counts[code]) for code, tier in enumerate(PRIZE_TIERS)},
+            'win_rate': round(wins / tickets, 6) if tickets else None,
+            'winning_round_rate': round(int((round_wins > 0).sum()) / evaluated, 6) if evaluated else None,
+            'prize_per_ticket': round(float(tier_counts @ amounts) / tickets, 2) if tickets else None,
+            'versus_uniform': win_rate_comparison(round_wins, tickets_per_round, uniform_win_rate),
+            'seconds': round(seconds, 4),
+            'rounds_per_second': round(evaluated / seconds, 1) if seconds else None
+        }
+
+    # random 전략을 함께 평가했으면 같은 조건의 무작위 기준과의 당첨률 차이도 기록
+    if 'random' in results and results['random']['win_rate']:
+        baseline = results['random']['win_rate']
+        for item in results.values():
+            item['win_rate_vs_random'] = round(item['win_rate'] / baseline, 4) if item['win_rate'] is not None else None
+
+    return {
+        'evaluated_rounds': evaluated,
+        'warmup_rounds': warmup,
+        'tickets_per_round': tickets_per_round,
+        'seed': seed,
+        'workers': workers,
+        'segments': len(bounds),
+        'wall_seconds': round(wall_seconds, 4),
+        'uniform_baseline': {
+            'win_rate': round(uniform_win_rate, 6),
+            'prize_per_ticket': round(uniform_prize, 2),
+            'tier_probabilities': {tier: float(probabilities[code])
+                                   for code, tier in enumerate(PRIZE_TIERS)}
+        },
+        'strategies': results
+    }
+
+
+def check_uniform_calibration(num_rounds=CHECK_ROUNDS, tickets_per_round=CHECK_TICKETS, seed=DEFAULT_SEED,
+                              workers=1):
+    """균등 무작위 합성 회차에서 모든 전략의 당첨률 검정이 유의하지 않은지(p >= CHECK_ALPHA) 확인
+
+    합성 회차는 과거와 무관하므로 어떤 전략도 우연 이상으로 맞힐 수 없다.
+    """
+    rng = np.random.default_rng(seed)
+    jos = rng.integers(1, NUM_JOS + 1, num_rounds)
+    digits = rng.integers(0, NUM_DIGITS, (num_rounds, NUM_POSITIONS))
+    results = run_backtest(jos, digits, np.arange(1, num_rounds + 1), tickets_per_round=tickets_per_round,
+                           seed=seed, workers=workers)
+
+    passed = True
+    for name, item in results['strategies'].items():
+        comparison = item['versus_uniform']
+        ok = comparison['p_value'] >= CHECK_ALPHA
+        passed &= ok
+        print(f"{'✅' if ok else '❌'} {name}: 당첨률 {item['win_rate'] * 100:.2f}%, "
+              f"z={comparison['z_score']}, p={comparison['p_value']}")
+    return passed
+
+
+def main():
+    """메인 함수"""
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    strategies = list(STRATEGIES)
+    tickets_per_round = DEFAULT_TICKETS
+    warmup = DEFAULT_WARMUP
+    seed = DEFAULT_SEED
+    workers = 1
+    segments = None
+    db_name = None
+    check_rounds = CHECK_ROUNDS
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--strategies' and i + 1 < len(sys.argv):
+            strategies = [name.strip() for name in sys.argv[i + 1].split(',') if name.strip()]
+        elif arg == '--tickets' and i + 1 < len(sys.argv):
+            tickets_per_round = int(sys.argv[i + 1])
+        elif arg == '--warmup' and i + 1 < len(sys.argv):
+            warmup = int(sys.argv[i + 1])
+        elif arg == '--seed' and i + 1 < len(sys.argv):
+            seed = int(sys.argv[i + 1])
+        elif arg == '--workers' and i + 1 < len(sys.argv):
+            workers = int(sys.argv[i + 1])
+        elif arg == '--segments' and i + 1 < len(sys.argv):
+            segments = int(sys.argv[i + 1])
+        elif arg == '--db' and i + 1 < len(sys.argv):
+            db_name = sys.argv[i + 1]
+        elif arg == '--rounds' and i + 1 < len(sys.argv):
+            check_rounds = int(sys.argv[i + 1])
+
+    if '--check' in sys.argv:
+        if '--tickets' not in sys.argv:
+            tickets_per_round = CHECK_TICKETS
+        print(f"=== 균등 무작위 합성 {check_rounds}회차 × 회차당 {tickets_per_round}장 검정 보정 확인 ===")
+        if check_uniform_calibration(check_rounds, tickets_per_round, seed, workers):
+            print(f"\n🎉 합성 회차에서 유의한(p < {CHECK_ALPHA}) 전략이 없습니다.")
+        else:
+            print(f"\n❌ 합성 회차에서 유의한(p < {CHECK_ALPHA}) 전략이 있습니다.")
+            sys.exit(1)
+        return
+
+    try:
+        if db_name:
+            draws = Draws.from_results_db(db_name)
+        else:
+            draws = Draws.from_data_file(f'lottery_data/pension_lottery_{lottery_type}_all.csv')
+        results = run_backtest(draws.jos.astype(np.int64), draws.digits, draws.rounds, strategies,
+                               tickets_per_round, warmup, seed, workers, segments, round_bonus_codes(draws))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ 백테스트 실패: {e}")
+        sys.exit(1)
+
+    results = {
+        'analysis_info': {
+            'lottery_type': lottery_type,
+            'total_rounds': len(draws),
+            'bonus_scored': draws.bonus_codes is not None,
+            'analysis_date': datetime.now().isoformat()
+        },
+        **results
+    }
+
+    os.makedirs('analysis_results', exist_ok=True)
+    with open('analysis_results/backtest_results.json', 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print(f"=== 연금복권{lottery_type} 전진 백테스트: {results['evaluated_rounds']}개 회차 × "
+          f"회차당 {tickets_per_round}장 ({results['wall_seconds']:.2f}초) ===")
+    print(f"균등 무작위 이론 당첨률(7등 이상): {results['uniform_baseline']['win_rate'] * 100:.2f}%")
+    for name, item in results['strategies'].items():
+        comparison = item['versus_uniform']
+        print(f"  {name} ({item['description']}): 당첨률 {item['win_rate'] * 100:.2f}% "
+              f"(이론 대비 {comparison['ratio_to_uniform']}배, z={comparison['z_score']}, p={comparison['p_value']}), "
+              f"티켓당 {item['prize_per_ticket']:,.0f}원, {item['seconds']:.2f}초")
+    print("\n결과 파일: analysis_results/backtest_results.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 분석 성능 측정 스크립트
+- 임의 회차 데이터를 회차 수별로 생성하여 분석 커널 실행 시간 측정
+- pattern: 패턴 통계 통합(fused) 모드 vs 분석별 순차(sequential) 모드
+- draw_index: 1등 번호 색인 생성, 번호 조회, 중복 검출
+- tickets: 티켓 수별 전체 회차 당첨 조회 (1개 프로세스 vs 프로세스 풀)
+- settlement: 티켓 수별 메모리 매핑 이진 티켓 파일 한 회차 정산
+- features: 번호 특성 계산 (숫자 행렬 연산 vs 특성 테이블 조회)
+- bitmap: 회차 조건 조회 (숫자 행렬 전체 스캔 vs 비트맵 역색인)
+- randomness: 숫자열 무작위성 검정 (한 번에 vs 청크 단위 합성 이력, 1666667회차 = 10^7개 숫자)
+
+--verify: 시간 측정 대신 결과 대조 (tickets: 당첨 조회 결과를 참조 구현 match_tiers의 T×R 등급 행렬과 비교)
+
+사용법: python benchmark.py <pattern|draw_index|tickets|settlement|features|bitmap|randomness> [--rows 1000,10000,100000,1000000] [--repeats 3] [--verify]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+from digit_engine import build_digit_matrix, fused_pattern_statistics, sequential_pattern_statistics, NUM_POSITIONS
+from draw_index import DrawIndex
+from ticket_checker import Draws, check_tickets, parse_tickets, winning_pairs, match_tiers
+from ticket_settlement import generate_ticket_file, open_ticket_file, settle_tickets
+from feature_tables import FeatureTables, FEATURES, compute_features
+from bitmap_index import BitmapIndex, popcount
+from randomness_tests import run_battery, data_chunks, synthetic_chunks
+
+DEFAULT_ROWS = [1000, 10000, 100000, 1000000]
+DEFAULT_REPEATS = 3
+NUM_LOOKUPS = 100000
+NUM_HISTORY_ROUNDS = 300
+VERIFY_MAX_TICKETS = 100000
+
+
+def random_draws(num_rounds, seed=0):
+    """측정용 임의 회차 데이터 (N×6 숫자 행렬, 조)"""
+    rng = np.random.default_rng(seed)
+    digits = build_digit_matrix(rng.integers(0, 10 ** 6, num_rounds))
+    jos = rng.integers(1, 6, num_rounds)
+    return digits, jos
+
+
+def best_time(function, *args, repeats=DEFAULT_REPEATS):
+    """repeats번 실행한 중 가장 짧은 실행 시간(초)"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def benchmark_pattern(rows, repeats):
+    """패턴 통계 통합 모드와 순차 모드 실행 시간 비교"""
+    print(f"{'회차 수':>10} {'순차(ms)':>12} {'통합(ms)':>12} {'배속':>8}")
+
+    results = []
+    for num_rounds in rows:
+        digits, jos = random_draws(num_rounds)
+        sequential = best_time(sequential_pattern_statistics, digits, jos, repeats=repeats)
+        fused = best_time(fused_pattern_statistics, digits, jos, repeats=repeats)
+
+        results.append({'rows': num_rounds, 'sequential': sequential, 'fused': fused})
+        print(f"{num_rounds:>10,} {sequential * 1000:>12.2f} {fused * 1000:>12.2f} {sequential / fused:>7.2f}x")
+
+    return results
+
+
+def benchmark_draw_index(rows, repeats):
+    """1등 번호 색인 생성, 번호 NUM_LOOKUPS개 조회, 중복 검출 실행 시간"""
+    print(f"{'회차 수':>10} {'생성(ms)':>12} {'조회(ms)':>12} {'중복(ms)':>12}")
+
+    rng = np.random.default_rng(0)
+    jos = rng.integers(1, 6, NUM_LOOKUPS)
+    numbers = rng.integers(0, 10 ** 6, NUM_LOOKUPS)
+
+    results = []
+    for num_rounds in rows:
+        draw_rng = np.random.default_rng(num_rounds)
+        draws = (draw_rng.integers(1, 6, num_rounds), draw_rng.integers(0, 10 ** 6, num_rounds),
+                 np.arange(1, num_rounds + 1))
+
+        build = best_time(DrawIndex, *draws, repeats=repeats)
+        draw_index = DrawIndex(*draws)
+        lookup = best_time(draw_index.counts, jos, numbers, repeats=repeats)
+        duplicates = best_time(draw_index.duplicates, repeats=repeats)
+
+        results.append({'rows': num_rounds, 'build': build, 'lookup': lookup, 'duplicates': duplicates})
+        print(f"{num_rounds:>10,} {build * 1000:>12.2f} {lookup * 1000:>12.2f} {duplicates * 1000:>12.2f}")
+
+    return results
+
+
+def random_history(rng):
+    """측정용 임의 NUM_HISTORY_ROUNDS개 회차 (보너스 번호 포함)"""
+    return Draws(np.arange(1, NUM_HISTORY_ROUNDS + 1), rng.integers(1, 6, NUM_HISTORY_ROUNDS),
+                 rng.integers(0, 10 ** 6, NUM_HISTORY_ROUNDS), rng.integers(0, 10 ** 6, NUM_HISTORY_ROUNDS))
+
+
+def benchmark_tickets(rows, repeats):
+    """티켓 rows장을 임의 NUM_HISTORY_ROUNDS개 회차와 비교하는 당첨 조회 시간"""
+    workers = os.cpu_count() or 1
+    print(f"{'티켓 수':>10} {'1개(ms)':>12} {f'{workers}개(ms)':>12} {'티켓/초':>14}")
+
+    rng = np.random.default_rng(0)
+    draws = random_history(rng)
+
+    results = []
+    for num_tickets in rows:
+        jos, numbers = rng.integers(1, 6, num_tickets), rng.integers(0, 10 ** 6, num_tickets)
+        single = best_time(check_tickets, jos, numbers, draws, repeats=repeats)
+        pooled = best_time(lambda: check_tickets(jos, numbers, draws, workers=workers), repeats=repeats)
+
+        results.append({'rows': num_tickets, 'single': single, 'pooled': pooled})
+        print(f"{num_tickets:>10,} {single * 1000:>12.2f} {pooled * 1000:>12.2f} "
+              f"{num_tickets / min(single, pooled):>14,.0f}")
+
+    return results
+
+
+def verify_tickets(rows):
+    """티켓 rows장(최대 VERIFY_MAX_TICKETS장)의 당첨 조회 결과를 참조 구현 match_tiers와 대조
+
+    임의 번호로는 상위 등급이 거의 나오지 않으므로 티켓 일부를 회차의 1등·보너스 번호로 채운다.
+    """
+    print(f"{'티켓 수':>10} {'당첨 쌍':>12} {'상위 등급':>10} {'결과':>6}")
+
+    rng = np.random.default_rng(0)
+    draws = random_history(rng)
+    bonus_numbers = draws.bonus_codes[np.argsort(draws.bonus_order)]
+
+    results = []
+    for num_tickets in rows:
+        num_tickets = min(num_tickets, VERIFY_MAX_TICKETS)
+        jos, numbers = rng.integers(1, 6, num_tickets), rng.integers(0, 10 ** 6, num_tickets)
+        picked = rng.integers(0, NUM_HISTORY_ROUNDS, num_tickets // 10)
+        numbers[:len(picked)] = np.where(rng.random(len(picked)) < 0.5, draws.codes[picked], bonus_numbers[picked])
+        ticket_jos, ticket_digits = parse_tickets(jos, numbers)
+
+        expected = match_tiers(ticket_jos, ticket_digits, draws.jos, draws.digits, draws.bonus_digits)
+        tickets, rounds, tiers = winning_pairs(ticket_jos, ticket_digits, draws)
+        actual = np.zeros_like(expected)
+        actual[tickets, rounds] = tiers
+
+        matched = bool(np.array_equal(actual, expected))
+        results.append({'rows': num_tickets, 'matched': matched})
+        print(f"{num_tickets:>10,} {len(tiers):>12,} {int((tiers >= 5).sum()):>10,} {'일치' if matched else '불일치':>6}")
+
+    return results
+
+
+def benchmark_settlement(rows, repeats):
+    """임의 티켓 rows장의 이진 티켓 파일을 메모리 매핑으로 한 회차 정산하는 시간"""
+    print(f"{'티켓 수':>12} {'파일(MB)':>10} {'정산(ms)':>12} {'티켓/초':>14}")
+    draw = {'round': 1, 'jo': 3, 'number': 123456, 'bonus': 654321}
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tickets.bin')
+        for num_tickets in rows:
+            generate_ticket_file(path, num_tickets)
+            tickets = open_ticket_file(path)
+            seconds = best_time(settle_tickets, tickets, draw, repeats=repeats)
+            del tickets
+
+            results.append({'rows': num_tickets, 'seconds': seconds})
+            print(f"{num_tickets:>12,} {os.path.getsize(path) / 2 ** 20:>10.1f} {seconds * 1000:>12.2f} "
+                  f"{num_tickets / seconds:>14,.0f}")
+
+    return results
+
+
+def benchmark_features(rows, repeats):
+    """회차 수별 번호 특성 전체를 숫자 행렬에서 계산하는 시간 vs 특성 테이블에서 조회하는 시간"""
+    print(f"{'회차 수':>10} {'계산(ms)':>12} {'테이블(ms)':>12} {'배속':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        tables = FeatureTables(directory)
+        for name in FEATURES:
+            tables[name]
+
+        results = []
+        for num_rows in rows:
+            numbers = np.random.default_rng(0).integers(0, 10 ** 6, num_rows)
+            computed = best_time(lambda: compute_features(build_digit_matrix(numbers)), repeats=repeats)
+            gathered = best_time(tables.gather, numbers, repeats=repeats)
+
+            results.append({'rows': num_rows, 'computed': computed, 'gathered': gathered})
+            print(f"{num_rows:>10,} {computed * 1000:>12.2f} {gathered * 1000:>12.2f} {computed / gathered:>7.1f}x")
+
+    return results
+
+
+def benchmark_bitmap(rows, repeats):
+    """회차 수별 조건 조회("p3=7 & jo=2", "p1=even & p6=even") 시간: 숫자 행렬 스캔 vs 비트맵 역색인"""
+    print(f"{'회차 수':>10} {'색인 생성(ms)':>14} {'스캔(ms)':>10} {'비트맵(ms)':>12} {'배속':>8}")
+
+    def scan(digits, jos):
+        first = np.count_nonzero((digits[:, 2] == 7) & (jos == 2))
+        second = np.count_nonzero((digits[:, 0] % 2 == 0) & (digits[:, 5] % 2 == 0))
+        return first, second
+
+    def query(index):
+        return popcount(index.query('p3=7 & jo=2')), popcount(index.query('p1=even & p6=even'))
+
+    results = []
+    for num_rounds in rows:
+        digits, jos = random_draws(num_rounds)
+        rounds = np.arange(1, num_rounds + 1)
+        built = best_time(BitmapIndex.build, digits, jos, rounds, repeats=repeats)
+        index = BitmapIndex.build(digits, jos, rounds)
+        assert scan(digits, jos) == query(index)
+
+        scanned = best_time(scan, digits, jos, repeats=repeats)
+        queried = best_time(query, index, repeats=repeats)
+
+        results.append({'rows': num_rounds, 'build': built, 'scan': scanned, 'bitmap': queried})
+        print(f"{num_rounds:>10,} {built * 1000:>14.2f} {scanned * 1000:>10.3f} {queried * 1000:>12.3f} "
+              f"{scanned / queried:>7.1f}x")
+
+    return results
+
+
+def benchmark_randomness(rows, repeats):
+    """회차 수별 무작위성 검정 5종(7개 숫자열) 시간: 숫자 행렬 한 번에 vs 10만 회차 청크 생성·검정"""
+    print(f"{'회차 수':>10} {'숫자 수':>12} {'한 번에(ms)':>12} {'청크(ms)':>10} {'백만 숫자/초':>12}")
+    chunk_rows = 100000
+
+    results = []
+    for num_rounds in rows:
+        digits, _ = random_draws(num_rounds)
+        assert run_battery([digits]) == run_battery(data_chunks(digits, chunk_rows))
+
+        whole = best_time(run_battery, [digits], repeats=repeats)
+        chunked = best_time(lambda: run_battery(synthetic_chunks(num_rounds * NUM_POSITIONS, chunk_rows)),
+                            repeats=repeats)
+
+        num_digits = num_rounds * NUM_POSITIONS
+        results.append({'rows': num_rounds, 'digits': num_digits, 'whole': whole, 'chunked': chunked})
+        print(f"{num_rounds:>10,} {num_digits:>12,} {whole * 1000:>12.1f} {chunked * 1000:>10.1f} "
+              f"{num_digits / whole / 1e6:>12.1f}")
+
+    return results
+
+
+BENCHMARKS = {
+    'pattern': benchmark_pattern,
+    'draw_index': benchmark_draw_index,
+    'tickets': benchmark_tickets,
+    'settlement': benchmark_settlement,
+    'features': benchmark_features,
+    'bitmap': benchmark_bitmap,
+    'randomness': benchmark_randomness
+}
+
+# --verify로 실행할 결과 대조 함수
+VERIFIERS = {
+    'tickets': verify_tickets
+}
+
+
+def main():
+    """메인 함수"""
+    rows = DEFAULT_ROWS
+    repeats = DEFAULT_REPEATS
+    verify = False
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--rows' and i + 1 < len(sys.argv):
+            rows = [int(value) for value in sys.argv[i + 1].split(',')]
+        elif arg == '--repeats' and i + 1 < len(sys.argv):
+            repeats = int(sys.argv[i + 1])
+        elif arg == '--verify':
+            verify = True
+
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"사용법: python benchmark.py <{'|'.join(BENCHMARKS)}> [--rows 1000,10000] [--repeats 3] [--verify]")
+        return
+
+    if verify:
+        if sys.argv[1] not in VERIFIERS:
+            print(f"결과 대조는 {', '.join(VERIFIERS)}에서만 지원합니다.")
+            return
+        print(f"=== {sys.argv[1]} 결과 대조 ===")
+        VERIFIERS[sys.argv[1]](rows)
+        return
+
+    print(f"=== {sys.argv[1]} 성능 측정 ===")
+    BENCHMARKS[sys.argv[1]](rows, repeats)
+
+
+if __name__ == "__main__":
+    main()
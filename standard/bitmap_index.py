@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 회차 비트맵 역색인 모듈
+- (자리, 숫자) 60개와 조 5개마다 "해당 회차면 1"인 비트셋을 uint64 워드 배열로 압축 저장
+- 조건식(예: "p3=7 & jo=2", "p1=even and p6=even")을 워드 단위 비트 연산(&, |, ~)으로 평가
+- 조건을 만족하는 회차 수는 워드별 popcount 합으로, 회차 목록은 비트를 펼쳐 구함
+- 데이터 지문과 함께 .npz로 저장하여 데이터가 바뀌지 않았으면 다시 만들지 않음
+
+조건식 문법:
+  조건   := 항 (('|' | 'or') 항)*
+  항     := 인자 (('&' | 'and') 인자)*
+  인자   := ('!' | 'not') 인자 | '(' 조건 ')' | 비교
+  비교   := ('p1'~'p6' | 'jo') '=' 값 (',' 값)*
+  값     := 숫자 | 숫자 '-' 숫자 | 'even' | 'odd'
+
+사용법: python bitmap_index.py --query "p3=7 & jo=2" [--query ...] [--type 720] [--limit 20] [--rebuild]
+"""
+
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from digit_engine import build_digit_matrix, NUM_POSITIONS, NUM_DIGITS, NUM_JOS
+from analysis_state import row_keys, data_fingerprint, save_arrays, load_arrays
+
+DEFAULT_INDEX_DIR = 'analysis_state'
+INDEX_VERSION = 1
+
+# 조건식 토큰: 필드=값 목록, 괄호, 연산자(기호 또는 and/or/not)
+TOKEN_PATTERN = re.compile(r'\s*(?:(p[1-6]|jo)\s*=\s*([0-9a-z,\-\s]+?)(?=\s*(?:[&|!()]|\band\b|\bor\b|\bnot\b|$))'
+                           r'|(&|\||!|\(|\)|\band\b|\bor\b|\bnot\b))', re.IGNORECASE)
+OPERATOR_ALIASES = {'and': '&', 'or': '|', 'not': '!'}
+
+# SWAR popcount 상수 (64비트 워드)
+M1 = np.uint64(0x5555555555555555)
+M2 = np.uint64(0x3333333333333333)
+M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+H01 = np.uint64(0x0101010101010101)
+
+
+def pack_bits(mask):
+    """불리언 행렬의 마지막 축을 uint64 워드 배열로 압축 (비트 i = i번째 회차, 남는 비트는 0)"""
+    mask = np.asarray(mask, dtype=bool)
+    packed = np.packbits(mask, axis=-1, bitorder='little')
+    padding = -packed.shape[-1] % 8
+    if padding:
+        packed = np.pad(packed, [(0, 0)] * (packed.ndim - 1) + [(0, padding)])
+    return np.ascontiguousarray(packed).view('<u8')
+
+
+def unpack_bits(words, length):
+    """uint64 워드 배열을 길이 length의 불리언 배열로 펼침"""
+    return np.unpackbits(np.ascontiguousarray(words).view(np.uint8), count=length, bitorder='little').astype(bool)
+
+
+def popcount(words):
+    """uint64 워드 배열의 1비트 개수 합 (워드별 SWAR popcount)"""
+    x = np.asarray(words, dtype=np.uint64)
+    x = x - ((x >> np.uint64(1)) & M1)
+    x = (x & M2) + ((x >> np.uint64(2)) & M2)
+    x = (x + (x >> np.uint64(4))) & M4
+    return int(((x * H01) >> np.uint64(56)).sum())
+
+
+def parse_values(text, upper):
+    """값 목록 문자열("7", "1,3", "2-5", "even", "odd")을 0 ~ upper-1 범위의 정수 집합으로 변환
+
+    범위와 값은 펼치기 전에 검사하므로 요청으로 들어온 큰 범위("0-30000000")도 바로 거부된다.
+    """
+    error = ValueError(f"값은 0~{upper - 1} 사이여야 합니다: {text}")
+    values = set()
+    for part in text.replace(' ', '').lower().split(','):
+        if part == 'even':
+            values.update(range(0, upper, 2))
+        elif part == 'odd':
+            values.update(range(1, upper, 2))
+        elif re.fullmatch(r'\d+-\d+', part):
+            low, high = (int(bound) for bound in part.split('-'))
+            if not 0 <= low <= high < upper:
+                raise error
+            values.update(range(low, high + 1))
+        elif part.isdigit():
+            if int(part) >= upper:
+                raise error
+            values.add(int(part))
+        else:
+            raise ValueError(f"잘못된 값입니다: {part}")
+
+    if not values:
+        raise error
+    return sorted(values)
+
+
+def tokenize(expression):
+    """조건식을 토큰 목록으로 분리 (비교는 ('cmp', 필드, 값 문자열), 연산자·괄호는 기호 문자열)"""
+    tokens, position = [], 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if not match or match.end() == position:
+            raise ValueError(f"조건식을 해석할 수 없습니다: {expression[position:]!r}")
+        field, values, operator = match.groups()
+        if field:
+            tokens.append(('cmp', field.lower(), values))
+        else:
+            tokens.append(OPERATOR_ALIASES.get(operator.lower(), operator))
+        position = match.end()
+        while position < len(expression) and expression[position].isspace():
+            position += 1
+    return tokens
+
+
+class BitmapIndex:
+    """(자리, 숫자)와 조별 회차 비트셋 역색인"""
+
+    def __init__(self, digit_bits, jo_bits, rounds, fingerprint=None):
+        self.digit_bits = digit_bits  # 6×10×W, [자리, 숫자] 비트셋
+        self.jo_bits = jo_bits  # 5×W, [조 - 1] 비트셋
+        self.rounds = np.asarray(rounds, dtype=np.int64)  # 비트 순서의 회차 번호
+        self.fingerprint = fingerprint
+        self.all_bits = pack_bits(np.ones(len(self.rounds), dtype=bool))
+
+    @classmethod
+    def build(cls, digits, jos, rounds, fingerprint=None):
+        """N×6 숫자 행렬과 조·회차 배열에서 생성"""
+        digits = np.asarray(digits, dtype=np.int8)
+        jos = np.asarray(jos, dtype=np.int64)
+        digit_mask = digits.T[:, None, :] == np.arange(NUM_DIGITS, dtype=np.int8)[None, :, None]
+        jo_mask = jos[None, :] == np.arange(1, NUM_JOS + 1)[:, None]
+        return cls(pack_bits(digit_mask), pack_bits(jo_mask), rounds, fingerprint)
+
+    @classmethod
+    def from_dataframe(cls, data):
+        """분석기 데이터프레임(round, jo, first_number)에서 생성 (번호가 없는 회차는 제외)"""
+        numbers = pd.to_numeric(data['first_number'], errors='coerce').to_numpy(dtype=np.float64)
+        valid = np.isfinite(numbers) & (numbers >= 0) & (numbers < 10 ** NUM_POSITIONS)
+        return cls.build(build_digit_matrix(numbers[valid]), data['jo'].to_numpy()[valid],
+                         data['round'].to_numpy()[valid], data_fingerprint(row_keys(data)))
+
+    @classmethod
+    def load_or_build(cls, data, lottery_type, index_dir=DEFAULT_INDEX_DIR, rebuild=False):
+        """저장된 색인의 지문이 데이터와 같으면 불러오고, 아니면 새로 만들어 저장"""
+        path = cls.path(lottery_type, index_dir)
+        fingerprint = data_fingerprint(row_keys(data))
+
+        if not rebuild and os.path.exists(path):
+            try:
+                index = cls.load(path)
+                if index.fingerprint == fingerprint:
+                    return index
+            except (OSError, KeyError, ValueError):
+                pass
+
+        index = cls.from_dataframe(data)
+        index.save(path)
+        return index
+
+    @staticmethod
+    def path(lottery_type, index_dir=DEFAULT_INDEX_DIR):
+        """색인 파일 경로"""
+        return os.path.join(index_dir, f'bitmap_index_{lottery_type}.npz')
+
+    def save(self, path):
+        """색인을 .npz 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+        save_arrays(path, self.fingerprint, version=INDEX_VERSION, digit_bits=self.digit_bits, jo_bits=self.jo_bits,
+                    rounds=self.rounds)
+
+    @classmethod
+    def load(cls, path):
+        """.npz 파일에서 색인 로드 (버전이 다르면 ValueError)"""
+        stored, fingerprint = load_arrays(path)
+        if int(stored['version']) != INDEX_VERSION:
+            raise ValueError(f"색인 버전이 다릅니다: {path}")
+        return cls(stored['digit_bits'], stored['jo_bits'], stored['rounds'], fingerprint or None)
+
+    def __len__(self):
+        return len(self.rounds)
+
+    def digit(self, position, digits):
+        """position번째 자리(1~6)가 digits 중 하나인 회차 비트셋"""
+        if not 1 <= position <= NUM_POSITIONS:
+            raise ValueError(f"자리는 1~{NUM_POSITIONS} 사이여야 합니다: {position}")
+        return np.bitwise_or.reduce(self.digit_bits[position - 1, list(digits)], axis=0)
+
+    def jo(self, jos):
+        """조가 jos 중 하나인 회차 비트셋"""
+        return np.bitwise_or.reduce(self.jo_bits[[jo - 1 for jo in jos]], axis=0)
+
+    def compare(self, field, values):
+        """비교 하나('p3', '7' 등)의 회차 비트셋"""
+        if field == 'jo':
+            jos = parse_values(values, NUM_JOS + 1)
+            if 0 in jos:
+                raise ValueError(f"조는 1~{NUM_JOS} 사이여야 합니다: {values}")
+            return self.jo(jos)
+        return self.digit(int(field[1:]), parse_values(values, NUM_DIGITS))
+
+    def query(self, expression):
+        """조건식을 평가한 회차 비트셋"""
+        tokens = tokenize(expression)
+        if not tokens:
+            raise ValueError("조건식이 비어 있습니다.")
+        position = 0
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def parse_or():
+            nonlocal position
+            bits = parse_and()
+            while peek() == '|':
+                position += 1
+                bits = bits | parse_and()
+            return bits
+
+        def parse_and():
+            nonlocal position
+            bits = parse_factor()
+            while peek() == '&':
+                position += 1
+                bits = bits & parse_factor()
+            return bits
+
+        def parse_factor():
+            nonlocal position
+            token = peek()
+            position += 1
+            if token is None:
+                raise ValueError("조건식이 연산자로 끝났습니다.")
+            if token == '!':
+                return ~parse_factor() & self.all_bits
+            if token == '(':
+                bits = parse_or()
+                if peek() != ')':
+                    raise ValueError("괄호가 닫히지 않았습니다.")
+                position += 1
+                return bits
+            if isinstance(token, tuple):
+                return self.compare(token[1], token[2])
+            raise ValueError(f"예상하지 못한 위치의 토큰입니다: {token}")
+
+        bits = parse_or()
+        if position != len(tokens):
+            raise ValueError(f"예상하지 못한 위치의 토큰입니다: {tokens[position]}")
+        return bits
+
+    def count(self, expression):
+        """조건식을 만족하는 회차 수"""
+        return popcount(self.query(expression))
+
+    def matching_rounds(self, bits):
+        """비트셋에 해당하는 회차 번호 배열"""
+        return self.rounds[unpack_bits(bits, len(self.rounds))]
+
+    def search(self, expression, limit=None):
+        """조건식 조회 결과 (회차 수, 비율, 최근 회차부터 최대 limit개 회차 목록)"""
+        bits = self.query(expression)
+        count = popcount(bits)
+        rounds = self.matching_rounds(bits)[::-1] if count else np.empty(0, dtype=np.int64)
+        if limit is not None:
+            rounds = rounds[:limit]
+
+        return {
+            'expression': expression,
+            'count': count,
+            'total_rounds': len(self.rounds),
+            'ratio': round(count / len(self.rounds), 6) if len(self.rounds) else 0.0,
+            'rounds': rounds.tolist()
+        }
+
+
+def main():
+    """메인 함수"""
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    limit = 20
+    rebuild = False
+    expressions = []
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--query' and i + 1 < len(sys.argv):
+            expressions.append(sys.argv[i + 1])
+        elif arg == '--limit' and i + 1 < len(sys.argv):
+            limit = int(sys.argv[i + 1])
+        elif arg == '--rebuild':
+            rebuild = True
+
+    data_file = f'lottery_data/pension_lottery_{lottery_type}_all.csv'
+    try:
+        data = pd.read_csv(data_file, encoding='utf-8')
+    except FileNotFoundError:
+        print(f"❌ 데이터 파일을 찾을 수 없습니다: {data_file}")
+        sys.exit(1)
+
+    data['round'] = pd.to_numeric(data['round'], errors='coerce')
+    data['jo'] = pd.to_numeric(data['jo'], errors='coerce')
+    data = data.dropna(subset=['round', 'jo'])
+    data['round'] = data['round'].astype(int)
+    data['jo'] = data['jo'].astype(int)
+
+    index = BitmapIndex.load_or_build(data, lottery_type, rebuild=rebuild)
+    print(f"연금복권{lottery_type} 비트맵 색인: {len(index)}개 회차 ({BitmapIndex.path(lottery_type)})")
+
+    for expression in expressions:
+        try:
+            started = time.perf_counter()
+            result = index.search(expression, limit)
+            elapsed = (time.perf_counter() - started) * 1000
+        except ValueError as e:
+            print(f"❌ {expression}: {e}")
+            continue
+        print(f"\n{expression}: {result['count']}개 회차 ({result['ratio'] * 100:.2f}%, {elapsed:.3f}ms)")
+        if result['rounds']:
+            print(f"  최근 회차: {', '.join(map(str, result['rounds']))}")
+
+
+if __name__ == "__main__":
+    main()
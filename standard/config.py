@@ -20,6 +20,7 @@ class Config:
     # 디렉토리 설정
     LOTTERY_DATA_DIR = os.path.join(basedir, 'lottery_data')
     ANALYSIS_RESULTS_DIR = os.path.join(basedir, 'analysis_results')
+    ANALYSIS_STATE_DIR = os.path.join(basedir, 'analysis_state')  # 증분 상태, 비트맵 색인, 특성 테이블
     CHARTS_DIR = os.path.join(basedir, 'charts')
     LOGS_DIR = os.path.join(basedir, 'logs')
     STATIC_DIR = os.path.join(basedir, 'static')
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 지수 감쇠 핫/콜드 점수 모듈
+- 자리별 숫자(6×10)와 조(5)의 출현을 반감기 h회차의 지수 감쇠 가중치로 누적
+  (s_t = λ·s_{t-1} + x_t, λ = 0.5^(1/h), x_t는 t회차의 원-핫 출현)
+- 새 회차는 점수에 λ를 곱하고 나온 숫자·조에만 1을 더해 O(60)으로 갱신 (구간 재집계 없음)
+- 전체 회차의 점수 이력은 블록 단위 누적합으로 같은 점화식을 벡터 연산으로 계산 (차트용)
+- 감쇠 빈도 / 균등 기대 빈도 × 100을 트렌드 점수로 사용 (100 = 평균, 구간 비율 점수와 같은 눈금)
+"""
+
+import numpy as np
+
+from digit_engine import NUM_POSITIONS, NUM_DIGITS, NUM_JOS
+from analysis_state import save_arrays, load_arrays
+
+DEFAULT_HALF_LIFE = 20.0
+
+# 점수 이력 계산 시 블록 안에서 허용할 최대 배율 (λ^-블록 길이 <= 2^32)
+HISTORY_BLOCK_DOUBLINGS = 32
+
+
+def decay_factor(half_life):
+    """반감기 half_life회차의 회차당 감쇠율 λ"""
+    if half_life <= 0:
+        raise ValueError("반감기는 0보다 커야 합니다.")
+    return 0.5 ** (1.0 / half_life)
+
+
+def one_hot_rounds(digits, jos):
+    """회차별 자리 숫자·조 원-핫 행렬 (N×6×10, N×5)"""
+    digits = np.asarray(digits, dtype=np.int64)
+    jos = np.asarray(jos, dtype=np.int64)
+    return (digits[:, :, None] == np.arange(NUM_DIGITS)).astype(np.float64), \
+        (jos[:, None] == np.arange(1, NUM_JOS + 1)).astype(np.float64)
+
+
+def decayed_history(values, decay, initial=None):
+    """s_t = decay·s_{t-1} + values[t]의 모든 t에 대한 값 (values와 같은 모양, initial은 s_{-1})
+
+    블록 안에서는 s_{b+k} = λ^k (λ·s_{b-1} + Σ_{j<=k} λ^-j x_{b+j})를 누적합 한 번으로 구하고,
+    블록 끝 값을 다음 블록으로 넘긴다. 블록 길이는 λ^-k가 2^32를 넘지 않도록 정한다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    history = np.empty_like(values)
+    carry = np.zeros(values.shape[1:]) if initial is None else np.asarray(initial, dtype=np.float64)
+
+    block = max(int(HISTORY_BLOCK_DOUBLINGS * np.log(2) / -np.log(decay)), 1) if decay < 1 else max(len(values), 1)
+    extra_axes = (1,) * (values.ndim - 1)
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(len(chunk), dtype=np.float64)
+        sums = np.cumsum(chunk / powers.reshape(-1, *extra_axes), axis=0)
+        history[start:start + len(chunk)] = powers.reshape(-1, *extra_axes) * (decay * carry + sums)
+        carry = history[start + len(chunk) - 1]
+
+    return history
+
+
+class DecayScores:
+    """지수 감쇠 점수 상태 (자리별 숫자 6×10, 조 5, 가중치 합)"""
+
+    def __init__(self, half_life=DEFAULT_HALF_LIFE):
+        self.half_life = float(half_life)
+        self.decay = decay_factor(self.half_life)
+        self.position_scores = np.zeros((NUM_POSITIONS, NUM_DIGITS))
+        self.jo_scores = np.zeros(NUM_JOS)
+        self.weight = 0.0  # 감쇠 가중치 합 (= 회차당 자리별 점수 합)
+        self.num_rounds = 0
+        self.last_round = None
+
+    @classmethod
+    def from_history(cls, digits, jos, rounds=None, half_life=DEFAULT_HALF_LIFE):
+        """전체 회차에서 생성 (t회차 가중치 λ^(N-1-t)를 곱해 한 번에 합산)"""
+        scores = cls(half_life)
+        scores.extend(digits, jos, rounds)
+        return scores
+
+    def update(self, digits, jo, round_number=None):
+        """새 회차 하나 반영: 전체 점수에 λ를 곱하고 나온 숫자·조에 1을 더함 (O(60))"""
+        self.position_scores *= self.decay
+        self.position_scores[np.arange(NUM_POSITIONS), np.asarray(digits, dtype=np.int64)] += 1.0
+        self.jo_scores *= self.decay
+        if 1 <= int(jo) <= NUM_JOS:
+            self.jo_scores[int(jo) - 1] += 1.0
+        self.weight = self.weight * self.decay + 1.0
+        self.num_rounds += 1
+        if round_number is not None:
+            self.last_round = int(round_number)
+
+    def extend(self, digits, jos, rounds=None):
+        """여러 회차를 순서대로 반영 (update를 회차마다 호출한 것과 같은 결과)"""
+        digits = np.asarray(digits, dtype=np.int64).reshape(-1, NUM_POSITIONS)
+        count = len(digits)
+        if not count:
+            return
+
+        weights = self.decay ** np.arange(count - 1, -1, -1, dtype=np.float64)
+        position_hits, jo_hits = one_hot_rounds(digits, jos)
+        shrink = self.decay ** count
+
+        self.position_scores = self.position_scores * shrink + np.einsum('t,tpd->pd', weights, position_hits)
+        self.jo_scores = self.jo_scores * shrink + weights @ jo_hits
+        self.weight = self.weight * shrink + float(weights.sum())
+        self.num_rounds += count
+        if rounds is not None and len(rounds):
+            self.last_round = int(np.asarray(rounds)[-1])
+
+    def frequencies(self):
+        """감쇠 가중 출현 비율 (자리별 숫자 6×10, 조 5, 각 합 1)"""
+        if self.weight <= 0:
+            return np.full((NUM_POSITIONS, NUM_DIGITS), 1.0 / NUM_DIGITS), np.full(NUM_JOS, 1.0 / NUM_JOS)
+        return self.position_scores / self.weight, self.jo_scores / self.weight
+
+    def trend_scores(self):
+        """감쇠 빈도 / 균등 기대 빈도 × 100 (자리별 숫자 6×10, 조 5, 100 = 평균)"""
+        position_frequency, jo_frequency = self.frequencies()
+        return position_frequency * NUM_DIGITS * 100, jo_frequency * NUM_JOS * 100
+
+    def trend_dict(self):
+        """number_trends.json과 같은 형식의 트렌드 점수 ({자리N: {숫자: 점수}})"""
+        position_trends, _ = self.trend_scores()
+        return {f'자리{pos + 1}': {str(digit): round(float(position_trends[pos, digit]), 2) for digit in range(NUM_DIGITS)}
+                for pos in range(NUM_POSITIONS)}
+
+    def hot_cold(self, top=3):
+        """자리별 감쇠 점수 상위(핫)·하위(콜드) 숫자 (같은 점수는 작은 숫자 우선)"""
+        result = {}
+        for pos in range(NUM_POSITIONS):
+            result[f'자리{pos + 1}'] = {
+                'hot': np.argsort(-self.position_scores[pos], kind='stable')[:top].tolist(),
+                'cold': np.argsort(self.position_scores[pos], kind='stable')[:top].tolist()
+            }
+        return result
+
+    def save(self, path, fingerprint=''):
+        """상태를 .npz 파일로 저장 (fingerprint: 반영한 회차들의 데이터 지문)"""
+        save_arrays(path, fingerprint, half_life=self.half_life, position_scores=self.position_scores,
+                    jo_scores=self.jo_scores, weight=self.weight, num_rounds=self.num_rounds,
+                    last_round=-1 if self.last_round is None else self.last_round)
+
+    @classmethod
+    def load(cls, path):
+        """.npz 파일에서 상태 로드 (반환값: (상태, 데이터 지문))"""
+        stored, fingerprint = load_arrays(path)
+        scores = cls(float(stored['half_life']))
+        scores.position_scores = stored['position_scores'].astype(np.float64)
+        scores.jo_scores = stored['jo_scores'].astype(np.float64)
+        scores.weight = float(stored['weight'])
+        scores.num_rounds = int(stored['num_rounds'])
+        scores.last_round = int(stored['last_round']) if int(stored['last_round']) >= 0 else None
+        return scores, fingerprint
+
+
+def score_history(digits, jos, half_life=DEFAULT_HALF_LIFE):
+    """회차별 트렌드 점수 이력 (N×6×10, N×5, 100 = 평균) - 차트용
+
+    t행은 t회차까지 반영한 DecayScores(...).trend_scores()와 같다.
+    """
+    decay = decay_factor(half_life)
+    position_hits, jo_hits = one_hot_rounds(digits, jos)
+    weights = decayed_history(np.ones(len(position_hits)), decay)
+
+    position_history = decayed_history(position_hits, decay) / weights[:, None, None] * NUM_DIGITS * 100
+    jo_history = decayed_history(jo_hits, decay) / weights[:, None] * NUM_JOS * 100
+    return position_history, jo_history
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 자리 숫자 행렬 연산 모듈
+- 당첨번호를 N×6 숫자 행렬로 한 번에 변환
+- 홀짝 패턴을 6비트 코드로 인코딩
+- 연속 숫자(오름차순 run) 길이를 행렬 연산으로 계산
+- 인접 자리 간격 분포를 bincount로 집계
+- 조 × 자리쌍(15쌍) × 두 자리 코드 빈도를 한 번의 bincount로 집계
+- 홀짝·연속·간격·조합 통계를 한 번의 패스로 계산하는 통합(fused) 모드
+- 자리별 숫자 동반 출현 텐서(6×10×6×10)를 원-핫 행렬곱으로 계산
+- 분석 결과용 빈도 딕셔너리 변환
+"""
+
+import itertools
+
+import numpy as np
+
+NUM_POSITIONS = 6
+NUM_DIGITS = 10
+NUM_JOS = 5
+NUM_GAPS = NUM_POSITIONS - 1
+POSITION_SCALES = 10 ** np.arange(NUM_POSITIONS - 1, -1, -1, dtype=np.int64)
+
+# 홀짝 패턴 코드: 1자리가 최상위 비트인 6비트 정수 (홀수=1)
+PARITY_PATTERN_BINS = 2 ** NUM_POSITIONS
+PARITY_PATTERN_STRINGS = [''.join('홀' if code >> (NUM_POSITIONS - 1 - pos) & 1 else '짝'
+                                  for pos in range(NUM_POSITIONS))
+                          for code in range(PARITY_PATTERN_BINS)]
+
+# 간격 시퀀스 코드: 앞 3개 간격을 10진수 세 자리로 인코딩 (0~999)
+GAP_SEQUENCE_LENGTH = 3
+GAP_SEQUENCE_BINS = 10 ** GAP_SEQUENCE_LENGTH
+GAP_SEQUENCE_WEIGHTS = 10 ** np.arange(GAP_SEQUENCE_LENGTH - 1, -1, -1, dtype=np.int64)
+
+# 자리쌍 조합 코드: 6자리 중 두 자리(앞 자리 < 뒤 자리) 15쌍과 10*앞자리 + 뒷자리 코드(00~99)
+POSITION_PAIRS = tuple(itertools.combinations(range(NUM_POSITIONS), 2))
+POSITION_PAIR_LABELS = [f'자리{first + 1}-{second + 1}' for first, second in POSITION_PAIRS]
+PAIR_CODE_BINS = 100
+JO_PAIR_STRIDE = len(POSITION_PAIRS) * PAIR_CODE_BINS
+JO_PAIR_BINS = 6 * JO_PAIR_STRIDE
+
+# 조별 번호 조합 분석(jo_number_combinations.json)에서 사용하는 자리쌍: 첫2자리, 마지막2자리, 중간2자리
+JO_PAIR_POSITIONS = ((0, 1), (4, 5), (2, 3))
+JO_PAIR_LABELS = ['첫2자리', '마지막2자리', '중간2자리']
+JO_PAIR_INDICES = [POSITION_PAIRS.index(pair) for pair in JO_PAIR_POSITIONS]
+
+# 동반 출현 텐서 계산 시 한 번에 처리할 회차 수 (float32 정수 표현 범위 2^24 이내)
+COMPANION_CHUNK_SIZE = 65536
+
+
+def build_digit_matrix(numbers):
+    """당첨번호 목록(정수 또는 문자열)을 N×6 숫자 행렬로 변환"""
+    values = np.asarray(numbers).astype(np.int64).reshape(-1)
+    return (values[:, None] // POSITION_SCALES % 10).astype(np.int8)
+
+
+def count_dict(counts):
+    """bincount 결과에서 0이 아닌 항목만 {값: 횟수} 딕셔너리로 변환"""
+    counts = np.asarray(counts)
+    return {int(value): int(counts[value]) for value in np.flatnonzero(counts)}
+
+
+def _columns(digits):
+    """N×6 숫자 행렬을 자리 단위 연산용 연속 메모리 배치(6×N)로 변환"""
+    return np.ascontiguousarray(np.asarray(digits, dtype=np.int8).T)
+
+
+def _parity_from_columns(columns):
+    """6×N 배치에서 홀짝 패턴 코드와 홀수 개수 계산"""
+    codes = np.zeros(columns.shape[1], dtype=np.int8)
+    odd_counts = np.zeros(columns.shape[1], dtype=np.int8)
+
+    for column in columns:
+        odd = column & 1
+        codes = (codes << 1) | odd
+        odd_counts += odd
+
+    return codes.astype(np.int64), odd_counts.astype(np.int64)
+
+
+def _runs_from_steps(step_columns):
+    """5×N 증가 간격 배치에서 연속 숫자 통계 계산"""
+    # 간격을 앞에서부터 훑으며 끊기면 0, 이어지면 +1 (자리 수만큼만 반복, 회차 방향은 벡터 연산)
+    run_lengths = np.zeros(step_columns.shape, dtype=np.int8)
+    current = np.zeros(step_columns.shape[1], dtype=np.int8)
+    longest = np.zeros_like(current)
+    step_counts = np.zeros_like(current)
+    sequence_counts = np.zeros_like(current)
+    previous = np.zeros(step_columns.shape[1], dtype=bool)
+
+    for run_length, step in zip(run_lengths, step_columns):
+        current = (current + 1) * step
+        run_length[:] = current
+        np.maximum(longest, current, out=longest)
+        step_counts += step
+        # 연속 구간의 시작 간격 = 직전 간격이 끊긴 상태에서 이어진 간격
+        sequence_counts += step & ~previous
+        previous = step
+
+    # 길이 k+1의 수열은 k개의 증가 간격으로 구성됨 (int8로 계산한 뒤 한 번만 변환)
+    longest += longest > 0
+
+    return {
+        'steps': step_columns.T,
+        'run_lengths': run_lengths.T,
+        'sequence_counts': sequence_counts.astype(np.int64),
+        'total_consecutive': (step_counts + sequence_counts).astype(np.int64),
+        'max_consecutive_length': longest.astype(np.int64)
+    }
+
+
+def _gaps_from_diffs(diff_columns):
+    """5×N 인접 자리 차이 배치에서 간격 통계 계산"""
+    gap_columns = np.abs(diff_columns)
+
+    # 자리쌍별 간격 분포 (5×10)
+    position_counts = np.array([np.bincount(gap_column, minlength=10) for gap_column in gap_columns],
+                               dtype=np.int64).reshape(NUM_GAPS, 10)
+
+    # 앞 3개 간격 시퀀스를 0~999 코드로 인코딩
+    sequence_codes = np.zeros(gap_columns.shape[1], dtype=np.int16)
+    for weight, gap_column in zip(GAP_SEQUENCE_WEIGHTS, gap_columns):
+        sequence_codes += gap_column * np.int16(weight)
+    sequence_counts = np.bincount(sequence_codes, minlength=GAP_SEQUENCE_BINS)
+
+    return {
+        'gaps': gap_columns.T,
+        'adjacent_counts': position_counts.sum(axis=0),
+        'position_counts': position_counts,
+        'sequence_counts': sequence_counts,
+        'max_gap': gap_columns.max(axis=0, initial=0).astype(np.int64),
+        'min_gap': gap_columns.min(axis=0, initial=9).astype(np.int64),
+        'gap_sum': gap_columns.sum(axis=0, dtype=np.int64)
+    }
+
+
+def _pair_codes_from_columns(columns, pairs=POSITION_PAIRS):
+    """6×N 배치에서 자리쌍별 두 자리 코드(10*앞자리 + 뒷자리)를 P×N 배열로 계산"""
+    first, second = np.array(pairs, dtype=np.intp).reshape(-1, 2).T
+    return columns[first].astype(np.int16) * np.int16(10) + columns[second]
+
+
+def _jo_pairs_from_columns(columns, jos, pairs=POSITION_PAIRS):
+    """6×N 배치에서 조 × 자리쌍 × 코드(00~99) 빈도를 한 번의 bincount로 계산
+
+    결과는 1차원으로 펼친 배열이며 reshape(-1, len(pairs), 100)으로 [조, 자리쌍, 코드] 배열이 된다.
+    """
+    jos = np.asarray(jos, dtype=np.int64)
+    stride = len(pairs) * PAIR_CODE_BINS
+    num_bins = max(6 * stride, (int(jos.max(initial=0)) + 1) * stride)
+    code_type = np.int16 if num_bins <= np.iinfo(np.int16).max else np.int64
+
+    # 코드 = 조 * stride + 자리쌍 번호 * 100 + (10*앞자리 + 뒷자리)
+    codes = _pair_codes_from_columns(columns, pairs).astype(code_type, copy=False)
+    codes += (np.arange(len(pairs)) * PAIR_CODE_BINS).astype(code_type)[:, None]
+    codes += (jos * stride).astype(code_type)
+
+    return np.bincount(codes.ravel(), minlength=num_bins)
+
+
+def pair_codes(digits, pairs=POSITION_PAIRS):
+    """자리쌍별 두 자리 코드(00~99)를 회차×자리쌍(N×P) 배열로 계산"""
+    return _pair_codes_from_columns(_columns(digits), pairs).T
+
+
+def parity_patterns(digits):
+    """회차별 홀짝 패턴 코드(0~63)와 홀수 개수를 한 번에 계산"""
+    return _parity_from_columns(_columns(digits))
+
+
+def consecutive_runs(digits):
+    """연속 숫자(+1씩 증가하는 구간) 통계를 모든 회차에 대해 한 번에 계산
+
+    steps[r, i]는 i번째와 i+1번째 자리가 1 증가 관계인지,
+    run_lengths[r, i]는 i번째 간격까지 이어진 연속 증가 간격 수를 나타낸다.
+    """
+    return _runs_from_steps(np.diff(_columns(digits), axis=0) == 1)
+
+
+def consecutive_sequences(digits_row, steps_row):
+    """한 회차의 연속 숫자 수열 목록을 필요할 때만 생성"""
+    sequences = []
+    current_sequence = [int(digits_row[0])]
+
+    for i, is_step in enumerate(steps_row, 1):
+        if is_step:
+            current_sequence.append(int(digits_row[i]))
+        else:
+            if len(current_sequence) >= 2:
+                sequences.append(current_sequence)
+            current_sequence = [int(digits_row[i])]
+
+    if len(current_sequence) >= 2:
+        sequences.append(current_sequence)
+
+    return sequences
+
+
+def gap_statistics(digits):
+    """인접 자리 간격 통계를 모든 회차에 대해 한 번에 계산
+
+    자리 단위 연산이 연속 메모리에서 이루어지도록 5×N(자리쌍×회차) 배치로 계산한다.
+    """
+    return _gaps_from_diffs(np.diff(_columns(digits), axis=0))
+
+
+def jo_pair_counts(digits, jos, pairs=POSITION_PAIRS):
+    """조 × 자리쌍 × 코드(00~99) 빈도 배열 (기본은 15개 자리쌍 전체)"""
+    return _jo_pairs_from_columns(_columns(digits), jos, pairs).reshape(-1, len(pairs), PAIR_CODE_BINS)
+
+
+def sequential_pattern_statistics(digits, jos):
+    """홀짝·연속·간격·조별 조합 통계를 분석별로 따로 계산 (분석마다 행렬을 다시 배치)"""
+    return {
+        'parity': parity_patterns(digits),
+        'runs': consecutive_runs(digits),
+        'gaps': gap_statistics(digits),
+        'jo_pairs': _jo_pairs_from_columns(_columns(digits), jos)
+    }
+
+
+def fused_pattern_statistics(digits, jos):
+    """홀짝·연속·간격·조별 조합 통계를 한 번의 패스로 계산
+
+    자리별 열을 연속 메모리(6×N)로 한 번만 배치하고,
+    인접 자리 차이(5×N)는 연속 숫자와 간격 분석이 함께 사용한다.
+    """
+    columns = _columns(digits)
+    diff_columns = np.diff(columns, axis=0)
+
+    return {
+        'parity': _parity_from_columns(columns),
+        'runs': _runs_from_steps(diff_columns == 1),
+        'gaps': _gaps_from_diffs(diff_columns),
+        'jo_pairs': _jo_pairs_from_columns(columns, jos)
+    }
+
+
+def decode_gap_sequence(code):
+    """간격 시퀀스 코드를 (간격1, 간격2, 간격3) 튜플로 복원"""
+    return tuple(int(code) // int(weight) % 10 for weight in GAP_SEQUENCE_WEIGHTS)
+
+
+def companion_tensor(digits, chunk_size=COMPANION_CHUNK_SIZE):
+    """자리별 숫자 동반 출현 횟수 텐서 계산
+
+    tensor[i, a, j, b]는 i자리가 a, j자리가 b였던 회차 수이며 같은 자리(i == j)는 0이다.
+    원-핫 행렬(N×60)의 전치곱으로 계산하므로 회차 수와 무관하게 Python 루프가 없다.
+    """
+    digits = np.asarray(digits, dtype=np.int8)
+    identity = np.eye(10, dtype=np.float32)
+    counts = np.zeros((NUM_POSITIONS * 10, NUM_POSITIONS * 10), dtype=np.int64)
+
+    for start in range(0, len(digits), chunk_size):
+        one_hot = identity[digits[start:start + chunk_size]].reshape(-1, NUM_POSITIONS * 10)
+        counts += (one_hot.T @ one_hot).astype(np.int64)
+
+    tensor = counts.reshape(NUM_POSITIONS, 10, NUM_POSITIONS, 10)
+    positions = np.arange(NUM_POSITIONS)
+    tensor[positions, :, positions, :] = 0
+    return tensor
+
+
+def companion_position_matrix(tensor, position):
+    """기준 자리(0부터)의 숫자 × 다른 자리 동반 숫자 합계 행렬(10×10)"""
+    return np.asarray(tensor)[position].sum(axis=1)
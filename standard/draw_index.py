@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 당첨번호 색인 모듈
+- 회차별 1등 번호를 정수 하나(조 * 10^6 + 번호)로 부호화
+- 부호를 정렬한 배열과 같은 순서의 회차 배열을 한 번만 생성
+- 출현 여부, 반복 횟수, 첫/마지막 출현 회차를 searchsorted로 조회
+- 중복 출현 번호는 정렬된 부호 배열의 구간 길이(np.unique의 return_counts와 동일)로 검출
+"""
+
+import numpy as np
+import pandas as pd
+
+NUMBER_BASE = 10 ** 6
+
+
+def encode_draws(jos, numbers):
+    """조와 6자리 번호를 정수 부호(조 * 10^6 + 번호)로 변환"""
+    return np.asarray(jos, dtype=np.int64) * NUMBER_BASE + np.asarray(numbers, dtype=np.int64)
+
+
+def decode_draws(codes):
+    """정수 부호를 (조, 번호) 배열로 변환"""
+    return np.divmod(np.asarray(codes, dtype=np.int64), NUMBER_BASE)
+
+
+class DrawIndex:
+    """정렬된 당첨번호 부호 배열로 번호별 출현 이력을 조회"""
+
+    def __init__(self, jos, numbers, rounds):
+        codes = encode_draws(jos, numbers)
+        rounds = np.asarray(rounds, dtype=np.int64)
+
+        # 부호 오름차순, 같은 부호 안에서는 회차 오름차순
+        # (부호와 회차를 정수 하나로 합쳐 정렬하면 lexsort보다 빠르며, 넘칠 수 있으면 lexsort 사용)
+        first_round = int(rounds.min(initial=0))
+        span = int(rounds.max(initial=0)) - first_round + 1
+        if len(codes) and int(codes.max()) < np.iinfo(np.int64).max // span - 1:
+            self.codes, self.rounds = np.divmod(np.sort(codes * span + (rounds - first_round)), span)
+            self.rounds += first_round
+        else:
+            order = np.lexsort((rounds, codes))
+            self.codes = codes[order]
+            self.rounds = rounds[order]
+
+    @classmethod
+    def from_dataframe(cls, data):
+        """분석기 데이터프레임(round, jo, first_number)에서 생성 (번호가 없는 회차는 제외)"""
+        numbers = pd.to_numeric(data['first_number'], errors='coerce').to_numpy(dtype=np.float64)
+        valid = np.isfinite(numbers) & (numbers >= 0) & (numbers < NUMBER_BASE)
+        return cls(data['jo'].to_numpy()[valid], numbers[valid], data['round'].to_numpy()[valid])
+
+    def __len__(self):
+        return len(self.codes)
+
+    def find(self, jos, numbers):
+        """번호별 정렬 배열 구간 [start, end) (배열 입력 가능)"""
+        codes = encode_draws(jos, numbers)
+        return (np.searchsorted(self.codes, codes, side='left'),
+                np.searchsorted(self.codes, codes, side='right'))
+
+    def counts(self, jos, numbers):
+        """번호별 출현 횟수 (배열 입력 가능)"""
+        start, end = self.find(jos, numbers)
+        return end - start
+
+    def contains(self, jos, numbers):
+        """번호별 출현 여부 (배열 입력 가능)"""
+        return self.counts(jos, numbers) > 0
+
+    def lookup(self, jo, number):
+        """번호 하나의 출현 이력 (출현 횟수, 첫/마지막 출현 회차, 출현 회차 목록)"""
+        start, end = (int(bound) for bound in self.find(jo, number))
+        rounds = self.rounds[start:end].tolist()
+
+        return {
+            'jo': int(jo),
+            'number': f'{int(number):06d}',
+            'drawn': end > start,
+            'count': end - start,
+            'first_round': rounds[0] if rounds else None,
+            'last_round': rounds[-1] if rounds else None,
+            'rounds': rounds
+        }
+
+    def duplicates(self, min_count=2):
+        """min_count회 이상 출현한 번호의 (부호, 출현 횟수) 배열 (출현 횟수 내림차순)
+
+        부호 배열이 이미 정렬되어 있으므로 np.unique(..., return_counts=True)와 같은 결과를
+        다시 정렬하지 않고 값이 바뀌는 위치만으로 구한다.
+        """
+        starts = np.flatnonzero(np.diff(self.codes, prepend=-1))
+        codes = self.codes[starts]
+        counts = np.diff(starts, append=len(self.codes))
+        selected = counts >= min_count
+        codes, counts = codes[selected], counts[selected]
+
+        order = np.argsort(-counts, kind='stable')
+        return codes[order], counts[order]
+
+    def duplicate_summary(self, min_count=2, limit=None):
+        """중복 출현 번호 목록 (번호별 출현 회차 포함)"""
+        codes, counts = self.duplicates(min_count)
+        if limit is not None:
+            codes, counts = codes[:limit], counts[:limit]
+
+        jos, numbers = decode_draws(codes)
+        return [self.lookup(jo, number) for jo, number in zip(jos.tolist(), numbers.tolist())]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 가법 통계의 정확한 귀무분포 모듈
+- 자리 숫자가 0~9 균등·독립이라고 가정할 때 자리별 값의 합으로 정해지는 통계
+  (숫자 합, 홀수 개수, 특정 숫자의 출현 개수)의 분포를 자리별 분포의 다항식 곱(np.convolve)으로 계산
+- 시뮬레이션이 없으므로 표본 오차와 캐시가 필요 없고, 분포 하나는 수 마이크로초에 계산됨
+- 관측 빈도에 기대 빈도, 카이제곱 적합도 검정(기대 빈도가 작은 양 끝 구간은 병합), 정확한 꼬리 확률을 붙임
+"""
+
+import math
+from functools import reduce
+
+import numpy as np
+
+from digit_engine import NUM_POSITIONS
+
+DIGITS = np.arange(10)
+
+# 카이제곱 검정에서 구간별 최소 기대 빈도 (작은 구간은 이웃 구간과 병합)
+MIN_EXPECTED = 5.0
+
+
+def position_pmf(digit_values):
+    """한 자리의 값 분포 (digit_values[d] = 숫자 d일 때의 값, 숫자는 0~9 균등)"""
+    return np.bincount(np.asarray(digit_values, dtype=np.int64), minlength=1) / 10.0
+
+
+def additive_pmf(position_pmfs):
+    """자리별 값 분포들의 합의 분포 (확률생성함수의 곱 = 분포의 합성곱)"""
+    return reduce(np.convolve, position_pmfs)
+
+
+def digit_sum_pmf(positions=NUM_POSITIONS):
+    """숫자 합의 분포 (0 ~ 9*positions)"""
+    return additive_pmf([position_pmf(DIGITS)] * positions)
+
+
+def odd_count_pmf(positions=NUM_POSITIONS):
+    """홀수 개수의 분포 (0 ~ positions)"""
+    return additive_pmf([position_pmf(DIGITS & 1)] * positions)
+
+
+def digit_count_pmf(digit, positions=NUM_POSITIONS):
+    """특정 숫자 digit이 나타나는 자리 수의 분포 (0 ~ positions)"""
+    return additive_pmf([position_pmf(DIGITS == digit)] * positions)
+
+
+def tail_probabilities(pmf):
+    """값별 아래쪽 꼬리 P(X <= k)와 위쪽 꼬리 P(X >= k)"""
+    pmf = np.asarray(pmf, dtype=np.float64)
+    lower = np.minimum(np.cumsum(pmf), 1.0)
+    upper = np.minimum(np.cumsum(pmf[::-1])[::-1], 1.0)
+    return lower, upper
+
+
+def chi_square_sf(statistic, df):
+    """자유도 df인 카이제곱 분포의 위쪽 꼬리 확률 P(X >= statistic)
+
+    Q(x; k + 2) = Q(x; k) + (x/2)^(k/2) e^(-x/2) / Γ(k/2 + 1) 점화식을
+    Q(x; 1) = erfc(√(x/2)), Q(x; 2) = e^(-x/2)에서 시작하여 계산한다.
+    """
+    if df <= 0:
+        return 1.0
+    if statistic <= 0:
+        return 1.0
+
+    half = statistic / 2.0
+    k = 2 - df % 2
+    survival = math.exp(-half) if k == 2 else math.erfc(math.sqrt(half))
+    while k < df:
+        survival += math.exp((k / 2.0) * math.log(half) - half - math.lgamma(k / 2.0 + 1))
+        k += 2
+    return min(max(survival, 0.0), 1.0)
+
+
+def pool_bins(observed, expected, min_expected=MIN_EXPECTED):
+    """기대 빈도가 min_expected 이상이 되도록 앞에서부터 인접 구간을 병합 (남은 꼬리는 마지막 구간에 병합)"""
+    pooled_observed, pooled_expected = [], []
+    observed_sum = expected_sum = 0.0
+
+    for o, e in zip(observed, expected):
+        observed_sum += o
+        expected_sum += e
+        if expected_sum >= min_expected:
+            pooled_observed.append(observed_sum)
+            pooled_expected.append(expected_sum)
+            observed_sum = expected_sum = 0.0
+
+    if expected_sum > 0 or observed_sum > 0:
+        if pooled_expected:
+            pooled_observed[-1] += observed_sum
+            pooled_expected[-1] += expected_sum
+        else:
+            pooled_observed.append(observed_sum)
+            pooled_expected.append(expected_sum)
+
+    return np.array(pooled_observed), np.array(pooled_expected)
+
+
+def chi_square_test(observed_counts, pmf, min_expected=MIN_EXPECTED):
+    """값별 관측 빈도의 카이제곱 적합도 검정 (기대 빈도 = 전체 관측 수 × 확률)"""
+    observed_counts = np.asarray(observed_counts, dtype=np.float64)
+    pmf = np.asarray(pmf, dtype=np.float64)
+    size = max(len(observed_counts), len(pmf))
+    observed_counts = np.pad(observed_counts, (0, size - len(observed_counts)))
+    expected = np.pad(pmf, (0, size - len(pmf))) * observed_counts.sum()
+
+    observed, expected = pool_bins(observed_counts, expected, min_expected)
+    valid = expected > 0
+    statistic = float((((observed - expected) ** 2)[valid] / expected[valid]).sum())
+    # 기대 빈도가 0인 구간에 관측값이 있으면 분포와 맞지 않음
+    impossible = bool((observed[~valid] > 0).any())
+    df = int(valid.sum()) - 1
+
+    return {
+        'statistic': round(statistic, 4) if not impossible else None,
+        'df': df,
+        'p_value': round(chi_square_sf(statistic, df), 6) if not impossible else 0.0,
+        'pooled_bins': len(expected)
+    }
+
+
+def exact_test(observed_counts, pmf, latest=None):
+    """관측 빈도(인덱스 = 값)에 기대 빈도·꼬리 확률·카이제곱 검정을 붙인 결과 (JSON 저장용)
+
+    latest가 주어지면 그 값(예: 최신 회차의 통계값)의 정확한 꼬리 확률도 함께 기록한다.
+    """
+    observed_counts = np.asarray(observed_counts, dtype=np.int64)
+    pmf = np.asarray(pmf, dtype=np.float64)
+    total = int(observed_counts.sum())
+    lower, upper = tail_probabilities(pmf)
+    values = np.arange(len(pmf))
+    observed = np.pad(observed_counts, (0, max(len(pmf) - len(observed_counts), 0)))
+
+    result = {
+        'total': total,
+        'observed_mean': round(float(np.arange(len(observed)) @ observed) / total, 4) if total else None,
+        'expected_mean': round(float(values @ pmf), 4),
+        'distribution': {
+            str(value): {
+                'observed': int(observed[value]),
+                'expected': round(float(pmf[value]) * total, 4),
+                'probability': round(float(pmf[value]), 6),
+                'lower_tail': round(float(lower[value]), 6),
+                'upper_tail': round(float(upper[value]), 6)
+            }
+            for value in values.tolist() if pmf[value] > 0 or observed[value] > 0
+        },
+        'chi_square': chi_square_test(observed_counts, pmf) if total else None
+    }
+
+    if latest is not None:
+        latest = int(latest)
+        inside = 0 <= latest < len(pmf)
+        result['latest'] = {
+            'value': latest,
+            'lower_tail': round(float(lower[latest]), 6) if inside else float(latest >= len(pmf)),
+            'upper_tail': round(float(upper[latest]), 6) if inside else float(latest < 0)
+        }
+
+    return result
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 번호 특성 조회 테이블 모듈
+- 6자리 번호 공간(000000~999999) 전체에 대해 번호의 순수 함수인 특성을 한 번만 계산
+  (홀수 개수, 홀짝 패턴 코드, 최대 연속 길이, 연속 숫자 개수, 간격 시퀀스 코드, 최대/최소 간격, 간격 합,
+   숫자 합, 반복 숫자 개수)
+- 특성별 길이 10^6 배열을 .npy로 저장하고 메모리 매핑으로 읽어, 회차별 특성은 번호 배열 인덱싱 한 번으로 조회
+- 테이블을 bincount하면 균등 추첨 가정에서의 특성별 정확한 이론 분포를 바로 얻음
+
+사용법: python feature_tables.py [--type 720] [--dir analysis_state/feature_tables] [--rebuild]
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from digit_engine import build_digit_matrix, parity_patterns, consecutive_runs, gap_statistics, GAP_SEQUENCE_WEIGHTS
+
+NUMBER_SPACE = 10 ** 6
+DEFAULT_TABLE_DIR = os.path.join('analysis_state', 'feature_tables')
+
+# 특성 이름: (설명, 저장 dtype) - 정의를 바꿀 때는 이름도 바꿔 이전 테이블을 재사용하지 않도록 한다
+FEATURES = {
+    'odd_count': ('홀수 개수', np.int8),
+    'parity_code': ('홀짝 패턴 코드 (1자리가 최상위 비트, 홀수=1)', np.int8),
+    'max_consecutive_length': ('최대 연속 숫자 길이', np.int8),
+    'total_consecutive': ('연속 숫자 개수', np.int8),
+    'gap_sequence_code': ('앞 3개 간격 시퀀스 코드 (000~999)', np.int16),
+    'max_gap': ('인접 자리 최대 간격', np.int8),
+    'min_gap': ('인접 자리 최소 간격', np.int8),
+    'gap_sum': ('인접 자리 간격 합', np.int8),
+    'digit_sum': ('숫자 합', np.int8),
+    'repeat_count': ('반복 숫자 개수 (6 - 서로 다른 숫자 수)', np.int8)
+}
+
+
+def compute_features(digits):
+    """N×6 숫자 행렬에서 특성별 배열 계산 (테이블 생성과 검증에 사용)"""
+    codes, odd_counts = parity_patterns(digits)
+    runs = consecutive_runs(digits)
+    gaps = gap_statistics(digits)
+    sorted_digits = np.sort(digits, axis=1)
+
+    values = {
+        'odd_count': odd_counts,
+        'parity_code': codes,
+        'max_consecutive_length': runs['max_consecutive_length'],
+        'total_consecutive': runs['total_consecutive'],
+        'gap_sequence_code': gaps['gaps'][:, :len(GAP_SEQUENCE_WEIGHTS)] @ GAP_SEQUENCE_WEIGHTS,
+        'max_gap': gaps['max_gap'],
+        'min_gap': gaps['min_gap'],
+        'gap_sum': gaps['gap_sum'],
+        'digit_sum': digits.sum(axis=1, dtype=np.int64),
+        'repeat_count': (np.diff(sorted_digits, axis=1) == 0).sum(axis=1)
+    }
+    return {name: np.asarray(values[name]).astype(dtype) for name, (_, dtype) in FEATURES.items()}
+
+
+def build_feature_tables(directory=DEFAULT_TABLE_DIR):
+    """번호 공간 전체의 특성 테이블을 계산하여 특성별 .npy 파일로 저장"""
+    os.makedirs(directory, exist_ok=True)
+    tables = compute_features(build_digit_matrix(np.arange(NUMBER_SPACE)))
+    for name, table in tables.items():
+        np.save(os.path.join(directory, f'{name}.npy'), table)
+    return tables
+
+
+class FeatureTables:
+    """특성 테이블 묶음 (필요한 특성만 메모리 매핑으로 읽고, 없으면 한 번 생성)"""
+
+    def __init__(self, directory=DEFAULT_TABLE_DIR):
+        self.directory = directory
+        self.tables = {}
+
+    def path(self, name):
+        """특성 테이블 파일 경로"""
+        return os.path.join(self.directory, f'{name}.npy')
+
+    def __getitem__(self, name):
+        """특성 테이블 (길이 10^6, 읽기 전용 메모리 매핑)"""
+        if name not in FEATURES:
+            raise KeyError(f"알 수 없는 특성입니다: {name}")
+
+        if name not in self.tables:
+            if not os.path.exists(self.path(name)):
+                build_feature_tables(self.directory)
+            table = np.load(self.path(name), mmap_mode='r')
+            if table.shape != (NUMBER_SPACE,):
+                # 손상되었거나 다른 정의의 파일이면 다시 생성
+                build_feature_tables(self.directory)
+                table = np.load(self.path(name), mmap_mode='r')
+            self.tables[name] = table
+        return self.tables[name]
+
+    def gather(self, numbers, names=None):
+        """번호 배열의 특성을 테이블 인덱싱으로 조회 ({특성 이름: 배열})"""
+        numbers = np.asarray(numbers, dtype=np.int64)
+        if len(numbers) and (numbers.min() < 0 or numbers.max() >= NUMBER_SPACE):
+            raise ValueError("번호는 000000~999999 사이여야 합니다.")
+        return {name: self[name][numbers] for name in (names or FEATURES)}
+
+    def distribution(self, name):
+        """균등 추첨 가정에서 특성의 정확한 분포 (값별 번호 수, 인덱스 = 특성 값)"""
+        return np.bincount(self[name])
+
+
+def compare_with_theory(tables, numbers):
+    """실제 당첨번호의 특성 분포와 이론 분포 비교 (값별 관측 횟수, 기대 횟수, 평균)"""
+    gathered = tables.gather(numbers)
+    total = len(numbers)
+
+    results = {}
+    for name, (label, _) in FEATURES.items():
+        theory = tables.distribution(name)
+        observed = np.bincount(gathered[name], minlength=len(theory))
+        values = np.flatnonzero(theory | observed[:len(theory)])
+        results[name] = {
+            'label': label,
+            'observed_mean': round(float(gathered[name].mean()), 4) if total else None,
+            'theoretical_mean': round(float(np.arange(len(theory)) @ theory / NUMBER_SPACE), 4),
+            'distribution': {
+                str(value): {
+                    'probability': round(float(theory[value]) / NUMBER_SPACE, 6),
+                    'expected': round(float(theory[value]) * total / NUMBER_SPACE, 2),
+                    'observed': int(observed[value])
+                }
+                for value in values.tolist()
+            }
+        }
+    return results
+
+
+def main():
+    """메인 함수"""
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    directory = DEFAULT_TABLE_DIR
+    rebuild = False
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--dir' and i + 1 < len(sys.argv):
+            directory = sys.argv[i + 1]
+        elif arg == '--rebuild':
+            rebuild = True
+
+    if rebuild:
+        build_feature_tables(directory)
+        print(f"특성 테이블 {len(FEATURES)}개를 {directory}/에 생성했습니다.")
+
+    data_file = f'lottery_data/pension_lottery_{lottery_type}_all.csv'
+    try:
+        data = pd.read_csv(data_file, encoding='utf-8')
+    except FileNotFoundError:
+        print(f"❌ 데이터 파일을 찾을 수 없습니다: {data_file}")
+        sys.exit(1)
+
+    numbers = pd.to_numeric(data['first_number'], errors='coerce').dropna().to_numpy(dtype=np.int64)
+    results = {
+        'analysis_info': {
+            'lottery_type': lottery_type,
+            'total_rounds': len(numbers),
+            'number_space': NUMBER_SPACE,
+            'analysis_date': datetime.now().isoformat()
+        },
+        'features': compare_with_theory(FeatureTables(directory), numbers)
+    }
+
+    os.makedirs('analysis_results', exist_ok=True)
+    with open('analysis_results/feature_distributions.json', 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print(f"=== 연금복권{lottery_type} {len(numbers)}회차 번호 특성 (실제 평균 vs 이론 평균) ===")
+    for item in results['features'].values():
+        print(f"  {item['label']}: {item['observed_mean']} vs {item['theoretical_mean']}")
+    print("\n결과 파일: analysis_results/feature_distributions.json")
+
+
+if __name__ == "__main__":
+    main()
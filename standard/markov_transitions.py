@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 회차 간 전이 행렬 모듈
+- 자리별로 t회차 숫자 -> t+1회차 숫자 전이 횟수(6×10×10)를 이전*10 + 다음 코드의 bincount 한 번으로 집계
+- 조(1~5)의 회차 간 전이 횟수(5×5)도 같은 방식으로 집계
+- 전이 횟수는 합산 가능한 충분통계이므로 새 회차는 직전 회차와의 전이만 더해 갱신
+- 행 정규화한 전이 확률 행렬의 거듭제곱으로 n회차 후 전이 확률 계산
+"""
+
+import numpy as np
+
+from digit_engine import NUM_POSITIONS, NUM_DIGITS, NUM_JOS
+
+
+def position_transition_counts(digits):
+    """N×6 숫자 행렬의 연속 회차 사이 자리별 전이 횟수 (6×10×10, [자리, 이전 숫자, 다음 숫자])"""
+    digits = np.asarray(digits, dtype=np.int64)
+    codes = (np.arange(NUM_POSITIONS) * NUM_DIGITS * NUM_DIGITS + digits[:-1] * NUM_DIGITS + digits[1:])
+    counts = np.bincount(codes.ravel(), minlength=NUM_POSITIONS * NUM_DIGITS * NUM_DIGITS)
+    return counts.reshape(NUM_POSITIONS, NUM_DIGITS, NUM_DIGITS)
+
+
+def jo_transition_counts(jos):
+    """조 배열의 연속 회차 사이 전이 횟수 (5×5, [이전 조 - 1, 다음 조 - 1], 범위 밖 조가 낀 전이는 제외)"""
+    states = np.asarray(jos, dtype=np.int64) - 1
+    previous, following = states[:-1], states[1:]
+    valid = (previous >= 0) & (previous < NUM_JOS) & (following >= 0) & (following < NUM_JOS)
+    counts = np.bincount(previous[valid] * NUM_JOS + following[valid], minlength=NUM_JOS * NUM_JOS)
+    return counts.reshape(NUM_JOS, NUM_JOS)
+
+
+def transition_matrix(counts):
+    """전이 횟수를 행 정규화한 전이 확률 행렬 (전이가 없는 행은 균등 분포, 여러 행렬을 쌓은 배열 가능)"""
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=-1, keepdims=True)
+    uniform = np.full_like(counts, 1.0 / counts.shape[-1])
+    return np.divide(counts, totals, out=uniform, where=totals > 0)
+
+
+def n_step_matrix(matrix, steps):
+    """n회차 후 전이 확률 행렬 (전이 확률 행렬의 n제곱, 여러 행렬을 쌓은 배열 가능)"""
+    return np.linalg.matrix_power(np.asarray(matrix, dtype=np.float64), int(steps))
+
+
+def stationary_distribution(matrix):
+    """전이 확률 행렬의 정상 분포 (고윳값 1의 왼쪽 고유벡터, 여러 행렬을 쌓은 배열 가능)"""
+    eigenvalues, eigenvectors = np.linalg.eig(np.swapaxes(np.asarray(matrix, dtype=np.float64), -1, -2))
+    index = np.argmin(np.abs(eigenvalues - 1.0), axis=-1)
+    vectors = np.real(np.take_along_axis(eigenvectors, index[..., None, None], axis=-1)[..., 0])
+    return vectors / vectors.sum(axis=-1, keepdims=True)
+
+
+def next_distributions(position_counts, jo_counts, latest_digits, latest_jo, steps=1):
+    """최신 회차의 자리별 숫자·조에서 출발한 steps회차 후 숫자·조 확률 분포"""
+    position_matrices = n_step_matrix(transition_matrix(position_counts), steps)
+    jo_matrix = n_step_matrix(transition_matrix(jo_counts), steps)
+
+    return {
+        'digits': position_matrices[np.arange(NUM_POSITIONS), np.asarray(latest_digits, dtype=np.int64)],
+        'jo': jo_matrix[int(latest_jo) - 1] if 1 <= int(latest_jo) <= NUM_JOS else None
+    }
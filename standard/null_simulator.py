@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 패턴 통계 귀무분포 시뮬레이터
+- 조(1~5)와 6자리 번호가 균등 무작위로 추첨된다고 가정하고 실제와 같은 회차 수의 이력을 대량 생성
+- 이력 여러 개를 하나의 숫자 행렬로 묶어(배치) 패턴·번호 분석과 같은 통계를 벡터 연산으로 계산
+  (회차별 홀짝·연속·간격 특성은 번호 특성 테이블에서 인덱싱으로 조회)
+- 배치마다 독립된 난수 스트림(SeedSequence.spawn)을 배정하여 프로세스 풀에서 병렬 생성
+  (배치 구성과 난수 스트림은 작업 수와 무관하므로 같은 시드는 항상 같은 결과)
+- 실제 통계값 옆에 귀무분포의 백분위수와 양측 p-value를 함께 보고
+- 시뮬레이션 결과는 (회차 수, 시드)별 파일로 저장하여 재사용
+
+사용법: python null_simulator.py [--type 720] [--simulations 10000] [--seed 0] [--workers N] [--refresh]
+"""
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from digit_engine import (build_digit_matrix, parity_patterns, consecutive_runs, gap_statistics,
+                          NUM_POSITIONS, NUM_JOS, NUM_GAPS, PARITY_PATTERN_BINS, POSITION_SCALES)
+from feature_tables import FeatureTables, DEFAULT_TABLE_DIR
+
+DEFAULT_SIMULATIONS = 10000
+DEFAULT_SEED = 0
+
+# 배치 하나에 담을 최대 회차 수 (이력 수 = BATCH_ROWS // 이력 길이)
+BATCH_ROWS = 1 << 18
+
+# 통계 이름: 설명 (pattern_analysis_summary.json, number_analysis_summary.json의 항목과 같은 정의)
+STATISTICS = {
+    'odd_even.avg_odd_count': '평균 홀수 개수',
+    'odd_even.total_patterns': '홀짝 패턴 종류 수',
+    'consecutive.probability': '연속 숫자가 나올 확률(%)',
+    'consecutive.avg_count': '평균 연속 숫자 개수',
+    'consecutive.max_in_round': '한 회차 최대 연속 숫자 개수',
+    'gaps.avg_max_gap': '평균 최대 간격',
+    'gaps.avg_min_gap': '평균 최소 간격',
+    'gaps.overall_avg_gap': '전체 평균 간격',
+    **{f'frequency.max_count.자리{pos + 1}': f'자리{pos + 1} 최다 출현 숫자의 출현 횟수' for pos in range(NUM_POSITIONS)},
+    'jo.max_count': '최다 출현 조의 출현 횟수'
+}
+STATISTIC_NAMES = list(STATISTICS)
+
+PERCENTILES = [2.5, 50, 97.5]
+
+# 이력 통계 계산에 필요한 회차별 특성
+ROW_FEATURES = ['parity_code', 'odd_count', 'total_consecutive', 'max_gap', 'min_gap', 'gap_sum']
+
+
+def row_features(digits, tables=None):
+    """회차별 특성 (tables가 있으면 번호 특성 테이블에서 조회, 없으면 숫자 행렬에서 계산)"""
+    if tables is not None:
+        return tables.gather(digits @ POSITION_SCALES, ROW_FEATURES)
+
+    codes, odd_counts = parity_patterns(digits)
+    runs = consecutive_runs(digits)
+    gaps = gap_statistics(digits)
+    return {
+        'parity_code': codes,
+        'odd_count': odd_counts,
+        'total_consecutive': runs['total_consecutive'],
+        'max_gap': gaps['max_gap'],
+        'min_gap': gaps['min_gap'],
+        'gap_sum': gaps['gap_sum']
+    }
+
+
+def history_statistics(digits, jos, num_histories=1, tables=None):
+    """같은 길이의 이력 num_histories개를 이어 붙인 숫자 행렬(H*N×6)과 조 배열에서 이력별 통계(H×S)"""
+    digits = np.asarray(digits, dtype=np.int8)
+    jos = np.asarray(jos, dtype=np.int64)
+    length = len(digits) // num_histories
+    history = np.repeat(np.arange(num_histories, dtype=np.int64), length)
+
+    def per_history(values):
+        return np.asarray(values).reshape(num_histories, length)
+
+    features = row_features(digits, tables)
+    totals = per_history(features['total_consecutive'])
+
+    # 이력별 홀짝 패턴 종류 수, 자리별 숫자 빈도, 조 빈도를 이력 번호를 더한 코드의 bincount로 집계
+    patterns_seen = np.bincount(history * PARITY_PATTERN_BINS + features['parity_code'],
+                                minlength=num_histories * PARITY_PATTERN_BINS)
+    position_codes = (history[:, None] * (NUM_POSITIONS * 10) + np.arange(NUM_POSITIONS) * 10 + digits).ravel()
+    position_counts = np.bincount(position_codes, minlength=num_histories * NUM_POSITIONS * 10)
+    jo_counts = np.bincount(history * (NUM_JOS + 1) + jos, minlength=num_histories * (NUM_JOS + 1))
+
+    columns = [
+        per_history(features['odd_count']).mean(axis=1),
+        np.count_nonzero(patterns_seen.reshape(num_histories, -1), axis=1),
+        (totals > 0).mean(axis=1) * 100,
+        totals.mean(axis=1),
+        totals.max(axis=1),
+        per_history(features['max_gap']).mean(axis=1),
+        per_history(features['min_gap']).mean(axis=1),
+        per_history(features['gap_sum']).mean(axis=1) / NUM_GAPS,
+        *position_counts.reshape(num_histories, NUM_POSITIONS, 10).max(axis=2).T,
+        jo_counts.reshape(num_histories, -1).max(axis=1)
+    ]
+    return np.column_stack(columns).astype(np.float64)
+
+
+def histories_per_batch(length):
+    """이력 길이에 따른 배치당 이력 수 (시드별 결과가 같도록 길이에만 의존)"""
+    return max(1, BATCH_ROWS // max(length, 1))
+
+
+def simulate_batch(seed_sequence, num_histories, length, table_dir=None):
+    """독립 난수 스트림 하나로 균등 무작위 이력 num_histories개를 생성하여 통계 계산"""
+    rng = np.random.default_rng(seed_sequence)
+    digits = rng.integers(0, 10, size=(num_histories * length, NUM_POSITIONS), dtype=np.int8)
+    jos = rng.integers(1, NUM_JOS + 1, size=num_histories * length)
+    tables = FeatureTables(table_dir) if table_dir else None
+    return history_statistics(digits, jos, num_histories, tables)
+
+
+def simulate_null(length, simulations, seed=DEFAULT_SEED, workers=1, table_dir=DEFAULT_TABLE_DIR):
+    """회차 수 length인 균등 무작위 이력 simulations개의 통계 (simulations×S)
+
+    배치는 항상 가득 채워 생성한 뒤 필요한 수만큼 자르므로,
+    같은 시드에서 적게 생성한 결과는 많이 생성한 결과의 앞부분과 같다.
+    table_dir이 None이면 특성 테이블 대신 숫자 행렬에서 직접 계산한다 (결과는 동일).
+    """
+    batch_size = histories_per_batch(length)
+    num_batches = -(-simulations // batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(num_batches)
+
+    if table_dir:
+        # 작업 프로세스가 동시에 테이블을 만들지 않도록 미리 준비
+        tables = FeatureTables(table_dir)
+        for name in ROW_FEATURES:
+            tables[name]
+
+    if workers > 1 and num_batches > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batches = list(executor.map(simulate_batch, seeds, [batch_size] * num_batches,
+                                        [length] * num_batches, [table_dir] * num_batches))
+    else:
+        batches = [simulate_batch(seed_sequence, batch_size, length, table_dir) for seed_sequence in seeds]
+
+    if not batches:
+        return np.zeros((0, len(STATISTIC_NAMES)))
+    return np.concatenate(batches)[:simulations]
+
+
+def null_distribution(length, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED, workers=1,
+                      cache_dir='analysis_state', refresh=False):
+    """(회차 수, 시드)별 캐시 파일을 재사용하는 귀무분포 (simulations×S)
+
+    캐시에 요청보다 많은 시뮬레이션이 있으면 앞부분만 사용하고, 부족하거나 통계 목록이 바뀌었으면 다시 생성한다.
+    반환값: (통계 배열, 캐시 사용 여부)
+    """
+    path = os.path.join(cache_dir, f'null_distribution_{length}_{seed}.npz')
+
+    if not refresh and os.path.exists(path):
+        with np.load(path, allow_pickle=False) as cached:
+            if cached['names'].tolist() == STATISTIC_NAMES and len(cached['statistics']) >= simulations:
+                return cached['statistics'][:simulations], True
+
+    statistics = simulate_null(length, simulations, seed, workers)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez(path, statistics=statistics, names=np.array(STATISTIC_NAMES))
+    return statistics, False
+
+
+def compare_with_null(observed, null):
+    """실제 통계값과 귀무분포 비교 (백분위수, 실제 값의 백분위 순위, 양측 p-value)
+
+    p-value는 시뮬레이션 값이 실제 값 이상(이하)인 비율 중 작은 쪽의 2배이며,
+    시뮬레이션 수가 유한하므로 (개수 + 1) / (시뮬레이션 수 + 1)로 계산한다.
+    """
+    simulations = len(null)
+    greater = (null >= observed).sum(axis=0)
+    less = (null <= observed).sum(axis=0)
+    p_values = np.minimum(1.0, 2 * (np.minimum(greater, less) + 1) / (simulations + 1))
+    percentiles = np.percentile(null, PERCENTILES, axis=0)
+
+    return {
+        name: {
+            'label': STATISTICS[name],
+            'observed': round(float(observed[i]), 4),
+            'null_mean': round(float(null[:, i].mean()), 4),
+            'null_std': round(float(null[:, i].std()), 4),
+            'percentiles': {str(q): round(float(value), 4) for q, value in zip(PERCENTILES, percentiles[:, i])},
+            'observed_percentile': round(float(less[i]) / simulations * 100, 2),
+            'p_value': round(float(p_values[i]), 4)
+        }
+        for i, name in enumerate(STATISTIC_NAMES)
+    }
+
+
+def load_history(data_file):
+    """크롤링 CSV 파일에서 (조 배열, 1등 번호 숫자 행렬) (분석기와 같은 정제 규칙 적용)"""
+    data = pd.read_csv(data_file, encoding='utf-8')
+    data['round'] = pd.to_numeric(data['round'], errors='coerce')
+    data['jo'] = pd.to_numeric(data['jo'], errors='coerce')
+    data = data.dropna(subset=['round', 'jo'])
+    return data['jo'].to_numpy(dtype=np.int64), build_digit_matrix(data['first_number'])
+
+
+def run_null_comparison(lottery_type='720', simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED, workers=1,
+                        refresh=False, results_dir='analysis_results'):
+    """실제 이력의 통계를 같은 회차 수의 귀무분포와 비교하여 null_distribution.json으로 저장"""
+    jos, digits = load_history(f'lottery_data/pension_lottery_{lottery_type}_all.csv')
+    if len(digits) == 0:
+        raise ValueError("분석할 회차 데이터가 없습니다.")
+    observed = history_statistics(digits, jos)[0]
+
+    started = time.perf_counter()
+    null, cached = null_distribution(len(digits), simulations, seed, workers, refresh=refresh)
+    seconds = time.perf_counter() - started
+
+    results = {
+        'analysis_info': {
+            'lottery_type': lottery_type,
+            'total_rounds': len(digits),
+            'simulations': len(null),
+            'seed': seed,
+            'cached': cached,
+            'seconds': round(seconds, 3),
+            'analysis_date': datetime.now().isoformat()
+        },
+        'statistics': compare_with_null(observed, null)
+    }
+
+    os.makedirs(results_dir, exist_ok=True)
+    with open(f'{results_dir}/null_distribution.json', 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    return results
+
+
+def main():
+    """메인 함수"""
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    simulations = DEFAULT_SIMULATIONS
+    seed = DEFAULT_SEED
+    workers = os.cpu_count() or 1
+    refresh = False
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--simulations' and i + 1 < len(sys.argv):
+            simulations = int(sys.argv[i + 1])
+        elif arg == '--seed' and i + 1 < len(sys.argv):
+            seed = int(sys.argv[i + 1])
+        elif arg == '--workers' and i + 1 < len(sys.argv):
+            workers = int(sys.argv[i + 1])
+        elif arg == '--refresh':
+            refresh = True
+
+    try:
+        results = run_null_comparison(lottery_type, simulations, seed, workers, refresh)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ 귀무분포 비교 실패: {e}")
+        sys.exit(1)
+
+    info = results['analysis_info']
+    source = "캐시 사용" if info['cached'] else f"작업 {workers}개로 생성"
+    print(f"=== 연금복권{lottery_type} {info['total_rounds']}회차 vs 균등 무작위 {info['simulations']:,}회 "
+          f"({source}, {info['seconds']:.2f}초) ===")
+    print(f"{'통계':<28} {'실제':>9} {'2.5%':>9} {'50%':>9} {'97.5%':>9} {'p-value':>9}")
+    for name, item in results['statistics'].items():
+        percentiles = item['percentiles']
+        print(f"{item['label']:<28} {item['observed']:>9.2f} {percentiles['2.5']:>9.2f} "
+              f"{percentiles['50']:>9.2f} {percentiles['97.5']:>9.2f} {item['p_value']:>9.4f}")
+    print("\n결과 파일: analysis_results/null_distribution.json")
+
+
+if __name__ == "__main__":
+    main()
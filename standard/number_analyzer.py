@@ -4,7 +4,11 @@
 연금복권 번호별 분석 스크립트 (수정된 버전)
 - 각 자리별 숫자 출현 빈도 분석
 - 동반 출현 패턴 분석
-- 번호별 트렌드 점수 계산
+- 번호별 트렌드 점수 계산 (구간 비율 또는 지수 감쇠)
+- 지수 감쇠 핫/콜드 점수 (새 회차만 O(60)으로 반영)
+- 자리별 숫자·조의 미출현 회차 수와 재출현 간격 분포 (새 회차만 O(1)로 반영)
+- 전체·자리별 숫자열 무작위성 검정 (균등성, 런, 연속 쌍, 간격, 포커)
+- 자리별·조 회차 간 전이 행렬 (n회차 후 전이 확률)
 - 상세 히트맵 생성
 """
 
@@ -15,11 +19,21 @@ import seaborn as sns
 import json
 import logging
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import Counter
 import os
 import sys
 import platform
 
+from digit_engine import build_digit_matrix, count_dict, companion_tensor, companion_position_matrix, NUM_POSITIONS
+from analysis_state import AnalysisState, row_keys, data_fingerprint, update_statistics
+from window_counts import RoundWindowCounts, number_trend_scores
+from exact_distributions import exact_test, chi_square_test, digit_count_pmf
+from markov_transitions import (position_transition_counts, jo_transition_counts, transition_matrix, n_step_matrix,
+                                stationary_distribution, next_distributions)
+from decay_scores import DecayScores, score_history, DEFAULT_HALF_LIFE
+from recurrence_tracker import RecurrenceTracker
+from randomness_tests import run_battery
+
 
 # 한글 폰트 설정
 def setup_matplotlib_font():
@@ -37,20 +51,48 @@ def setup_matplotlib_font():
 
 
 class NumberAnalyzer:
-    def __init__(self, lottery_type="720", data_file=None):
+    # 증분 분석 시 충분통계 병합 규칙
+    STATISTICS_RULES = {
+        'frequency.position_counts': 'sum',
+        'companion.tensor': 'sum',
+        'markov.position_counts': 'sum',
+        'markov.jo_counts': 'sum'
+    }
+
+    # 전이 확률을 기록할 n회차 후
+    MARKOV_STEPS = (1, 2, 5)
+
+    # 트렌드 점수 계산 방식 ('ratio': 최근/이전 구간 빈도 비율, 'decay': 지수 감쇠 점수)
+    TREND_METHODS = ('ratio', 'decay')
+
+    # 감쇠 점수 이력 차트에 표시할 최근 회차 수
+    DECAY_CHART_ROUNDS = 100
+
+    def __init__(self, lottery_type="720", data_file=None, trend_method='ratio', half_life=DEFAULT_HALF_LIFE):
         """번호 분석기 초기화"""
+        if trend_method not in self.TREND_METHODS:
+            raise ValueError(f"알 수 없는 트렌드 방식입니다: {trend_method} (가능: {', '.join(self.TREND_METHODS)})")
+
         self.lottery_type = lottery_type
+        self.trend_method = trend_method
+        self.half_life = float(half_life)
 
         if data_file is None:
             data_file = f'lottery_data/pension_lottery_{lottery_type}_all.csv'
 
         self.data_file = data_file
         self.data = None
+        self.digits = None  # N×6 자리 숫자 행렬 (load_data에서 한 번만 생성)
+        self.statistics = None  # 분석별 충분통계 (get_statistics에서 준비)
+        self.window_counts = None  # 회차 구간 빈도 누적 카운트 (get_window_counts에서 준비)
+        self.decay_scores = None  # 지수 감쇠 점수 상태 (get_decay_scores에서 준비)
+        self.recurrence_tracker = None  # 재출현 간격 추적 상태 (get_recurrence_tracker에서 준비)
         self.results_dir = 'analysis_results'
         self.charts_dir = 'charts'
+        self.state_dir = 'analysis_state'
 
         # 디렉토리 생성
-        for directory in [self.results_dir, self.charts_dir, 'logs']:
+        for directory in [self.results_dir, self.charts_dir, self.state_dir, 'logs']:
             try:
                 os.makedirs(directory, exist_ok=True)
             except PermissionError:
@@ -89,8 +131,7 @@ class NumberAnalyzer:
             self.data['round'] = self.data['round'].astype(int)
             self.data['jo'] = self.data['jo'].astype(int)
 
-            self.logger.info(f"데이터 로드 완료: {len(self.data)}개 회차")
-            return True
+            return self.use_data(self.data)
         except FileNotFoundError:
             self.logger.error(f"데이터 파일을 찾을 수 없습니다: {self.data_file}")
             return False
@@ -98,23 +139,62 @@ class NumberAnalyzer:
             self.logger.error(f"데이터 로드 실패: {e}")
             return False
 
+    def use_data(self, data):
+        """정제된 데이터프레임(round, jo, first_number, second_number)을 분석 대상으로 설정
+
+        공유 메모리 위의 데이터프레임도 복사 없이 그대로 사용한다.
+        """
+        self.data = data
+
+        # 1등 번호를 자리 숫자 행렬로 한 번만 변환
+        self.digits = build_digit_matrix(self.data['first_number'])
+        self.statistics = None
+        self.window_counts = None
+        self.decay_scores = None
+        self.recurrence_tracker = None
+
+        self.logger.info(f"데이터 로드 완료: {len(self.data)}개 회차")
+        return True
+
+    def compute_statistics(self, start=0):
+        """start번째 회차 이후 데이터의 충분통계 계산"""
+        digits = self.digits[start:]
+
+        # 회차 간 전이는 직전 회차부터 센다 (증분 계산 시 마지막 처리 회차 -> 첫 새 회차 전이 포함)
+        previous = max(start - 1, 0)
+
+        return {
+            'frequency.position_counts': np.array([np.bincount(column, minlength=10) for column in digits.T],
+                                                  dtype=np.int64).reshape(NUM_POSITIONS, 10),
+            'companion.tensor': companion_tensor(digits),
+            'markov.position_counts': position_transition_counts(self.digits[previous:]),
+            'markov.jo_counts': jo_transition_counts(self.data['jo'].to_numpy()[previous:])
+        }
+
+    def get_statistics(self, incremental=False):
+        """분석용 충분통계 준비
+
+        incremental이 True이면 상태 파일의 통계에 마지막 처리 회차 이후의 새 회차만 반영한다.
+        이전 회차 데이터가 바뀐 경우에는 전체를 다시 계산한다.
+        """
+        if self.statistics is None:
+            state = AnalysisState('number', self.lottery_type, self.state_dir)
+            self.statistics, mode = update_statistics(state, row_keys(self.data), self.compute_statistics,
+                                                      self.STATISTICS_RULES, incremental)
+            self.logger.info(f"번호 충분통계 준비 완료 ({mode}, 마지막 회차: {state.last_round})")
+        return self.statistics
+
     def analyze_number_frequency_by_position(self):
         """자리별 숫자 출현 빈도 분석"""
         self.logger.info("자리별 숫자 출현 빈도 분석 시작")
 
-        position_frequency = {}
+        position_counts = self.get_statistics()['frequency.position_counts']
 
-        for _, row in self.data.iterrows():
-            first_num = str(row['first_number']).zfill(6)
-
-            for pos, digit in enumerate(first_num, 1):
-                key = f"자리{pos}"
-                if key not in position_frequency:
-                    position_frequency[key] = defaultdict(int)
-                position_frequency[key][digit] += 1
-
-        # defaultdict를 일반 딕셔너리로 변환
-        position_frequency = {k: dict(v) for k, v in position_frequency.items()}
+        position_frequency = {}
+        if len(self.data):
+            for pos in range(NUM_POSITIONS):
+                position_frequency[f"자리{pos + 1}"] = {str(digit): count
+                                                      for digit, count in count_dict(position_counts[pos]).items()}
 
         # 결과 저장
         with open(f'{self.results_dir}/number_frequency.json', 'w', encoding='utf-8') as f:
@@ -124,30 +204,27 @@ class NumberAnalyzer:
         return position_frequency
 
     def analyze_companion_numbers(self):
-        """동반 출현 패턴 분석"""
-        self.logger.info("동반 출현 패턴 분석 시작")
-
-        companion_data = defaultdict(lambda: defaultdict(int))
+        """동반 출현 패턴 분석
 
-        for _, row in self.data.iterrows():
-            first_num = str(row['first_number']).zfill(6)
-            digits = [d for d in first_num]
+        자리별 숫자 동반 출현 횟수를 6×10×6×10 텐서로 계산하여
+        companion_tensor.npy로 저장하고, JSON에는 자리별 10×10 요약 행렬만 기록한다.
+        """
+        self.logger.info("동반 출현 패턴 분석 시작")
 
-            # 각 자리별로 다른 자리와의 동반 출현 분석
-            for i, digit_i in enumerate(digits, 1):
-                for j, digit_j in enumerate(digits, 1):
-                    if i != j:  # 같은 자리는 제외
-                        key_i = f"자리{i}_{digit_i}"
-                        key_j = f"자리{j}_{digit_j}"
-                        companion_data[key_i][key_j] += 1
+        tensor = self.get_statistics()['companion.tensor']
+        np.save(f'{self.results_dir}/companion_tensor.npy', tensor)
 
-        # defaultdict를 일반 딕셔너리로 변환
-        companion_data = {k: dict(v) for k, v in companion_data.items()}
+        # 한 번이라도 동반 출현한 (자리, 숫자) 조합 수
+        active_keys = int(np.count_nonzero(tensor.sum(axis=(2, 3))))
 
         results = {
-            'companion_data': companion_data,
+            'tensor_file': 'companion_tensor.npy',
+            'tensor_shape': list(tensor.shape),
+            'tensor_axes': ['기준 자리', '기준 숫자', '동반 자리', '동반 숫자'],
+            'position_matrices': {f'자리{pos + 1}': companion_position_matrix(tensor, pos).tolist()
+                                  for pos in range(NUM_POSITIONS)},
             'analysis_summary': {
-                'total_combinations': len(companion_data),
+                'total_combinations': active_keys,
                 'analysis_date': datetime.now().isoformat()
             }
         }
@@ -157,45 +234,116 @@ class NumberAnalyzer:
             json.dump(results, f, ensure_ascii=False, indent=2)
 
         self.logger.info("동반 출현 패턴 분석 완료")
-        return results
-
-    def calculate_number_trends(self):
-        """번호별 트렌드 점수 계산"""
-        self.logger.info("번호별 트렌드 점수 계산 시작")
-
-        trend_scores = {}
+        return dict(results, companion_tensor=tensor)
+
+    def get_window_counts(self):
+        """임의 회차 구간 빈도 질의용 누적 카운트 준비 (한 번만 생성)"""
+        if self.window_counts is None:
+            self.window_counts = RoundWindowCounts(self.digits, self.data['jo'].to_numpy(), self.data['round'].to_numpy())
+        return self.window_counts
+
+    def load_streaming_state(self, name, state_class, incremental=False, **settings):
+        """회차 순서대로 갱신되는 상태(extend/save/load 지원) 준비
+
+        incremental이 True이고 상태 파일이 현재 데이터의 앞부분에서 같은 설정(settings)으로 만들어졌으면
+        그 이후의 새 회차만 반영하고, 그렇지 않으면 state_class(**settings)에 전체 회차를 반영한다.
+        반환값: (상태, 처리 방식)
+        """
+        state_file = f'{self.state_dir}/{name}_{self.lottery_type}.npz'
+        keys = row_keys(self.data)
+        jos = self.data['jo'].to_numpy()
+        rounds = self.data['round'].to_numpy()
+
+        state, start, mode = None, 0, 'full'
+        if incremental and os.path.exists(state_file):
+            try:
+                stored, fingerprint = state_class.load(state_file)
+                if (all(getattr(stored, key) == value for key, value in settings.items())
+                        and stored.num_rounds <= len(self.data)
+                        and fingerprint == data_fingerprint(keys[:stored.num_rounds])):
+                    state, start = stored, stored.num_rounds
+                    mode = f'incremental (+{len(self.data) - start})'
+            except Exception as e:
+                self.logger.warning(f"{name} 상태 로드 실패, 전체 재계산: {e}")
+
+        if state is None:
+            state = state_class(**settings)
+        state.extend(self.digits[start:], jos[start:], rounds[start:])
+        state.save(state_file, data_fingerprint(keys))
+        return state, mode
+
+    def get_decay_scores(self, incremental=False):
+        """지수 감쇠 점수 상태 준비 (증분 모드에서는 같은 반감기의 저장 상태에 새 회차만 반영)"""
+        if self.decay_scores is None:
+            self.decay_scores, mode = self.load_streaming_state('decay_scores', DecayScores, incremental,
+                                                                half_life=self.half_life)
+            self.logger.info(f"감쇠 점수 준비 완료 ({mode}, 반감기 {self.half_life:g}회차)")
+        return self.decay_scores
+
+    def get_recurrence_tracker(self, incremental=False):
+        """미출현 회차·재출현 간격 추적 상태 준비 (증분 모드에서는 저장 상태에 새 회차만 반영)"""
+        if self.recurrence_tracker is None:
+            self.recurrence_tracker, mode = self.load_streaming_state('recurrence', RecurrenceTracker, incremental)
+            self.logger.info(f"재출현 간격 추적 준비 완료 ({mode})")
+        return self.recurrence_tracker
+
+    def analyze_recurrence_intervals(self, incremental=False):
+        """자리별 숫자·조의 미출현 회차 수와 재출현 간격 분석"""
+        self.logger.info("재출현 간격 분석 시작")
+
+        recurrence_data = self.get_recurrence_tracker(incremental).summary()
 
-        # 최근 30회차와 이전 30회차 비교
-        if len(self.data) < 60:
-            self.logger.warning("데이터가 부족하여 트렌드 분석을 건너뜁니다.")
-            return {}
+        # 결과 저장
+        with open(f'{self.results_dir}/recurrence_intervals.json', 'w', encoding='utf-8') as f:
+            json.dump(recurrence_data, f, ensure_ascii=False, indent=2)
+
+        self.logger.info("재출현 간격 분석 완료")
+        return recurrence_data
+
+    def calculate_decay_scores(self, incremental=False):
+        """지수 감쇠 핫/콜드 점수 계산 (100 = 균등 기대 빈도)"""
+        self.logger.info("지수 감쇠 점수 계산 시작")
+
+        scores = self.get_decay_scores(incremental)
+        _, jo_trends = scores.trend_scores()
+
+        decay_data = {
+            'half_life': scores.half_life,
+            'decay': round(scores.decay, 6),
+            'last_round': scores.last_round,
+            'num_rounds': scores.num_rounds,
+            'positions': scores.trend_dict(),
+            'jo': {f'{jo}조': round(float(jo_trends[jo - 1]), 2) for jo in range(1, len(jo_trends) + 1)},
+            'hot_cold': scores.hot_cold()
+        }
 
-        recent_data = self.data.tail(30)
-        previous_data = self.data.iloc[-60:-30]
+        # 결과 저장
+        with open(f'{self.results_dir}/decay_scores.json', 'w', encoding='utf-8') as f:
+            json.dump(decay_data, f, ensure_ascii=False, indent=2)
 
-        for pos in range(1, 7):
-            trend_scores[f'자리{pos}'] = {}
+        self.logger.info("지수 감쇠 점수 계산 완료")
+        return decay_data
 
-            # 최근 30회차 빈도
-            recent_freq = defaultdict(int)
-            for _, row in recent_data.iterrows():
-                digit = str(row['first_number']).zfill(6)[pos - 1]
-                recent_freq[digit] += 1
+    def calculate_number_trends(self, window=30, offset=0):
+        """번호별 트렌드 점수 계산
 
-            # 이전 30회차 빈도
-            previous_freq = defaultdict(int)
-            for _, row in previous_data.iterrows():
-                digit = str(row['first_number']).zfill(6)[pos - 1]
-                previous_freq[digit] += 1
+        trend_method가 'ratio'이면 최근 offset회차를 제외한 직전 window회차와 그 이전 window회차의 빈도를 비교하고,
+        'decay'이면 지수 감쇠 점수(같은 100 기준 눈금)를 사용한다.
+        """
+        self.logger.info(f"번호별 트렌드 점수 계산 시작 ({self.trend_method})")
 
-            # 트렌드 점수 계산
-            for digit in '0123456789':
-                recent_count = recent_freq[digit]
-                previous_count = previous_freq[digit] if previous_freq[digit] > 0 else 1
+        if self.trend_method == 'decay':
+            if len(self.data) == 0:
+                self.logger.warning("데이터가 없어 트렌드 분석을 건너뜁니다.")
+                return {}
+            trend_scores = self.get_decay_scores().trend_dict()
+        else:
+            # 최근 window회차와 이전 window회차 비교
+            if len(self.data) < 2 * window + offset:
+                self.logger.warning("데이터가 부족하여 트렌드 분석을 건너뜁니다.")
+                return {}
 
-                # 트렌드 점수 = (최근 빈도 / 이전 빈도) * 100
-                trend_score = (recent_count / previous_count) * 100
-                trend_scores[f'자리{pos}'][digit] = round(trend_score, 2)
+            trend_scores = number_trend_scores(self.get_window_counts(), window, offset)
 
         # 결과 저장
         with open(f'{self.results_dir}/number_trends.json', 'w', encoding='utf-8') as f:
@@ -204,6 +352,103 @@ class NumberAnalyzer:
         self.logger.info("번호별 트렌드 점수 계산 완료")
         return trend_scores
 
+    def analyze_markov_transitions(self, steps=MARKOV_STEPS):
+        """자리별·조 회차 간 전이 분석
+
+        전이 횟수(충분통계)에서 전이 확률 행렬, n회차 후 전이 확률(행렬 거듭제곱), 정상 분포를 계산하고,
+        최신 회차에서 출발한 n회차 후 숫자·조 확률 분포를 함께 기록한다.
+        """
+        self.logger.info("회차 간 전이 분석 시작")
+
+        stats = self.get_statistics()
+        position_counts = stats['markov.position_counts']
+        jo_counts = stats['markov.jo_counts']
+        position_matrices = transition_matrix(position_counts)
+        jo_matrix = transition_matrix(jo_counts)
+
+        def position_dict(matrices):
+            return {f'자리{pos + 1}': np.round(matrices[pos], 4).tolist() for pos in range(NUM_POSITIONS)}
+
+        results = {
+            'position_counts': {f'자리{pos + 1}': position_counts[pos].tolist() for pos in range(NUM_POSITIONS)},
+            'jo_counts': jo_counts.tolist(),
+            'position_probabilities': position_dict(position_matrices),
+            'jo_probabilities': np.round(jo_matrix, 4).tolist(),
+            'n_step': {
+                str(n): {'positions': position_dict(n_step_matrix(position_matrices, n)),
+                         'jo': np.round(n_step_matrix(jo_matrix, n), 4).tolist()}
+                for n in steps
+            },
+            # 충분히 많은 회차 후의 분포 (정상 분포)
+            'stationary': {
+                'positions': {f'자리{pos + 1}': np.round(distribution, 4).tolist()
+                              for pos, distribution in enumerate(stationary_distribution(position_matrices))},
+                'jo': np.round(stationary_distribution(jo_matrix), 4).tolist()
+            },
+            'next_round': {},
+            'analysis_summary': {
+                'total_transitions': max(len(self.data) - 1, 0),
+                'steps': list(steps),
+                'analysis_date': datetime.now().isoformat()
+            }
+        }
+
+        # 최신 회차에서 출발한 n회차 후 분포
+        if len(self.data):
+            latest_jo = self.data['jo'].iloc[-1]
+            results['next_round'] = {'latest_round': int(self.data['round'].iloc[-1]),
+                                     'latest_digits': self.digits[-1].tolist(),
+                                     'latest_jo': int(latest_jo)}
+            for n in steps:
+                distributions = next_distributions(position_counts, jo_counts, self.digits[-1], latest_jo, n)
+                results['next_round'][str(n)] = {
+                    'digits': {f'자리{pos + 1}': np.round(distributions['digits'][pos], 4).tolist()
+                               for pos in range(NUM_POSITIONS)},
+                    'jo': np.round(distributions['jo'], 4).tolist() if distributions['jo'] is not None else None
+                }
+
+        # 결과 저장
+        with open(f'{self.results_dir}/markov_transitions.json', 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+        self.logger.info("회차 간 전이 분석 완료")
+        return results
+
+    def analyze_randomness(self):
+        """1등 번호 숫자열(전체 및 자리별)의 무작위성 검정 결과 저장"""
+        self.logger.info("숫자열 무작위성 검정 시작")
+
+        report = run_battery([self.digits])
+        report['analysis_date'] = datetime.now().isoformat()
+
+        # 결과 저장
+        with open(f'{self.results_dir}/randomness_tests.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        self.logger.info(f"숫자열 무작위성 검정 완료 (p < {report['alpha']}: {len(report['flagged'])}개)")
+        return report
+
+    def exact_digit_tests(self):
+        """자리별 숫자 빈도와 회차별 숫자 출현 개수를 균등 추첨 가정의 정확한 분포와 비교"""
+        if not len(self.data):
+            return {}
+
+        position_counts = self.get_statistics()['frequency.position_counts']
+        uniform = np.full(10, 0.1)
+
+        # 회차 × 숫자(0~9)별 출현 자리 수 (0~6)
+        num_rounds = len(self.digits)
+        digit_counts = np.bincount((np.arange(num_rounds)[:, None] * 10 + self.digits).ravel(),
+                                   minlength=num_rounds * 10).reshape(num_rounds, 10)
+
+        return {
+            'position_frequency': {f'자리{pos + 1}': chi_square_test(position_counts[pos], uniform)
+                                   for pos in range(NUM_POSITIONS)},
+            'digit_counts': {str(digit): exact_test(np.bincount(digit_counts[:, digit], minlength=NUM_POSITIONS + 1),
+                                                    digit_count_pmf(digit), latest=digit_counts[-1, digit])
+                             for digit in range(10)}
+        }
+
     def create_number_frequency_chart(self, frequency_data):
         """자리별 숫자 출현 빈도 차트 생성"""
         self.logger.info("자리별 숫자 출현 빈도 차트 생성 시작")
@@ -237,67 +482,38 @@ class NumberAnalyzer:
         self.logger.info("자리별 숫자 출현 빈도 차트 생성 완료")
 
     def create_companion_heatmap(self, companion_data):
-        """동반 출현 히트맵 생성 (수정된 버전)"""
+        """동반 출현 히트맵 생성 (동반 출현 텐서 슬라이스 기반)"""
         self.logger.info("동반 출현 히트맵 생성 시작")
 
+        tensor = companion_data['companion_tensor']
+
         # 각 자리별로 히트맵 생성
         for pos in range(1, 7):
             try:
-                # 해당 자리의 동반 출현 데이터 추출
-                pos_data = defaultdict(lambda: defaultdict(int))
-
-                for key, companions in companion_data['companion_data'].items():
-                    if key.startswith(f"자리{pos}_"):
-                        digit = key.split('_')[1]
-                        for comp_key, count in companions.items():
-                            comp_parts = comp_key.split('_')
-                            if len(comp_parts) >= 2:
-                                comp_digit = comp_parts[1]
-                                pos_data[digit][comp_digit] += count
-
-                if pos_data:
-                    # 히트맵용 매트릭스 생성
-                    all_digits = set()
-                    for d1_dict in pos_data.values():
-                        all_digits.update(d1_dict.keys())
-                    all_digits.update(pos_data.keys())
-
-                    digits = sorted(list(all_digits))
-
-                    if len(digits) > 0:
-                        matrix = np.zeros((len(digits), len(digits)))
-                        for i, d1 in enumerate(digits):
-                            for j, d2 in enumerate(digits):
-                                if d1 in pos_data and d2 in pos_data[d1]:
-                                    matrix[i][j] = pos_data[d1][d2]
-
-                        # 히트맵 생성
-                        plt.figure(figsize=(10, 8))
-
-                        # 데이터가 있는 경우에만 히트맵 생성
-                        if matrix.max() > 0:
-                            sns.heatmap(matrix,
-                                        xticklabels=digits,
-                                        yticklabels=digits,
-                                        annot=True,
-                                        fmt='g',
-                                        cmap='YlOrRd',
-                                        cbar_kws={'label': '동반 출현 횟수'})
-                        else:
-                            # 데이터가 없는 경우 빈 히트맵
-                            plt.text(0.5, 0.5, f'{pos}자리 동반 출현 데이터 없음',
-                                     ha='center', va='center', transform=plt.gca().transAxes,
-                                     fontsize=16, color='gray')
-
-                        plt.title(f'{pos}자리 숫자별 동반 출현 빈도', fontsize=14, fontweight='bold')
-                        plt.xlabel('동반 출현 숫자')
-                        plt.ylabel('기준 숫자')
-                        plt.tight_layout()
-                        plt.savefig(f'{self.charts_dir}/companion_heatmap_pos{pos}.png',
-                                    dpi=300, bbox_inches='tight')
-                        plt.close()
-                    else:
-                        self.logger.warning(f"{pos}자리 동반 출현 데이터가 없습니다.")
+                # 기준 숫자 × 다른 자리에서 함께 나온 숫자 (10×10)
+                matrix = companion_position_matrix(tensor, pos - 1)
+                present = (matrix.sum(axis=1) > 0) | (matrix.sum(axis=0) > 0)
+
+                if present.any():
+                    digits = [str(d) for d in np.flatnonzero(present)]
+                    matrix = matrix[np.ix_(present, present)]
+
+                    plt.figure(figsize=(10, 8))
+                    sns.heatmap(matrix,
+                                xticklabels=digits,
+                                yticklabels=digits,
+                                annot=True,
+                                fmt='g',
+                                cmap='YlOrRd',
+                                cbar_kws={'label': '동반 출현 횟수'})
+
+                    plt.title(f'{pos}자리 숫자별 동반 출현 빈도', fontsize=14, fontweight='bold')
+                    plt.xlabel('동반 출현 숫자')
+                    plt.ylabel('기준 숫자')
+                    plt.tight_layout()
+                    plt.savefig(f'{self.charts_dir}/companion_heatmap_pos{pos}.png',
+                                dpi=300, bbox_inches='tight')
+                    plt.close()
                 else:
                     self.logger.warning(f"{pos}자리 동반 출현 데이터가 없습니다.")
 
@@ -345,6 +561,38 @@ class NumberAnalyzer:
 
         self.logger.info("트렌드 점수 차트 생성 완료")
 
+    def create_decay_history_chart(self, rounds=DECAY_CHART_ROUNDS):
+        """최근 rounds회차의 자리별 숫자 감쇠 점수 이력 차트 생성"""
+        self.logger.info("감쇠 점수 이력 차트 생성 시작")
+
+        if len(self.data) == 0:
+            self.logger.warning("데이터가 없어 감쇠 점수 차트 생성을 건너뜁니다.")
+            return
+
+        position_history, _ = score_history(self.digits, self.data['jo'].to_numpy(), self.half_life)
+        round_numbers = self.data['round'].to_numpy()[-rounds:]
+        position_history = position_history[-rounds:]
+
+        fig, axes = plt.subplots(2, 3, figsize=(18, 10), sharey=True)
+        axes = axes.flatten()
+        colors = plt.cm.tab10(np.arange(10))
+
+        for pos in range(NUM_POSITIONS):
+            for digit in range(10):
+                axes[pos].plot(round_numbers, position_history[:, pos, digit], color=colors[digit],
+                               linewidth=1.2, label=str(digit))
+            axes[pos].set_title(f'자리{pos + 1} 감쇠 점수 (반감기 {self.half_life:g}회차)', fontweight='bold')
+            axes[pos].set_xlabel('회차')
+            axes[pos].set_ylabel('감쇠 점수')
+            axes[pos].axhline(y=100, color='black', linestyle='--', alpha=0.5)
+
+        axes[0].legend(ncol=5, fontsize=8)
+        plt.tight_layout()
+        plt.savefig(f'{self.charts_dir}/decay_score_history.png', dpi=300, bbox_inches='tight')
+        plt.close()
+
+        self.logger.info("감쇠 점수 이력 차트 생성 완료")
+
     def generate_analysis_summary(self, frequency_data, companion_data, trend_data):
         """번호 분석 요약 생성"""
         self.logger.info("번호 분석 요약 생성 시작")
@@ -378,20 +626,26 @@ class NumberAnalyzer:
             },
             'most_frequent_by_position': most_frequent_by_position,
             'hot_numbers_by_trend': hot_numbers,
-            'total_companion_patterns': len(companion_data.get('companion_data', {})),
+            'total_companion_patterns': companion_data['analysis_summary']['total_combinations'],
+            'exact_tests': self.exact_digit_tests(),
             'key_insights': []
         }
 
         # 주요 인사이트 생성
         insights = [
             f"연금복권{self.lottery_type} 총 {len(self.data)}회차 번호별 분석 완료",
-            f"총 {len(companion_data.get('companion_data', {}))}개의 동반 출현 패턴 발견"
+            f"총 {companion_data['analysis_summary']['total_combinations']}개의 동반 출현 패턴 발견"
         ]
 
         # 자리별 최다 출현 숫자 인사이트
         for position, info in most_frequent_by_position.items():
             insights.append(f"{position}에서 '{info['digit']}'이 {info['count']}회로 가장 많이 출현")
 
+        # 균등 분포와 다른(p < 0.05) 자리
+        position_tests = summary['exact_tests'].get('position_frequency', {})
+        biased = [position for position, test in position_tests.items() if test['p_value'] < 0.05]
+        insights.append(f"자리별 숫자 빈도 카이제곱 검정 (p < 0.05): {', '.join(biased) if biased else '균등 분포와 차이 없음'}")
+
         summary['key_insights'] = insights
 
         # 결과 저장
@@ -401,29 +655,65 @@ class NumberAnalyzer:
         self.logger.info("번호 분석 요약 생성 완료")
         return summary
 
-    def run_full_analysis(self):
-        """전체 번호 분석 실행"""
+    def analyze_all(self, incremental=False):
+        """차트를 제외한 전체 번호 분석 실행 (데이터는 미리 로드되어 있어야 함)"""
+        # 0. 충분통계 준비 (증분 모드에서는 새 회차만 계산)
+        self.get_statistics(incremental)
+
+        # 1. 자리별 숫자 출현 빈도 분석
+        frequency_data = self.analyze_number_frequency_by_position()
+
+        # 2. 동반 출현 패턴 분석
+        companion_data = self.analyze_companion_numbers()
+
+        # 3. 지수 감쇠 점수 및 번호별 트렌드 점수 계산
+        decay_data = self.calculate_decay_scores(incremental)
+        trend_data = self.calculate_number_trends()
+
+        # 4. 회차 간 전이 분석
+        markov_data = self.analyze_markov_transitions()
+
+        # 5. 미출현 회차·재출현 간격 분석
+        recurrence_data = self.analyze_recurrence_intervals(incremental)
+
+        # 6. 숫자열 무작위성 검정
+        randomness_data = self.analyze_randomness()
+
+        # 7. 분석 요약 생성
+        summary = self.generate_analysis_summary(frequency_data, companion_data, trend_data)
+
+        return {
+            'frequency': frequency_data,
+            'companion': companion_data,
+            'trends': trend_data,
+            'decay': decay_data,
+            'markov': markov_data,
+            'recurrence': recurrence_data,
+            'randomness': randomness_data,
+            'summary': summary
+        }
+
+    def run_full_analysis(self, incremental=False, data=None):
+        """전체 번호 분석 실행
+
+        incremental이 True이면 저장된 상태 이후의 새 회차만 처리한다.
+        data가 주어지면 데이터 파일 대신 해당 데이터프레임을 분석한다.
+        """
         self.logger.info(f"=== 연금복권{self.lottery_type} 번호별 분석 시작 ===")
 
-        # 데이터 로드
-        if not self.load_data():
+        # 데이터 로드 (data가 주어지면 파일을 읽지 않고 그대로 사용)
+        if not (self.use_data(data) if data is not None else self.load_data()):
             return False
 
         try:
-            # 1. 자리별 숫자 출현 빈도 분석
-            frequency_data = self.analyze_number_frequency_by_position()
-            self.create_number_frequency_chart(frequency_data)
-
-            # 2. 동반 출현 패턴 분석
-            companion_data = self.analyze_companion_numbers()
-            self.create_companion_heatmap(companion_data)
-
-            # 3. 번호별 트렌드 점수 계산
-            trend_data = self.calculate_number_trends()
-            self.create_trend_chart(trend_data)
+            # 1~7. 번호 분석 및 요약
+            results = self.analyze_all(incremental)
 
-            # 4. 분석 요약 생성
-            summary = self.generate_analysis_summary(frequency_data, companion_data, trend_data)
+            # 8. 차트 생성
+            self.create_number_frequency_chart(results['frequency'])
+            self.create_companion_heatmap(results['companion'])
+            self.create_trend_chart(results['trends'])
+            self.create_decay_history_chart()
 
             self.logger.info("=== 번호별 분석 완료 ===")
             print(f"연금복권{self.lottery_type} 번호별 분석이 완료되었습니다!")
@@ -439,14 +729,23 @@ class NumberAnalyzer:
 
 def main():
     """메인 함수"""
-    # 환경변수에서 연금복권 타입 확인
+    # 환경변수에서 연금복권 타입 및 증분 분석 여부 확인
     lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    incremental = os.environ.get('ANALYSIS_INCREMENTAL') == '1'
+    trend_method = os.environ.get('TREND_METHOD', 'ratio')
+    half_life = DEFAULT_HALF_LIFE
 
     # 명령행 인수 처리
     if len(sys.argv) > 1:
         for i, arg in enumerate(sys.argv):
             if arg == '--type' and i + 1 < len(sys.argv):
                 lottery_type = sys.argv[i + 1]
+            elif arg == '--incremental':
+                incremental = True
+            elif arg == '--trend-method' and i + 1 < len(sys.argv):
+                trend_method = sys.argv[i + 1]
+            elif arg == '--half-life' and i + 1 < len(sys.argv):
+                half_life = float(sys.argv[i + 1])
 
     # 대화형 모드
     if lottery_type not in ['720', '520']:
@@ -461,19 +760,25 @@ def main():
         else:
             lottery_type = "720"
 
-    analyzer = NumberAnalyzer(lottery_type)
-    success = analyzer.run_full_analysis()
+    analyzer = NumberAnalyzer(lottery_type, trend_method=trend_method, half_life=half_life)
+    success = analyzer.run_full_analysis(incremental)
 
     if success:
         print(f"\n🎉 연금복권{lottery_type} 번호별 분석이 성공적으로 완료되었습니다!")
         print("\n📁 생성된 파일들:")
         print("- analysis_results/number_frequency.json")
         print("- analysis_results/companion_numbers.json")
+        print("- analysis_results/companion_tensor.npy")
         print("- analysis_results/number_trends.json")
+        print("- analysis_results/decay_scores.json")
+        print("- analysis_results/markov_transitions.json")
+        print("- analysis_results/recurrence_intervals.json")
+        print("- analysis_results/randomness_tests.json")
         print("- analysis_results/number_analysis_summary.json")
         print("- charts/number_frequency_by_position.png")
         print("- charts/companion_heatmap_pos*.png")
         print("- charts/number_trends.png")
+        print("- charts/decay_score_history.png")
     else:
         print("❌ 분석 중 오류가 발생했습니다. 로그를 확인해주세요.")
 
@@ -6,6 +6,7 @@
 - 연속 숫자 패턴 분석
 - 숫자 간격 패턴 분석
 - 조별 번호 조합 분석
+- 비트맵 역색인으로 (자리, 숫자)·조 조건을 만족하는 회차 조회
 """
 
 import pandas as pd
@@ -15,12 +16,20 @@ import seaborn as sns
 import json
 import logging
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import Counter
 import os
 import sys
 import platform
 import itertools
 
+from digit_engine import (build_digit_matrix, count_dict, consecutive_sequences, decode_gap_sequence,
+                          fused_pattern_statistics, sequential_pattern_statistics, NUM_POSITIONS, NUM_GAPS,
+                          PARITY_PATTERN_STRINGS, POSITION_PAIRS, POSITION_PAIR_LABELS, PAIR_CODE_BINS,
+                          JO_PAIR_LABELS, JO_PAIR_INDICES)
+from analysis_state import AnalysisState, row_keys, update_statistics
+from exact_distributions import exact_test, odd_count_pmf, digit_sum_pmf
+from bitmap_index import BitmapIndex
+
 
 # 한글 폰트 설정
 def setup_matplotlib_font():
@@ -38,20 +47,58 @@ def setup_matplotlib_font():
 
 
 class PatternAnalyzer:
-    def __init__(self, lottery_type="720", data_file=None):
-        """고급 패턴 분석기 초기화"""
+    # 증분 분석 시 충분통계 병합 규칙
+    STATISTICS_RULES = {
+        'odd_even.pattern_counts': 'sum',
+        'odd_even.position_odd_counts': 'sum',
+        'odd_even.odd_count_sum': 'sum',
+        'odd_even.odd_count_max': 'max',
+        'odd_even.odd_count_min': 'min',
+        'odd_even.pattern_codes': 'concat',
+        'odd_even.odd_counts': 'concat',
+        'consecutive.total_counts': 'sum',
+        'consecutive.length_counts': 'sum',
+        'consecutive.total_sum': 'sum',
+        'consecutive.length_sum': 'sum',
+        'consecutive.total_max': 'max',
+        'consecutive.rounds_with': 'sum',
+        'consecutive.totals': 'concat',
+        'consecutive.max_lengths': 'concat',
+        'gaps.position_counts': 'sum',
+        'gaps.sequence_counts': 'sum',
+        'gaps.max_gap_sum': 'sum',
+        'gaps.min_gap_sum': 'sum',
+        'gaps.gap_total': 'sum',
+        'gaps.gaps': 'concat',
+        'gaps.max_gap': 'concat',
+        'gaps.min_gap': 'concat',
+        'gaps.gap_sum': 'concat',
+        'jo_combinations.position_pair_counts': 'sum'
+    }
+
+    def __init__(self, lottery_type="720", data_file=None, fused=True):
+        """고급 패턴 분석기 초기화
+
+        fused가 True이면 홀짝·연속·간격·조합 통계를 한 번의 패스로 계산하고,
+        False이면 분석별로 따로 계산한다 (결과는 동일).
+        """
         self.lottery_type = lottery_type
+        self.fused = fused
 
         if data_file is None:
             data_file = f'lottery_data/pension_lottery_{lottery_type}_all.csv'
 
         self.data_file = data_file
         self.data = None
+        self.digits = None  # N×6 자리 숫자 행렬 (load_data에서 한 번만 생성)
+        self.statistics = None  # 분석별 충분통계 (get_statistics에서 준비)
+        self.bitmap_index = None  # 회차 비트맵 역색인 (get_bitmap_index에서 준비)
         self.results_dir = 'analysis_results'
         self.charts_dir = 'charts'
+        self.state_dir = 'analysis_state'
 
         # 디렉토리 생성
-        for directory in [self.results_dir, self.charts_dir, 'logs']:
+        for directory in [self.results_dir, self.charts_dir, self.state_dir, 'logs']:
             try:
                 os.makedirs(directory, exist_ok=True)
             except PermissionError:
@@ -90,8 +137,7 @@ class PatternAnalyzer:
             self.data['round'] = self.data['round'].astype(int)
             self.data['jo'] = self.data['jo'].astype(int)
 
-            self.logger.info(f"데이터 로드 완료: {len(self.data)}개 회차")
-            return True
+            return self.use_data(self.data)
         except FileNotFoundError:
             self.logger.error(f"데이터 파일을 찾을 수 없습니다: {self.data_file}")
             return False
@@ -99,64 +145,136 @@ class PatternAnalyzer:
             self.logger.error(f"데이터 로드 실패: {e}")
             return False
 
+    def use_data(self, data):
+        """정제된 데이터프레임(round, jo, first_number, second_number)을 분석 대상으로 설정
+
+        공유 메모리 위의 데이터프레임도 복사 없이 그대로 사용한다.
+        """
+        self.data = data
+
+        # 1등 번호를 자리 숫자 행렬로 한 번만 변환
+        self.digits = build_digit_matrix(self.data['first_number'])
+        self.statistics = None
+        self.bitmap_index = None
+
+        self.logger.info(f"데이터 로드 완료: {len(self.data)}개 회차")
+        return True
+
+    def compute_statistics(self, start=0):
+        """start번째 회차 이후 데이터의 충분통계 계산"""
+        digits = self.digits[start:]
+        jos = self.data['jo'].to_numpy(dtype=np.int64)[start:]
+        num_rounds = len(digits)
+
+        if self.fused:
+            kernels = fused_pattern_statistics(digits, jos)
+        else:
+            kernels = sequential_pattern_statistics(digits, jos)
+
+        pattern_codes, odd_counts = kernels['parity']
+        runs = kernels['runs']
+        gap_stats = kernels['gaps']
+
+        return {
+            'odd_even.pattern_counts': np.bincount(pattern_codes, minlength=len(PARITY_PATTERN_STRINGS)),
+            'odd_even.position_odd_counts': (digits & 1).sum(axis=0, dtype=np.int64),
+            'odd_even.odd_count_sum': np.int64(odd_counts.sum()),
+            'odd_even.odd_count_max': np.int64(odd_counts.max(initial=0)),
+            'odd_even.odd_count_min': np.int64(odd_counts.min(initial=NUM_POSITIONS)),
+            'odd_even.pattern_codes': pattern_codes.astype(np.int8),
+            'odd_even.odd_counts': odd_counts.astype(np.int8),
+            'consecutive.total_counts': np.bincount(runs['total_consecutive'], minlength=NUM_POSITIONS + 1),
+            'consecutive.length_counts': np.bincount(runs['max_consecutive_length'], minlength=NUM_POSITIONS + 1),
+            'consecutive.total_sum': np.int64(runs['total_consecutive'].sum()),
+            'consecutive.length_sum': np.int64(runs['max_consecutive_length'].sum()),
+            'consecutive.total_max': np.int64(runs['total_consecutive'].max(initial=0)),
+            'consecutive.rounds_with': np.int64(np.count_nonzero(runs['total_consecutive'])),
+            'consecutive.totals': runs['total_consecutive'].astype(np.int8),
+            'consecutive.max_lengths': runs['max_consecutive_length'].astype(np.int8),
+            'gaps.position_counts': gap_stats['position_counts'],
+            'gaps.sequence_counts': gap_stats['sequence_counts'],
+            'gaps.max_gap_sum': np.int64(gap_stats['max_gap'].sum()),
+            'gaps.min_gap_sum': np.int64(gap_stats['min_gap'].sum()),
+            'gaps.gap_total': np.int64(gap_stats['gap_sum'].sum()),
+            'gaps.gaps': np.ascontiguousarray(gap_stats['gaps']).reshape(num_rounds, NUM_GAPS),
+            'gaps.max_gap': gap_stats['max_gap'].astype(np.int8),
+            'gaps.min_gap': gap_stats['min_gap'].astype(np.int8),
+            'gaps.gap_sum': gap_stats['gap_sum'].astype(np.int8),
+            'jo_combinations.position_pair_counts': kernels['jo_pairs']
+        }
+
+    def get_statistics(self, incremental=False):
+        """분석용 충분통계 준비
+
+        incremental이 True이면 상태 파일의 통계에 마지막 처리 회차 이후의 새 회차만 반영한다.
+        이전 회차 데이터가 바뀐 경우에는 전체를 다시 계산한다.
+        """
+        if self.statistics is None:
+            state = AnalysisState('pattern', self.lottery_type, self.state_dir)
+            self.statistics, mode = update_statistics(state, row_keys(self.data), self.compute_statistics,
+                                                      self.STATISTICS_RULES, incremental)
+            self.logger.info(f"패턴 충분통계 준비 완료 ({mode}, 마지막 회차: {state.last_round})")
+        return self.statistics
+
+    def get_bitmap_index(self):
+        """회차 비트맵 역색인 (상태 디렉토리의 색인이 현재 데이터와 같으면 재사용)"""
+        if self.bitmap_index is None:
+            self.bitmap_index = BitmapIndex.load_or_build(self.data, self.lottery_type, self.state_dir)
+        return self.bitmap_index
+
+    def query_rounds(self, expression, limit=None):
+        """조건식(예: "p3=7 & jo=2")을 만족하는 회차 조회 (회차 수, 비율, 최근 회차 목록)"""
+        return self.get_bitmap_index().search(expression, limit)
+
     def analyze_odd_even_patterns(self):
         """홀짝 분포 패턴 분석"""
         self.logger.info("홀짝 분포 패턴 분석 시작")
 
+        stats = self.get_statistics()
+        total_rounds = len(stats['odd_even.odd_counts'])
+        overall_distribution = {PARITY_PATTERN_STRINGS[code]: count
+                                for code, count in count_dict(stats['odd_even.pattern_counts']).items()}
+
         odd_even_data = {
             'by_round': [],
-            'overall_distribution': defaultdict(int),
+            'overall_distribution': overall_distribution,
             'position_patterns': {},
             'statistics': {}
         }
 
-        # 각 회차별 홀짝 패턴 분석
-        for _, row in self.data.iterrows():
-            first_num = str(row['first_number']).zfill(6)
-            digits = [int(d) for d in first_num]
-
-            # 홀짝 패턴 생성
-            odd_even_pattern = ['홀' if d % 2 == 1 else '짝' for d in digits]
-            odd_count = sum(1 for d in digits if d % 2 == 1)
-            even_count = 6 - odd_count
-
-            pattern_str = ''.join(odd_even_pattern)
-            odd_even_data['overall_distribution'][pattern_str] += 1
-
+        # 각 회차별 홀짝 패턴
+        for round_no, code, odd_count, digits in zip(self.data['round'].tolist(),
+                                                     stats['odd_even.pattern_codes'].tolist(),
+                                                     stats['odd_even.odd_counts'].tolist(),
+                                                     self.digits.tolist()):
             odd_even_data['by_round'].append({
-                'round': row['round'],
-                'pattern': pattern_str,
+                'round': round_no,
+                'pattern': PARITY_PATTERN_STRINGS[code],
                 'odd_count': odd_count,
-                'even_count': even_count,
+                'even_count': NUM_POSITIONS - odd_count,
                 'digits': digits
             })
 
         # 자리별 홀짝 분포
-        for pos in range(6):
-            pos_patterns = defaultdict(int)
-            for round_data in odd_even_data['by_round']:
-                digit = round_data['digits'][pos]
-                pattern = '홀' if digit % 2 == 1 else '짝'
-                pos_patterns[pattern] += 1
-
-            odd_even_data['position_patterns'][f'자리{pos + 1}'] = dict(pos_patterns)
+        for pos, odd in enumerate(stats['odd_even.position_odd_counts'].tolist()):
+            pos_patterns = {'홀': odd, '짝': total_rounds - odd}
+            odd_even_data['position_patterns'][f'자리{pos + 1}'] = {k: v for k, v in pos_patterns.items() if v}
 
         # 통계 계산
-        total_rounds = len(odd_even_data['by_round'])
-        odd_counts = [r['odd_count'] for r in odd_even_data['by_round']]
-
         odd_even_data['statistics'] = {
-            'avg_odd_count': sum(odd_counts) / len(odd_counts) if odd_counts else 0,
-            'max_odd_count': max(odd_counts) if odd_counts else 0,
-            'min_odd_count': min(odd_counts) if odd_counts else 0,
-            'most_common_pattern': max(odd_even_data['overall_distribution'],
-                                       key=odd_even_data['overall_distribution'].get) if odd_even_data[
-                'overall_distribution'] else '',
-            'total_patterns': len(odd_even_data['overall_distribution'])
+            'avg_odd_count': int(stats['odd_even.odd_count_sum']) / total_rounds if total_rounds else 0,
+            'max_odd_count': int(stats['odd_even.odd_count_max']) if total_rounds else 0,
+            'min_odd_count': int(stats['odd_even.odd_count_min']) if total_rounds else 0,
+            'most_common_pattern': max(overall_distribution,
+                                       key=overall_distribution.get) if overall_distribution else '',
+            'total_patterns': len(overall_distribution)
         }
 
-        # defaultdict를 일반 딕셔너리로 변환
-        odd_even_data['overall_distribution'] = dict(odd_even_data['overall_distribution'])
+        # 균등 추첨 가정의 정확한 홀수 개수 분포와 비교 (기대 빈도, 카이제곱, 꼬리 확률)
+        odd_counts = stats['odd_even.odd_counts']
+        odd_even_data['exact_distribution'] = exact_test(np.bincount(odd_counts, minlength=NUM_POSITIONS + 1),
+                                                         odd_count_pmf(),
+                                                         latest=odd_counts[-1] if total_rounds else None)
 
         # 결과 저장
         with open(f'{self.results_dir}/odd_even_patterns.json', 'w', encoding='utf-8') as f:
@@ -165,70 +283,51 @@ class PatternAnalyzer:
         self.logger.info("홀짝 분포 패턴 분석 완료")
         return odd_even_data
 
-    def analyze_consecutive_patterns(self):
-        """연속 숫자 패턴 분석"""
+    def analyze_consecutive_patterns(self, include_sequences=True):
+        """연속 숫자 패턴 분석
+
+        include_sequences가 False이면 회차별 연속 수열 목록은 생성하지 않는다.
+        """
         self.logger.info("연속 숫자 패턴 분석 시작")
 
+        stats = self.get_statistics()
+        total_consecutive = stats['consecutive.totals']
+        total_rounds = len(total_consecutive)
+
         consecutive_data = {
             'by_round': [],
-            'consecutive_counts': defaultdict(int),
-            'consecutive_lengths': defaultdict(int),
+            'consecutive_counts': count_dict(stats['consecutive.total_counts']),
+            'consecutive_lengths': count_dict(stats['consecutive.length_counts']),
             'statistics': {}
         }
 
-        for _, row in self.data.iterrows():
-            first_num = str(row['first_number']).zfill(6)
-            digits = [int(d) for d in first_num]
-
-            # 연속 숫자 찾기
-            consecutive_sequences = []
-            current_sequence = [digits[0]]
-
-            for i in range(1, len(digits)):
-                if digits[i] == digits[i - 1] + 1:
-                    current_sequence.append(digits[i])
-                else:
-                    if len(current_sequence) >= 2:
-                        consecutive_sequences.append(current_sequence.copy())
-                    current_sequence = [digits[i]]
-
-            # 마지막 시퀀스 체크
-            if len(current_sequence) >= 2:
-                consecutive_sequences.append(current_sequence)
-
-            # 연속 개수 카운트
-            total_consecutive = sum(len(seq) for seq in consecutive_sequences)
-            max_consecutive_length = max([len(seq) for seq in consecutive_sequences]) if consecutive_sequences else 0
-
-            consecutive_data['consecutive_counts'][total_consecutive] += 1
-            consecutive_data['consecutive_lengths'][max_consecutive_length] += 1
-
-            consecutive_data['by_round'].append({
-                'round': row['round'],
-                'digits': digits,
-                'consecutive_sequences': consecutive_sequences,
-                'total_consecutive': total_consecutive,
-                'max_consecutive_length': max_consecutive_length
-            })
+        # 회차별 결과 (연속 수열은 요청된 경우에만 생성)
+        for round_no, digits, total, max_length in zip(self.data['round'].tolist(),
+                                                       self.digits.tolist(),
+                                                       total_consecutive.tolist(),
+                                                       stats['consecutive.max_lengths'].tolist()):
+            round_data = {
+                'round': round_no,
+                'digits': digits
+            }
+            if include_sequences:
+                round_data['consecutive_sequences'] = (
+                    consecutive_sequences(digits, np.diff(digits) == 1) if total else [])
+            round_data['total_consecutive'] = total
+            round_data['max_consecutive_length'] = max_length
+            consecutive_data['by_round'].append(round_data)
 
         # 통계 계산
-        total_consecutive_list = [r['total_consecutive'] for r in consecutive_data['by_round']]
-        max_lengths = [r['max_consecutive_length'] for r in consecutive_data['by_round']]
+        rounds_with_consecutive = int(stats['consecutive.rounds_with'])
 
         consecutive_data['statistics'] = {
-            'avg_consecutive_count': sum(total_consecutive_list) / len(
-                total_consecutive_list) if total_consecutive_list else 0,
-            'max_consecutive_in_single_round': max(total_consecutive_list) if total_consecutive_list else 0,
-            'avg_max_consecutive_length': sum(max_lengths) / len(max_lengths) if max_lengths else 0,
-            'rounds_with_consecutive': sum(1 for c in total_consecutive_list if c > 0),
-            'consecutive_probability': (sum(1 for c in total_consecutive_list if c > 0) / len(
-                total_consecutive_list) * 100) if total_consecutive_list else 0
+            'avg_consecutive_count': int(stats['consecutive.total_sum']) / total_rounds if total_rounds else 0,
+            'max_consecutive_in_single_round': int(stats['consecutive.total_max']) if total_rounds else 0,
+            'avg_max_consecutive_length': int(stats['consecutive.length_sum']) / total_rounds if total_rounds else 0,
+            'rounds_with_consecutive': rounds_with_consecutive,
+            'consecutive_probability': (rounds_with_consecutive / total_rounds * 100) if total_rounds else 0
         }
 
-        # defaultdict를 일반 딕셔너리로 변환
-        consecutive_data['consecutive_counts'] = dict(consecutive_data['consecutive_counts'])
-        consecutive_data['consecutive_lengths'] = dict(consecutive_data['consecutive_lengths'])
-
         # 결과 저장
         with open(f'{self.results_dir}/consecutive_patterns.json', 'w', encoding='utf-8') as f:
             json.dump(consecutive_data, f, ensure_ascii=False, indent=2)
@@ -237,74 +336,47 @@ class PatternAnalyzer:
         return consecutive_data
 
     def analyze_number_gaps(self):
-        """번호 간격 패턴 분석 (수정된 버전)"""
+        """번호 간격 패턴 분석 (벡터화 버전)"""
         self.logger.info("번호 간격 패턴 분석 시작")
 
+        stats = self.get_statistics()
+        total_rounds = len(stats['gaps.gap_sum'])
+
         gap_data = {
-            'adjacent_gaps': defaultdict(int),
-            'position_gaps': {},
-            'gap_sequences': defaultdict(int),
+            'adjacent_gaps': count_dict(stats['gaps.position_counts'].sum(axis=0)),
+            # 자리쌍별 간격 분포 (5×10 배열에서 변환)
+            'position_gaps': {f'pos{i + 1}-{i + 2}': count_dict(stats['gaps.position_counts'][i])
+                              for i in range(NUM_GAPS)},
+            # 간격 시퀀스 패턴 (첫 3개 간격, 0~999 코드에서 복원)
+            'gap_sequences': {str(decode_gap_sequence(code)): count
+                              for code, count in count_dict(stats['gaps.sequence_counts']).items()},
             'by_round': [],
             'statistics': {}  # 통계 정보 추가
         }
 
-        # 통계 계산을 위한 리스트
-        max_gaps = []
-        min_gaps = []
-        avg_gaps = []
-
-        # 각 자리별 간격 분석
-        for pos in range(5):  # 0-1, 1-2, 2-3, 3-4, 4-5 자리 간격
-            gap_data['position_gaps'][f'pos{pos + 1}-{pos + 2}'] = defaultdict(int)
-
-        for _, row in self.data.iterrows():
-            first_num = str(row['first_number']).zfill(6)
-            digits = [int(d) for d in first_num]
-
-            round_gaps = []
-            for i in range(5):
-                gap = abs(digits[i + 1] - digits[i])
-                round_gaps.append(gap)
-                gap_data['adjacent_gaps'][gap] += 1
-                gap_data['position_gaps'][f'pos{i + 1}-{i + 2}'][gap] += 1
-
-            # 간격 시퀀스 패턴 (첫 3개 간격)
-            if len(round_gaps) >= 3:
-                gap_sequence = tuple(round_gaps[:3])
-                gap_data['gap_sequences'][gap_sequence] += 1
-
-            # 통계 데이터 수집
-            if round_gaps:
-                max_gap = max(round_gaps)
-                min_gap = min(round_gaps)
-                avg_gap = sum(round_gaps) / len(round_gaps)
-
-                max_gaps.append(max_gap)
-                min_gaps.append(min_gap)
-                avg_gaps.append(avg_gap)
-
-                gap_data['by_round'].append({
-                    'round': row['round'],
-                    'gaps': round_gaps,
-                    'max_gap': max_gap,
-                    'min_gap': min_gap,
-                    'avg_gap': avg_gap
-                })
+        # 회차별 간격 정보
+        for round_no, gaps, max_gap, min_gap, gap_sum in zip(self.data['round'].tolist(),
+                                                            stats['gaps.gaps'].tolist(),
+                                                            stats['gaps.max_gap'].tolist(),
+                                                            stats['gaps.min_gap'].tolist(),
+                                                            stats['gaps.gap_sum'].tolist()):
+            gap_data['by_round'].append({
+                'round': round_no,
+                'gaps': gaps,
+                'max_gap': max_gap,
+                'min_gap': min_gap,
+                'avg_gap': gap_sum / NUM_GAPS
+            })
 
-        # 통계 계산
-        if max_gaps:
+        # 통계 계산 (회차별 최대/최소/합계의 누적값 사용)
+        if total_rounds:
             gap_data['statistics'] = {
-                'avg_max_gap': sum(max_gaps) / len(max_gaps),
-                'avg_min_gap': sum(min_gaps) / len(min_gaps),
-                'overall_avg_gap': sum(avg_gaps) / len(avg_gaps),
-                'total_rounds': len(max_gaps)
+                'avg_max_gap': int(stats['gaps.max_gap_sum']) / total_rounds,
+                'avg_min_gap': int(stats['gaps.min_gap_sum']) / total_rounds,
+                'overall_avg_gap': int(stats['gaps.gap_total']) / (total_rounds * NUM_GAPS),
+                'total_rounds': total_rounds
             }
 
-        # defaultdict를 일반 딕셔너리로 변환
-        gap_data['adjacent_gaps'] = dict(gap_data['adjacent_gaps'])
-        gap_data['position_gaps'] = {k: dict(v) for k, v in gap_data['position_gaps'].items()}
-        gap_data['gap_sequences'] = {str(k): v for k, v in gap_data['gap_sequences'].items()}
-
         # 결과 저장
         with open(f'{self.results_dir}/number_gaps.json', 'w', encoding='utf-8') as f:
             json.dump(gap_data, f, ensure_ascii=False, indent=2)
@@ -316,27 +388,13 @@ class PatternAnalyzer:
         """조별 번호 조합 분석"""
         self.logger.info("조별 번호 조합 분석 시작")
 
-        jo_combinations = defaultdict(lambda: defaultdict(int))
-
-        for _, row in self.data.iterrows():
-            jo = row['jo']
-            first_num = str(row['first_number']).zfill(6)
-
-            # 첫 2자리와 마지막 2자리 조합 분석
-            first_two = first_num[:2]
-            last_two = first_num[-2:]
-            middle_two = first_num[2:4]
-
-            jo_combinations[f'{jo}조']['첫2자리'][first_two] += 1
-            jo_combinations[f'{jo}조']['마지막2자리'][last_two] += 1
-            jo_combinations[f'{jo}조']['중간2자리'][middle_two] += 1
+        # 조 × 자리쌍 × 00~99 빈도 배열에서 (첫2자리, 마지막2자리, 중간2자리)만 변환
+        pair_counts = self.get_jo_pair_counts()[:, JO_PAIR_INDICES]
 
-        # defaultdict를 일반 딕셔너리로 변환
         result = {}
-        for jo, combinations in jo_combinations.items():
-            result[jo] = {}
-            for pos, combos in combinations.items():
-                result[jo][pos] = dict(combos)
+        for jo in np.flatnonzero(pair_counts.sum(axis=(1, 2))):
+            result[f'{jo}조'] = {label: {f'{code:02d}': count for code, count in count_dict(counts).items()}
+                                for label, counts in zip(JO_PAIR_LABELS, pair_counts[jo])}
 
         # 결과 저장
         with open(f'{self.results_dir}/jo_number_combinations.json', 'w', encoding='utf-8') as f:
@@ -345,6 +403,47 @@ class PatternAnalyzer:
         self.logger.info("조별 번호 조합 분석 완료")
         return result
 
+    def get_jo_pair_counts(self):
+        """조 × 자리쌍(15쌍) × 두 자리 코드(00~99) 빈도 배열"""
+        counts = self.get_statistics()['jo_combinations.position_pair_counts']
+        return counts.reshape(-1, len(POSITION_PAIRS), PAIR_CODE_BINS)
+
+    def analyze_position_pair_combinations(self):
+        """조별 자리쌍 조합 분석 (6자리 중 두 자리 15쌍 전체)
+
+        조 × 자리쌍 × 코드 빈도 배열을 jo_pair_counts.npy로 저장하고,
+        JSON에는 조별·전체 자리쌍 조합 빈도를 기록한다.
+        """
+        self.logger.info("조별 자리쌍 조합 분석 시작")
+
+        pair_counts = self.get_jo_pair_counts()
+        np.save(f'{self.results_dir}/jo_pair_counts.npy', pair_counts)
+
+        def pair_dicts(counts):
+            return {label: {f'{code:02d}': count for code, count in count_dict(pair).items()}
+                    for label, pair in zip(POSITION_PAIR_LABELS, counts)}
+
+        results = {
+            'array_file': 'jo_pair_counts.npy',
+            'array_shape': list(pair_counts.shape),
+            'array_axes': ['조', '자리쌍', '두 자리 코드'],
+            'pairs': POSITION_PAIR_LABELS,
+            'by_jo': {f'{jo}조': pair_dicts(pair_counts[jo])
+                      for jo in np.flatnonzero(pair_counts.sum(axis=(1, 2)))},
+            'overall': pair_dicts(pair_counts.sum(axis=0)),
+            'analysis_summary': {
+                'total_rounds': len(self.data),
+                'analysis_date': datetime.now().isoformat()
+            }
+        }
+
+        # 결과 저장
+        with open(f'{self.results_dir}/position_pair_combinations.json', 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+        self.logger.info("조별 자리쌍 조합 분석 완료")
+        return results
+
     def create_pattern_analysis_chart(self, odd_even_data, consecutive_data):
         """패턴 분석 종합 차트 생성"""
         self.logger.info("패턴 분석 종합 차트 생성 시작")
@@ -482,9 +581,20 @@ class PatternAnalyzer:
             },
             'gap_summary': gap_data['statistics'],
             'jo_combinations_count': {jo: len(combinations) for jo, combinations in jo_combinations.items()},
+            'exact_tests': {},
             'key_insights': []
         }
 
+        # 가법 통계(홀수 개수, 숫자 합)를 균등 추첨 가정의 정확한 분포와 비교
+        digit_sums = self.digits.sum(axis=1, dtype=np.int64)
+        odd_count_test = odd_even_data['exact_distribution']
+        digit_sum_test = exact_test(np.bincount(digit_sums), digit_sum_pmf(),
+                                    latest=digit_sums[-1] if len(digit_sums) else None)
+        summary['exact_tests'] = {
+            'odd_count': {key: odd_count_test[key] for key in ['observed_mean', 'expected_mean', 'chi_square']},
+            'digit_sum': digit_sum_test
+        }
+
         # 주요 인사이트 생성
         insights = [
             f"연금복권{self.lottery_type} 총 {len(self.data)}회차 고급 패턴 분석 완료",
@@ -496,6 +606,11 @@ class PatternAnalyzer:
         if gap_data['statistics']:
             insights.append(f"평균 최대 간격: {gap_data['statistics']['avg_max_gap']:.1f}")
 
+        for label, test in [('홀수 개수', odd_count_test), ('숫자 합', digit_sum_test)]:
+            if test['chi_square']:
+                insights.append(f"{label} 분포 카이제곱 p-value: {test['chi_square']['p_value']:.3f} "
+                                f"(실제 평균 {test['observed_mean']:.2f}, 기대 평균 {test['expected_mean']:.2f})")
+
         summary['key_insights'] = insights
 
         # 결과 저장
@@ -505,33 +620,55 @@ class PatternAnalyzer:
         self.logger.info("패턴 분석 종합 요약 생성 완료")
         return summary
 
-    def run_full_analysis(self):
-        """전체 패턴 분석 실행"""
-        self.logger.info(f"=== 연금복권{self.lottery_type} 고급 패턴 분석 시작 ===")
+    def analyze_all(self, incremental=False):
+        """차트를 제외한 전체 패턴 분석 실행 (데이터는 미리 로드되어 있어야 함)"""
+        # 0. 충분통계 준비 (증분 모드에서는 새 회차만 계산)
+        self.get_statistics(incremental)
 
-        # 데이터 로드
-        if not self.load_data():
-            return False
+        # 1. 홀짝 분포 패턴 분석
+        odd_even_data = self.analyze_odd_even_patterns()
 
-        try:
-            # 1. 홀짝 분포 패턴 분석
-            odd_even_data = self.analyze_odd_even_patterns()
+        # 2. 연속 숫자 패턴 분석
+        consecutive_data = self.analyze_consecutive_patterns()
+
+        # 3. 숫자 간격 패턴 분석
+        gap_data = self.analyze_number_gaps()
 
-            # 2. 연속 숫자 패턴 분석
-            consecutive_data = self.analyze_consecutive_patterns()
+        # 4. 조별 번호 조합 분석 (15개 자리쌍 전체 포함)
+        jo_combinations = self.analyze_jo_number_combinations()
+        pair_combinations = self.analyze_position_pair_combinations()
 
-            # 3. 숫자 간격 패턴 분석
-            gap_data = self.analyze_number_gaps()
+        # 5. 종합 요약 생성
+        summary = self.generate_pattern_summary(odd_even_data, consecutive_data, gap_data, jo_combinations)
 
-            # 4. 조별 번호 조합 분석
-            jo_combinations = self.analyze_jo_number_combinations()
+        return {
+            'odd_even': odd_even_data,
+            'consecutive': consecutive_data,
+            'gaps': gap_data,
+            'jo_combinations': jo_combinations,
+            'pair_combinations': pair_combinations,
+            'summary': summary
+        }
 
-            # 5. 패턴 분석 차트 생성
-            self.create_pattern_analysis_chart(odd_even_data, consecutive_data)
-            self.create_gap_analysis_chart(gap_data)
+    def run_full_analysis(self, incremental=False, data=None):
+        """전체 패턴 분석 실행
+
+        incremental이 True이면 저장된 상태 이후의 새 회차만 처리한다.
+        data가 주어지면 데이터 파일 대신 해당 데이터프레임을 분석한다.
+        """
+        self.logger.info(f"=== 연금복권{self.lottery_type} 고급 패턴 분석 시작 ===")
+
+        # 데이터 로드 (data가 주어지면 파일을 읽지 않고 그대로 사용)
+        if not (self.use_data(data) if data is not None else self.load_data()):
+            return False
+
+        try:
+            # 1~5. 패턴 분석 및 종합 요약
+            results = self.analyze_all(incremental)
 
-            # 6. 종합 요약 생성
-            summary = self.generate_pattern_summary(odd_even_data, consecutive_data, gap_data, jo_combinations)
+            # 6. 패턴 분석 차트 생성
+            self.create_pattern_analysis_chart(results['odd_even'], results['consecutive'])
+            self.create_gap_analysis_chart(results['gaps'])
 
             self.logger.info("=== 고급 패턴 분석 완료 ===")
             print(f"연금복권{self.lottery_type} 고급 패턴 분석이 완료되었습니다!")
@@ -547,14 +684,20 @@ class PatternAnalyzer:
 
 def main():
     """메인 함수"""
-    # 환경변수에서 연금복권 타입 확인
+    # 환경변수에서 연금복권 타입 및 증분 분석 여부 확인
     lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    incremental = os.environ.get('ANALYSIS_INCREMENTAL') == '1'
+    fused = True
 
     # 명령행 인수 처리
     if len(sys.argv) > 1:
         for i, arg in enumerate(sys.argv):
             if arg == '--type' and i + 1 < len(sys.argv):
                 lottery_type = sys.argv[i + 1]
+            elif arg == '--incremental':
+                incremental = True
+            elif arg == '--sequential':
+                fused = False
 
     # 대화형 모드
     if lottery_type not in ['720', '520']:
@@ -569,8 +712,8 @@ def main():
         else:
             lottery_type = "720"
 
-    analyzer = PatternAnalyzer(lottery_type)
-    success = analyzer.run_full_analysis()
+    analyzer = PatternAnalyzer(lottery_type, fused=fused)
+    success = analyzer.run_full_analysis(incremental)
 
     if success:
         print(f"\n🎉 연금복권{lottery_type} 고급 패턴 분석이 성공적으로 완료되었습니다!")
@@ -580,6 +723,7 @@ def main():
         print("- analysis_results/consecutive_patterns.json")
         print("- analysis_results/number_gaps.json")
         print("- analysis_results/jo_number_combinations.json")
+        print("- analysis_results/position_pair_combinations.json")
         print("- charts/pattern_analysis.png")
         print("- charts/gap_analysis.png")
     else:
@@ -5,6 +5,7 @@
 - 조별 출현 빈도 분석
 - 최근 트렌드 분석
 - 2등 끝자리 번호 패턴 분석
+- 1등 번호 중복 출현 분석 (번호별 출현 이력 조회)
 - 기본 통계 생성
 """
 
@@ -21,6 +22,11 @@ import os
 import sys
 import platform
 
+from digit_engine import count_dict
+from analysis_state import AnalysisState, row_keys, update_statistics
+from window_counts import RoundWindowCounts, jo_trends
+from draw_index import DrawIndex
+
 
 # 한글 폰트 설정
 def setup_matplotlib_font():
@@ -38,6 +44,14 @@ def setup_matplotlib_font():
 
 
 class PensionLotteryAnalyzer:
+    # 증분 분석 시 충분통계 병합 규칙
+    STATISTICS_RULES = {
+        'jo.counts': 'sum',
+        'second.last_digit_counts': 'sum',
+        'rounds.min': 'min',
+        'rounds.max': 'max'
+    }
+
     def __init__(self, lottery_type="720", data_file=None):
         """기본 분석기 초기화"""
         self.lottery_type = lottery_type
@@ -48,11 +62,15 @@ class PensionLotteryAnalyzer:
 
         self.data_file = data_file
         self.data = None
+        self.statistics = None  # 분석별 충분통계 (get_statistics에서 준비)
+        self.window_counts = None  # 회차 구간 빈도 누적 카운트 (get_window_counts에서 준비)
+        self.draw_index = None  # 1등 번호 정렬 색인 (get_draw_index에서 준비)
         self.results_dir = 'analysis_results'
         self.charts_dir = 'charts'
+        self.state_dir = 'analysis_state'
 
         # 디렉토리 생성 (더 안전하게)
-        for directory in [self.results_dir, self.charts_dir, 'logs']:
+        for directory in [self.results_dir, self.charts_dir, self.state_dir, 'logs']:
             try:
                 os.makedirs(directory, exist_ok=True)
             except PermissionError:
@@ -91,8 +109,7 @@ class PensionLotteryAnalyzer:
             self.data['round'] = self.data['round'].astype(int)
             self.data['jo'] = self.data['jo'].astype(int)
 
-            self.logger.info(f"데이터 로드 완료: {len(self.data)}개 회차")
-            return True
+            return self.use_data(self.data)
         except FileNotFoundError:
             self.logger.error(f"데이터 파일을 찾을 수 없습니다: {self.data_file}")
             return False
@@ -100,29 +117,98 @@ class PensionLotteryAnalyzer:
             self.logger.error(f"데이터 로드 실패: {e}")
             return False
 
-    def analyze_jo_frequency(self):
+    def use_data(self, data):
+        """정제된 데이터프레임(round, jo, first_number, second_number)을 분석 대상으로 설정
+
+        공유 메모리 위의 데이터프레임도 복사 없이 그대로 사용한다.
+        """
+        self.data = data
+        self.statistics = None
+        self.window_counts = None
+        self.draw_index = None
+
+        self.logger.info(f"데이터 로드 완료: {len(self.data)}개 회차")
+        return True
+
+    def compute_statistics(self, start=0):
+        """start번째 회차 이후 데이터의 충분통계 계산"""
+        data = self.data.iloc[start:]
+        rounds = data['round'].to_numpy(dtype=np.int64)
+
+        # 2등 번호 끝자리 (숫자가 아닌 값과 공유 메모리의 결측 표시(-1)는 제외)
+        second_numbers = pd.to_numeric(data['second_number'], errors='coerce')
+        second_numbers = second_numbers[second_numbers >= 0]
+        last_digits = second_numbers.to_numpy(dtype=np.int64) % 10
+
+        return {
+            'jo.counts': np.bincount(data['jo'].to_numpy(dtype=np.int64), minlength=6),
+            'second.last_digit_counts': np.bincount(last_digits, minlength=10),
+            'rounds.min': np.int64(rounds.min(initial=np.iinfo(np.int64).max)),
+            'rounds.max': np.int64(rounds.max(initial=np.iinfo(np.int64).min))
+        }
+
+    def get_statistics(self, incremental=False):
+        """분석용 충분통계 준비
+
+        incremental이 True이면 상태 파일의 통계에 마지막 처리 회차 이후의 새 회차만 반영한다.
+        이전 회차 데이터가 바뀐 경우에는 전체를 다시 계산한다.
+        """
+        if self.statistics is None:
+            state = AnalysisState('basic', self.lottery_type, self.state_dir)
+            self.statistics, mode = update_statistics(state, row_keys(self.data), self.compute_statistics,
+                                                      self.STATISTICS_RULES, incremental)
+            self.logger.info(f"기본 충분통계 준비 완료 ({mode}, 마지막 회차: {state.last_round})")
+        return self.statistics
+
+    def get_window_counts(self):
+        """임의 회차 구간 빈도 질의용 누적 카운트 준비 (한 번만 생성)"""
+        if self.window_counts is None:
+            self.window_counts = RoundWindowCounts.from_dataframe(self.data)
+        return self.window_counts
+
+    def get_draw_index(self):
+        """1등 번호(조 + 6자리) 출현 이력 색인 준비 (한 번만 생성)"""
+        if self.draw_index is None:
+            self.draw_index = DrawIndex.from_dataframe(self.data)
+        return self.draw_index
+
+    def lookup_number(self, jo, number):
+        """1등 번호의 출현 여부, 출현 횟수, 첫/마지막 출현 회차 조회"""
+        return self.get_draw_index().lookup(jo, number)
+
+    def analyze_jo_frequency(self, recent_window=50, offset=0):
         """조별 출현 빈도 분석"""
         self.logger.info("조별 출현 빈도 분석 시작")
 
-        jo_counts = self.data['jo'].value_counts().sort_index()
-        jo_percentages = (jo_counts / len(self.data) * 100).round(2)
+        if len(self.data) - offset < 1:
+            self.logger.warning("데이터가 부족하여 조별 출현 빈도 분석을 건너뜁니다.")
+            return {}
 
-        # 최근 50회차 트렌드
-        recent_data = self.data.tail(50)
-        recent_jo_counts = recent_data['jo'].value_counts().sort_index()
+        jo_frequency = count_dict(self.get_statistics()['jo.counts'])
+        jo_counts = np.array(list(jo_frequency.values()))
+        jo_percentages = np.round(jo_counts / len(self.data) * 100, 2)
+
+        # 최근 recent_window회차 트렌드 (데이터가 부족하면 가능한 회차만 사용)
+        window_counts = self.get_window_counts()
+        recent_window = max(1, min(recent_window, len(self.data) - offset))
+        recent_jo_counts = window_counts.jo_counts(*window_counts.window_bounds(recent_window, offset))
+
+        jos = list(jo_frequency.keys())
+        most, least = int(np.argmax(jo_counts)), int(np.argmin(jo_counts))
 
         results = {
-            'jo_frequency': jo_counts.to_dict(),
-            'jo_percentages': jo_percentages.to_dict(),
-            'recent_jo_frequency': recent_jo_counts.to_dict(),
+            'jo_frequency': jo_frequency,
+            'jo_percentages': dict(zip(jos, jo_percentages.tolist())),
+            'recent_jo_frequency': count_dict(recent_jo_counts),
+            'recent_window': recent_window,
             'most_frequent_jo': {
-                'jo': int(jo_counts.idxmax()),
-                'count': int(jo_counts.max()),
+                'jo': jos[most],
+                'count': int(jo_counts[most]),
                 'percentage': float(jo_percentages.max())
             },
             'least_frequent_jo': {
-                'jo': int(jo_counts.idxmin()),
-                'count': int(jo_counts.min()),
+                'jo': jos[least],
+                'count': int(jo_counts[least]),
                 'percentage': float(jo_percentages.min())
             }
         }
@@ -134,22 +220,25 @@ class PensionLotteryAnalyzer:
         """2등 끝자리 번호 패턴 분석"""
         self.logger.info("2등 끝자리 번호 패턴 분석 시작")
 
-        # 2등 번호의 끝자리 분석
-        second_last_digits = self.data['second_number'].astype(str).str[-1]
-        digit_counts = second_last_digits.value_counts().sort_index()
-        digit_percentages = (digit_counts / len(self.data) * 100).round(2)
+        # 2등 번호의 끝자리 분포 (충분통계의 0~9 빈도)
+        last_digit_frequency = {str(digit): count for digit, count in
+                                count_dict(self.get_statistics()['second.last_digit_counts']).items()}
+        digits = list(last_digit_frequency.keys())
+        digit_counts = np.array(list(last_digit_frequency.values()))
+        digit_percentages = np.round(digit_counts / len(self.data) * 100, 2)
+        most, least = int(np.argmax(digit_counts)), int(np.argmin(digit_counts))
 
         results = {
-            'last_digit_frequency': digit_counts.to_dict(),
-            'last_digit_percentages': digit_percentages.to_dict(),
+            'last_digit_frequency': last_digit_frequency,
+            'last_digit_percentages': dict(zip(digits, digit_percentages.tolist())),
             'most_frequent_digit': {
-                'digit': digit_counts.idxmax(),
-                'count': int(digit_counts.max()),
+                'digit': digits[most],
+                'count': int(digit_counts[most]),
                 'percentage': float(digit_percentages.max())
             },
             'least_frequent_digit': {
-                'digit': digit_counts.idxmin(),
-                'count': int(digit_counts.min()),
+                'digit': digits[least],
+                'count': int(digit_counts[least]),
                 'percentage': float(digit_percentages.min())
             }
         }
@@ -157,35 +246,21 @@ class PensionLotteryAnalyzer:
         self.logger.info("2등 끝자리 번호 패턴 분석 완료")
         return results
 
-    def analyze_trends(self):
-        """최근 트렌드 분석"""
-        self.logger.info("최근 트렌드 분석 시작")
-
-        # 최근 50회차와 전체 데이터 비교
-        recent_data = self.data.tail(50)
+    def analyze_trends(self, window=50, offset=0):
+        """최근 트렌드 분석
 
-        # 조별 트렌드
-        overall_jo_freq = self.data['jo'].value_counts(normalize=True).sort_index()
-        recent_jo_freq = recent_data['jo'].value_counts(normalize=True).sort_index()
+        최근 offset회차를 제외한 직전 window회차의 조별 비율을 전체 비율과 비교한다.
+        """
+        self.logger.info("최근 트렌드 분석 시작")
 
-        trend_changes = {}
-        for jo in range(1, 6):
-            overall_pct = overall_jo_freq.get(jo, 0) * 100
-            recent_pct = recent_jo_freq.get(jo, 0) * 100
-            change = recent_pct - overall_pct
+        if len(self.data) - offset < 1:
+            self.logger.warning("데이터가 부족하여 트렌드 분석을 건너뜁니다.")
+            return {}
 
-            trend_changes[jo] = {
-                'overall_percentage': round(overall_pct, 2),
-                'recent_percentage': round(recent_pct, 2),
-                'change': round(change, 2),
-                'trend': 'up' if change > 2 else ('down' if change < -2 else 'stable')
-            }
-
-        results = {
-            'trend_period': f"최근 50회차 ({recent_data['round'].min()}회 ~ {recent_data['round'].max()}회)",
-            'jo_trends': trend_changes,
-            'analysis_date': datetime.now().isoformat()
-        }
+        # 최근 window회차와 전체 데이터 비교 (누적 카운트 차이로 구간 빈도 계산, 데이터가 부족하면 가능한 회차만 사용)
+        window = max(1, min(window, len(self.data) - offset))
+        results = jo_trends(self.get_window_counts(), window, offset)
+        results['analysis_date'] = datetime.now().isoformat()
 
         self.logger.info("최근 트렌드 분석 완료")
         return results
@@ -219,7 +294,7 @@ class PensionLotteryAnalyzer:
         recent_counts = list(jo_data['recent_jo_frequency'].values())
 
         bars2 = ax2.bar(recent_jos, recent_counts, color=colors, alpha=0.8)
-        ax2.set_title('조별 출현 빈도 (최근 50회차)', fontsize=14, fontweight='bold', pad=20)
+        ax2.set_title(f"조별 출현 빈도 (최근 {jo_data['recent_window']}회차)", fontsize=14, fontweight='bold', pad=20)
         ax2.set_xlabel('조')
         ax2.set_ylabel('출현 횟수')
         ax2.set_xticks(recent_jos)
@@ -237,7 +312,7 @@ class PensionLotteryAnalyzer:
         # 최근 트렌드만 별도 저장
         plt.figure(figsize=(10, 6))
         bars = plt.bar(recent_jos, recent_counts, color=colors, alpha=0.8)
-        plt.title('최근 조별 출현 빈도 (50회차)', fontsize=14, fontweight='bold', pad=20)
+        plt.title(f"최근 조별 출현 빈도 ({jo_data['recent_window']}회차)", fontsize=14, fontweight='bold', pad=20)
         plt.xlabel('조')
         plt.ylabel('출현 횟수')
         plt.xticks(recent_jos, [f'{jo}조' for jo in recent_jos])
@@ -280,6 +355,27 @@ class PensionLotteryAnalyzer:
 
         self.logger.info("2등 끝자리 번호 차트 생성 완료")
 
+    def analyze_repeat_numbers(self):
+        """1등 번호 중복 출현 분석 (같은 조·번호가 2회 이상 당첨된 경우)"""
+        self.logger.info("1등 번호 중복 출현 분석 시작")
+
+        draw_index = self.get_draw_index()
+        _, counts = draw_index.duplicates(min_count=1)
+
+        results = {
+            'total_draws': len(draw_index),
+            'unique_numbers': len(counts),
+            'repeated_numbers': draw_index.duplicate_summary(min_count=2),
+            'analysis_date': datetime.now().isoformat()
+        }
+
+        # 결과 저장
+        with open(f'{self.results_dir}/repeat_numbers.json', 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+        self.logger.info(f"1등 번호 중복 출현 분석 완료 (중복 {len(results['repeated_numbers'])}건)")
+        return results
+
     def generate_statistics_report(self, jo_data, second_data, trend_data):
         """통계 보고서 생성"""
         self.logger.info("통계 보고서 생성 시작")
@@ -287,7 +383,7 @@ class PensionLotteryAnalyzer:
         report = {
             'analysis_summary': {
                 'total_rounds': len(self.data),
-                'data_range': f"{self.data['round'].min()}회 ~ {self.data['round'].max()}회",
+                'data_range': f"{self.get_statistics()['rounds.min']}회 ~ {self.get_statistics()['rounds.max']}회",
                 'lottery_type': self.lottery_type,
                 'analysis_date': datetime.now().isoformat()
             },
@@ -331,28 +427,53 @@ class PensionLotteryAnalyzer:
         self.logger.info("통계 보고서 생성 완료")
         return report
 
-    def run_full_analysis(self):
-        """전체 분석 실행"""
+    def analyze_all(self, incremental=False):
+        """차트를 제외한 전체 기본 분석 실행 (데이터는 미리 로드되어 있어야 함)"""
+        # 0. 충분통계 준비 (증분 모드에서는 새 회차만 계산)
+        self.get_statistics(incremental)
+
+        # 1. 조별 출현 빈도 분석
+        jo_data = self.analyze_jo_frequency()
+
+        # 2. 2등 끝자리 번호 패턴 분석
+        second_data = self.analyze_second_number_pattern()
+
+        # 3. 최근 트렌드 분석
+        trend_data = self.analyze_trends()
+
+        # 4. 1등 번호 중복 출현 분석
+        repeat_data = self.analyze_repeat_numbers()
+
+        # 5. 통계 보고서 생성
+        report = self.generate_statistics_report(jo_data, second_data, trend_data)
+
+        return {
+            'jo': jo_data,
+            'second': second_data,
+            'trends': trend_data,
+            'repeats': repeat_data,
+            'report': report
+        }
+
+    def run_full_analysis(self, incremental=False, data=None):
+        """전체 분석 실행
+
+        incremental이 True이면 저장된 상태 이후의 새 회차만 처리한다.
+        data가 주어지면 데이터 파일 대신 해당 데이터프레임을 분석한다.
+        """
         self.logger.info(f"=== 연금복권{self.lottery_type} 기본 분석 시작 ===")
 
-        # 데이터 로드
-        if not self.load_data():
+        # 데이터 로드 (data가 주어지면 파일을 읽지 않고 그대로 사용)
+        if not (self.use_data(data) if data is not None else self.load_data()):
             return False
 
         try:
-            # 1. 조별 출현 빈도 분석
-            jo_data = self.analyze_jo_frequency()
-            self.create_jo_frequency_chart(jo_data)
-
-            # 2. 2등 끝자리 번호 패턴 분석
-            second_data = self.analyze_second_number_pattern()
-            self.create_second_number_chart(second_data)
-
-            # 3. 최근 트렌드 분석
-            trend_data = self.analyze_trends()
+            # 1~5. 기본 분석 및 통계 보고서
+            results = self.analyze_all(incremental)
 
-            # 4. 통계 보고서 생성
-            report = self.generate_statistics_report(jo_data, second_data, trend_data)
+            # 6. 차트 생성
+            self.create_jo_frequency_chart(results['jo'])
+            self.create_second_number_chart(results['second'])
 
             self.logger.info("=== 기본 분석 완료 ===")
             print(f"연금복권{self.lottery_type} 기본 분석이 완료되었습니다!")
@@ -368,14 +489,17 @@ class PensionLotteryAnalyzer:
 
 def main():
     """메인 함수"""
-    # 환경변수에서 연금복권 타입 확인
+    # 환경변수에서 연금복권 타입 및 증분 분석 여부 확인
     lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    incremental = os.environ.get('ANALYSIS_INCREMENTAL') == '1'
 
     # 명령행 인수 처리
     if len(sys.argv) > 1:
         for i, arg in enumerate(sys.argv):
             if arg == '--type' and i + 1 < len(sys.argv):
                 lottery_type = sys.argv[i + 1]
+            elif arg == '--incremental':
+                incremental = True
 
     # 대화형 모드
     if lottery_type not in ['720', '520']:
@@ -391,12 +515,13 @@ def main():
             lottery_type = "720"
 
     analyzer = PensionLotteryAnalyzer(lottery_type)
-    success = analyzer.run_full_analysis()
+    success = analyzer.run_full_analysis(incremental)
 
     if success:
         print(f"\n🎉 연금복권{lottery_type} 기본 분석이 성공적으로 완료되었습니다!")
         print("\n📁 생성된 파일들:")
         print("- analysis_results/statistics_report.json")
+        print("- analysis_results/repeat_numbers.json")
         print("- charts/jo_frequency.png")
         print("- charts/recent_jo_frequency.png")
         print("- charts/last_digit_frequency.png")
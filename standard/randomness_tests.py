@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 숫자열 무작위성 검정 모듈
+- 1등 번호 숫자를 회차 순서대로 이어 붙인 전체 숫자열과 자리별 숫자열(7개 숫자열)에 고전적 무작위성 검정을 적용
+  (카이제곱 균등성, 런 검정, 연속 쌍 검정, 간격 검정, 포커 검정)
+- 검정마다 합산 가능한 통계(빈도표, 런 수 등)만 누적하고 청크 경계에 걸친 값(직전 숫자, 진행 중인 간격,
+  묶음에 못 들어간 숫자)은 숫자열별로 이어 받으므로, 메모리에 올릴 수 없는 큰 합성 이력도 청크 단위로 검정 가능
+- 각 청크는 숫자 행렬(K×6) 전체에 대한 벡터 연산으로 처리
+
+사용법: python randomness_tests.py [--type 720] [--synthetic 10000000] [--chunk-rows 1000000] [--seed 0]
+"""
+
+import os
+import sys
+import json
+import math
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from digit_engine import build_digit_matrix, NUM_POSITIONS, NUM_DIGITS
+from exact_distributions import chi_square_test
+
+STREAMS = ['전체'] + [f'자리{pos + 1}' for pos in range(NUM_POSITIONS)]
+NUM_STREAMS = len(STREAMS)
+
+# 검정 이름: 설명
+TESTS = {
+    'uniformity': '카이제곱 균등성 검정 (숫자 0~9 빈도)',
+    'runs': '런 검정 (5 이상/미만 구분의 연속 구간 수)',
+    'serial': '연속 쌍 검정 (겹치지 않는 두 숫자 쌍 100가지 빈도)',
+    'gap': '간격 검정 (0~2 숫자 사이에 낀 다른 숫자 수)',
+    'poker': '포커 검정 (5개 숫자 묶음의 서로 다른 숫자 수)'
+}
+
+RUNS_THRESHOLD = 5  # 런 검정의 상위 구분 (숫자 >= 5)
+GAP_MARKED = 3  # 간격 검정의 표시 숫자 (0 ~ GAP_MARKED - 1)
+GAP_LIMIT = 15  # 간격 검정의 마지막 구간 (간격 >= GAP_LIMIT)
+POKER_HAND = 5  # 포커 검정의 묶음 크기
+DEFAULT_ALPHA = 0.01  # 이상 표시 유의수준
+DEFAULT_CHUNK_ROWS = 1000000
+
+# 숫자 집합 비트마스크(10비트)별 서로 다른 숫자 수
+DISTINCT_COUNTS = np.array([bin(mask).count('1') for mask in range(1 << NUM_DIGITS)], dtype=np.int64)
+
+
+def gap_pmf(marked=GAP_MARKED, limit=GAP_LIMIT):
+    """간격 길이 분포 (r = 0 ~ limit - 1은 p(1-p)^r, 마지막 구간은 (1-p)^limit)"""
+    p = marked / NUM_DIGITS
+    pmf = p * (1 - p) ** np.arange(limit, dtype=np.float64)
+    return np.append(pmf, (1 - p) ** limit)
+
+
+def poker_pmf(hand=POKER_HAND):
+    """hand개 숫자 묶음에서 서로 다른 숫자 수의 분포 (인덱스 = 서로 다른 숫자 수)
+
+    P(k) = S(hand, k) × 10·9·…·(10 - k + 1) / 10^hand (S: 제2종 스털링 수)
+    """
+    stirling = [[0] * (hand + 1) for _ in range(hand + 1)]
+    stirling[0][0] = 1
+    for n in range(1, hand + 1):
+        for k in range(1, n + 1):
+            stirling[n][k] = k * stirling[n - 1][k] + stirling[n - 1][k - 1]
+    return np.array([stirling[hand][k] * math.perm(NUM_DIGITS, k) for k in range(hand + 1)],
+                    dtype=np.float64) / NUM_DIGITS ** hand
+
+
+def runs_test(high, total, runs):
+    """5 이상/미만 구분 런 수의 정규 근사 양측 검정 (Wald-Wolfowitz)"""
+    low = total - high
+    if high == 0 or low == 0 or total < 2:
+        return {'runs': int(runs), 'expected_runs': None, 'statistic': None, 'p_value': None}
+
+    expected = 1 + 2.0 * high * low / total
+    variance = 2.0 * high * low * (2.0 * high * low - total) / (total ** 2 * (total - 1))
+    z = (runs - expected) / math.sqrt(variance) if variance > 0 else 0.0
+    return {
+        'runs': int(runs),
+        'expected_runs': round(expected, 4),
+        'statistic': round(z, 4),
+        'p_value': round(math.erfc(abs(z) / math.sqrt(2)), 6)
+    }
+
+
+class RandomnessBattery:
+    """숫자 행렬 청크를 차례로 받아 7개 숫자열의 무작위성 검정 통계를 누적"""
+
+    def __init__(self):
+        self.num_rounds = 0
+        self.digit_counts = np.zeros((NUM_STREAMS, NUM_DIGITS), dtype=np.int64)
+
+        # 런 검정: 상위 숫자 수, 구분이 바뀐 횟수, 직전 숫자의 구분 (-1: 없음)
+        self.high_counts = np.zeros(NUM_STREAMS, dtype=np.int64)
+        self.class_changes = np.zeros(NUM_STREAMS, dtype=np.int64)
+        self.last_class = np.full(NUM_STREAMS, -1, dtype=np.int64)
+
+        # 연속 쌍·포커 검정: 빈도표와 묶음에 못 들어간 숫자
+        self.pair_counts = np.zeros((NUM_STREAMS, NUM_DIGITS * NUM_DIGITS), dtype=np.int64)
+        self.poker_counts = np.zeros((NUM_STREAMS, POKER_HAND + 1), dtype=np.int64)
+        self.pending = {'serial': [np.zeros(0, dtype=np.int64)] * NUM_STREAMS,
+                        'poker': [np.zeros(0, dtype=np.int64)] * NUM_STREAMS}
+
+        # 간격 검정: 간격 길이 빈도와 마지막 표시 숫자 이후 진행 중인 간격 (-1: 표시 숫자가 아직 없음)
+        self.gap_counts = np.zeros((NUM_STREAMS, GAP_LIMIT + 1), dtype=np.int64)
+        self.open_gap = np.full(NUM_STREAMS, -1, dtype=np.int64)
+
+    def _groups(self, name, stream, values, size):
+        """이전 청크에서 남은 숫자를 앞에 붙여 size개씩 묶고, 남는 숫자는 다음 청크로 넘김"""
+        values = np.concatenate([self.pending[name][stream], values])
+        usable = len(values) // size * size
+        self.pending[name][stream] = values[usable:]
+        return values[:usable].reshape(-1, size)
+
+    def _add_stream(self, stream, values):
+        """숫자열 하나의 청크 반영"""
+        self.digit_counts[stream] += np.bincount(values, minlength=NUM_DIGITS)
+
+        classes = (values >= RUNS_THRESHOLD).astype(np.int64)
+        self.high_counts[stream] += int(classes.sum())
+        self.class_changes[stream] += int(np.count_nonzero(classes[1:] != classes[:-1]))
+        if self.last_class[stream] >= 0:
+            self.class_changes[stream] += int(classes[0] != self.last_class[stream])
+        self.last_class[stream] = classes[-1]
+
+        pairs = self._groups('serial', stream, values, 2)
+        self.pair_counts[stream] += np.bincount(pairs[:, 0] * NUM_DIGITS + pairs[:, 1],
+                                                minlength=NUM_DIGITS * NUM_DIGITS)
+
+        hands = self._groups('poker', stream, values, POKER_HAND)
+        masks = np.bitwise_or.reduce(np.left_shift(1, hands), axis=1)
+        self.poker_counts[stream] += np.bincount(DISTINCT_COUNTS[masks], minlength=POKER_HAND + 1)
+
+        # 표시 숫자 위치의 차이 - 1이 간격, 청크 첫 간격은 진행 중이던 간격에 이어서 계산
+        marked = np.flatnonzero(values < GAP_MARKED)
+        if len(marked):
+            gaps = np.diff(marked) - 1
+            if self.open_gap[stream] >= 0:
+                gaps = np.append(self.open_gap[stream] + marked[0], gaps)
+            self.gap_counts[stream] += np.bincount(np.minimum(gaps, GAP_LIMIT), minlength=GAP_LIMIT + 1)
+            self.open_gap[stream] = len(values) - 1 - marked[-1]
+        elif self.open_gap[stream] >= 0:
+            self.open_gap[stream] += len(values)
+
+    def add(self, digits):
+        """숫자 행렬 청크(K×6, 회차 순서) 반영: 전체 숫자열은 행 순서로 이어 붙이고 자리별 숫자열은 열"""
+        digits = np.asarray(digits, dtype=np.int64).reshape(-1, NUM_POSITIONS)
+        if not len(digits):
+            return
+
+        self._add_stream(0, digits.ravel())
+        for pos in range(NUM_POSITIONS):
+            self._add_stream(pos + 1, np.ascontiguousarray(digits[:, pos]))
+        self.num_rounds += len(digits)
+
+    def stream_results(self, stream):
+        """숫자열 하나의 검정 결과 (검정별 통계량, 자유도, p-값)"""
+        total = int(self.digit_counts[stream].sum())
+        runs = int(self.class_changes[stream]) + 1 if total else 0
+        pair_total = int(self.pair_counts[stream].sum())
+        gap_total = int(self.gap_counts[stream].sum())
+        poker_total = int(self.poker_counts[stream].sum())
+
+        return {
+            'uniformity': {**chi_square_test(self.digit_counts[stream], np.full(NUM_DIGITS, 0.1)), 'count': total}
+            if total else None,
+            'runs': {**runs_test(int(self.high_counts[stream]), total, runs), 'count': total} if total else None,
+            'serial': {**chi_square_test(self.pair_counts[stream], np.full(NUM_DIGITS ** 2, 0.01)),
+                       'count': pair_total} if pair_total else None,
+            'gap': {**chi_square_test(self.gap_counts[stream], gap_pmf()), 'count': gap_total} if gap_total else None,
+            'poker': {**chi_square_test(self.poker_counts[stream], poker_pmf()), 'count': poker_total}
+            if poker_total else None
+        }
+
+    def results(self, alpha=DEFAULT_ALPHA):
+        """전체 검정 결과와 p-값이 alpha 미만인 (숫자열, 검정) 목록"""
+        streams = {name: self.stream_results(stream) for stream, name in enumerate(STREAMS)}
+        flagged = [{'stream': name, 'test': test, 'p_value': result['p_value']}
+                   for name, tests in streams.items() for test, result in tests.items()
+                   if result and result['p_value'] is not None and result['p_value'] < alpha]
+
+        return {
+            'num_rounds': self.num_rounds,
+            'num_digits': int(self.digit_counts[0].sum()),
+            'alpha': alpha,
+            'tests': TESTS,
+            'streams': streams,
+            'flagged': flagged,
+            'expected_false_flags': round(alpha * sum(result is not None and result['p_value'] is not None
+                                                      for tests in streams.values() for result in tests.values()), 2)
+        }
+
+
+def run_battery(chunks, alpha=DEFAULT_ALPHA):
+    """숫자 행렬 청크들을 차례로 검정 (청크는 제너레이터도 가능)"""
+    battery = RandomnessBattery()
+    for chunk in chunks:
+        battery.add(chunk)
+    return battery.results(alpha)
+
+
+def data_chunks(digits, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """숫자 행렬을 chunk_rows회차씩 나눈 청크"""
+    for start in range(0, len(digits), chunk_rows):
+        yield digits[start:start + chunk_rows]
+
+
+def synthetic_chunks(num_digits, chunk_rows=DEFAULT_CHUNK_ROWS, seed=0):
+    """균등 난수로 만든 합성 이력 청크 (전체 숫자 수 num_digits, 청크를 하나씩 생성하여 메모리 사용량 고정)"""
+    rng = np.random.default_rng(seed)
+    remaining = -(-num_digits // NUM_POSITIONS)
+    while remaining > 0:
+        rows = min(chunk_rows, remaining)
+        yield rng.integers(0, NUM_DIGITS, size=(rows, NUM_POSITIONS), dtype=np.int8)
+        remaining -= rows
+
+
+def main():
+    """메인 함수"""
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    synthetic = None
+    chunk_rows = DEFAULT_CHUNK_ROWS
+    seed = 0
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--synthetic' and i + 1 < len(sys.argv):
+            synthetic = int(sys.argv[i + 1])
+        elif arg == '--chunk-rows' and i + 1 < len(sys.argv):
+            chunk_rows = int(sys.argv[i + 1])
+        elif arg == '--seed' and i + 1 < len(sys.argv):
+            seed = int(sys.argv[i + 1])
+
+    started = time.perf_counter()
+    if synthetic is not None:
+        source = f'합성 이력 ({synthetic:,}개 숫자, 시드 {seed})'
+        report = run_battery(synthetic_chunks(synthetic, chunk_rows, seed))
+    else:
+        data_file = f'lottery_data/pension_lottery_{lottery_type}_all.csv'
+        try:
+            data = pd.read_csv(data_file, encoding='utf-8')
+        except FileNotFoundError:
+            print(f"❌ 데이터 파일을 찾을 수 없습니다: {data_file}")
+            sys.exit(1)
+        data = data.sort_values('round')
+        source = f'연금복권{lottery_type} 1등 번호 ({len(data)}회차)'
+        report = run_battery(data_chunks(build_digit_matrix(data['first_number']), chunk_rows))
+    elapsed = time.perf_counter() - started
+
+    report['source'] = source
+    report['seconds'] = round(elapsed, 3)
+    report['analysis_date'] = datetime.now().isoformat()
+
+    print(f"=== 숫자열 무작위성 검정: {source} ===")
+    print(f"{'숫자열':<6} " + ' '.join(f'{test:>10}' for test in TESTS))
+    for name, tests in report['streams'].items():
+        values = [f"{result['p_value']:>10.4f}" if result and result['p_value'] is not None else f"{'-':>10}"
+                  for result in tests.values()]
+        print(f"{name:<6} " + ' '.join(values))
+    print(f"p < {report['alpha']} 검정: {len(report['flagged'])}개 (우연히 기대되는 수 {report['expected_false_flags']}개), "
+          f"{report['num_digits']:,}개 숫자, {elapsed:.2f}초")
+
+    if synthetic is None:
+        os.makedirs('analysis_results', exist_ok=True)
+        with open('analysis_results/randomness_tests.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print("결과 파일: analysis_results/randomness_tests.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 미출현 회차·재출현 간격 추적 모듈
+- 자리별 숫자 60개(자리*10 + 숫자)와 조 5개(60 + 조 - 1)를 65개 기호로 보고 회차마다 7개 기호가 출현한 것으로 취급
+- 전체 회차는 (기호, 회차 순번)을 기호별로 안정 정렬한 한 번의 벡터 연산으로 마지막 출현 순번과 재출현 간격 히스토그램을 집계
+- 새 회차는 출현한 7개 기호의 마지막 출현 순번과 간격 히스토그램 한 칸씩만 갱신 (O(1))
+- 현재 미출현 회차 수, 평균·최대 간격, 미출현 회차의 백분위(과거 간격 중 현재 미출현 회차 이하인 비율)를 상태에서 바로 계산
+"""
+
+import numpy as np
+
+from digit_engine import NUM_POSITIONS, NUM_DIGITS, NUM_JOS
+from analysis_state import save_arrays, load_arrays
+
+NUM_POSITION_SYMBOLS = NUM_POSITIONS * NUM_DIGITS
+NUM_SYMBOLS = NUM_POSITION_SYMBOLS + NUM_JOS
+
+# 간격 히스토그램의 초기 칸 수 (더 긴 간격이 나오면 늘림)
+INITIAL_GAP_BINS = 64
+
+
+def round_symbols(digits, jos):
+    """회차별 출현 기호 행렬 (N×7, 자리 기호 6개 + 조 기호, 범위 밖 조는 -1)"""
+    digits = np.asarray(digits, dtype=np.int64).reshape(-1, NUM_POSITIONS)
+    jos = np.asarray(jos, dtype=np.int64).reshape(-1)
+    jo_symbols = np.where((jos >= 1) & (jos <= NUM_JOS), NUM_POSITION_SYMBOLS + jos - 1, -1)
+    return np.column_stack([np.arange(NUM_POSITIONS) * NUM_DIGITS + digits, jo_symbols])
+
+
+class RecurrenceTracker:
+    """기호별 마지막 출현 순번과 재출현 간격 통계 상태"""
+
+    def __init__(self):
+        self.last_seen = np.full(NUM_SYMBOLS, -1, dtype=np.int64)  # 마지막 출현 회차 순번 (-1: 미출현)
+        self.appearances = np.zeros(NUM_SYMBOLS, dtype=np.int64)
+        self.gap_counts = np.zeros((NUM_SYMBOLS, INITIAL_GAP_BINS), dtype=np.int64)  # [기호, 간격] 횟수
+        self.gap_sum = np.zeros(NUM_SYMBOLS, dtype=np.int64)
+        self.gap_max = np.zeros(NUM_SYMBOLS, dtype=np.int64)
+        self.num_rounds = 0
+        self.last_round = None
+
+    @classmethod
+    def from_history(cls, digits, jos, rounds=None):
+        """전체 회차에서 생성"""
+        tracker = cls()
+        tracker.extend(digits, jos, rounds)
+        return tracker
+
+    def _ensure_bins(self, gap):
+        """간격 gap을 담을 수 있도록 히스토그램 칸 수를 두 배씩 늘림"""
+        bins = self.gap_counts.shape[1]
+        if gap >= bins:
+            while gap >= bins:
+                bins *= 2
+            grown = np.zeros((NUM_SYMBOLS, bins), dtype=np.int64)
+            grown[:, :self.gap_counts.shape[1]] = self.gap_counts
+            self.gap_counts = grown
+
+    def update(self, digits, jo, round_number=None):
+        """새 회차 하나 반영: 출현한 7개 기호의 간격·마지막 출현 순번만 갱신 (O(1))"""
+        index = self.num_rounds
+        symbols = [pos * NUM_DIGITS + int(digit) for pos, digit in enumerate(digits)]
+        if 1 <= int(jo) <= NUM_JOS:
+            symbols.append(NUM_POSITION_SYMBOLS + int(jo) - 1)
+
+        for symbol in symbols:
+            previous = self.last_seen[symbol]
+            if previous >= 0:
+                gap = index - previous
+                self._ensure_bins(gap)
+                self.gap_counts[symbol, gap] += 1
+                self.gap_sum[symbol] += gap
+                if gap > self.gap_max[symbol]:
+                    self.gap_max[symbol] = gap
+            self.last_seen[symbol] = index
+            self.appearances[symbol] += 1
+
+        self.num_rounds += 1
+        if round_number is not None:
+            self.last_round = int(round_number)
+
+    def extend(self, digits, jos, rounds=None):
+        """여러 회차를 순서대로 반영 (update를 회차마다 호출한 것과 같은 결과)
+
+        (기호, 회차 순번) 쌍을 기호별로 안정 정렬하면 각 기호의 출현 순번이 오름차순으로 모이므로,
+        바로 앞 원소(그룹 첫 원소는 저장된 마지막 출현 순번)와의 차이가 재출현 간격이 된다.
+        """
+        symbols = round_symbols(digits, jos)
+        count = len(symbols)
+        if not count:
+            return
+
+        indices = np.repeat(self.num_rounds + np.arange(count, dtype=np.int64), symbols.shape[1])
+        symbols = symbols.ravel()
+        valid = symbols >= 0
+        symbols, indices = symbols[valid], indices[valid]
+
+        # 기호 값이 작으므로 16비트 정수의 안정 정렬(기수 정렬)로 O(n) 정렬
+        order = np.argsort(symbols.astype(np.int16), kind='stable')
+        symbols, indices = symbols[order], indices[order]
+        first = np.ones(len(symbols), dtype=bool)
+        first[1:] = symbols[1:] != symbols[:-1]
+
+        previous = np.empty_like(indices)
+        previous[1:] = indices[:-1]
+        previous[first] = self.last_seen[symbols[first]]
+        has_gap = previous >= 0
+        gap_symbols, gaps = symbols[has_gap], (indices - previous)[has_gap]
+
+        if len(gaps):
+            self._ensure_bins(int(gaps.max()))
+            bins = self.gap_counts.shape[1]
+            self.gap_counts += np.bincount(gap_symbols * bins + gaps,
+                                           minlength=NUM_SYMBOLS * bins).reshape(NUM_SYMBOLS, bins)
+            self.gap_sum += np.bincount(gap_symbols, weights=gaps, minlength=NUM_SYMBOLS).astype(np.int64)
+            np.maximum.at(self.gap_max, gap_symbols, gaps)
+
+        last = np.ones(len(symbols), dtype=bool)
+        last[:-1] = symbols[:-1] != symbols[1:]
+        self.last_seen[symbols[last]] = indices[last]
+        self.appearances += np.bincount(symbols, minlength=NUM_SYMBOLS)
+
+        self.num_rounds += count
+        if rounds is not None and len(rounds):
+            self.last_round = int(np.asarray(rounds)[-1])
+
+    def overdue(self):
+        """기호별 현재 미출현 회차 수 (최신 회차에 나왔으면 0, 한 번도 안 나왔으면 전체 회차 수)"""
+        return np.where(self.last_seen >= 0, self.num_rounds - 1 - self.last_seen, self.num_rounds)
+
+    def interval_counts(self):
+        """기호별 재출현 간격 개수 (출현 횟수 - 1)"""
+        return self.gap_counts.sum(axis=1)
+
+    def mean_intervals(self):
+        """기호별 평균 재출현 간격 (간격이 없으면 NaN)"""
+        counts = self.interval_counts()
+        return np.divide(self.gap_sum, counts, out=np.full(NUM_SYMBOLS, np.nan), where=counts > 0)
+
+    def percentile_ranks(self):
+        """현재 미출현 회차 수 이하인 과거 간격의 비율 (0~100, 간격이 없으면 NaN)
+
+        100에 가까울수록 과거 어떤 재출현 간격보다도 오래 나오지 않은 상태다.
+        """
+        cumulative = np.cumsum(self.gap_counts, axis=1)
+        columns = np.minimum(self.overdue(), self.gap_counts.shape[1] - 1)
+        below = cumulative[np.arange(NUM_SYMBOLS), columns]
+        counts = cumulative[:, -1]
+        return np.divide(below * 100.0, counts, out=np.full(NUM_SYMBOLS, np.nan), where=counts > 0)
+
+    def symbol_rows(self):
+        """기호별 추적 결과 목록 (미출현 회차, 출현 횟수, 평균·최대 간격, 백분위)"""
+        overdue, means, ranks = self.overdue(), self.mean_intervals(), self.percentile_ranks()
+        return [{
+            'overdue': int(overdue[symbol]),
+            'appearances': int(self.appearances[symbol]),
+            'mean_interval': None if np.isnan(means[symbol]) else round(float(means[symbol]), 2),
+            'max_interval': int(self.gap_max[symbol]),
+            'percentile': None if np.isnan(ranks[symbol]) else round(float(ranks[symbol]), 1)
+        } for symbol in range(NUM_SYMBOLS)]
+
+    def interval_histogram(self, symbol):
+        """기호의 재출현 간격 히스토그램 ({간격: 횟수}, 횟수가 있는 간격만)"""
+        gaps = np.flatnonzero(self.gap_counts[symbol])
+        return {str(int(gap)): int(self.gap_counts[symbol, gap]) for gap in gaps}
+
+    def summary(self, top=3):
+        """JSON 저장·대시보드용 요약 (자리별 숫자·조 추적 결과, 자리별 최장 미출현 숫자, 조 간격 분포)"""
+        rows = self.symbol_rows()
+        overdue = self.overdue()
+
+        positions, most_overdue = {}, {}
+        for pos in range(NUM_POSITIONS):
+            start = pos * NUM_DIGITS
+            positions[f'자리{pos + 1}'] = {str(digit): rows[start + digit] for digit in range(NUM_DIGITS)}
+            order = np.argsort(-overdue[start:start + NUM_DIGITS], kind='stable')[:top]
+            most_overdue[f'자리{pos + 1}'] = [int(digit) for digit in order]
+
+        jo = {}
+        for index in range(NUM_JOS):
+            symbol = NUM_POSITION_SYMBOLS + index
+            jo[f'{index + 1}조'] = {**rows[symbol], 'interval_histogram': self.interval_histogram(symbol)}
+
+        return {
+            'num_rounds': self.num_rounds,
+            'last_round': self.last_round,
+            'positions': positions,
+            'most_overdue': most_overdue,
+            'jo': jo
+        }
+
+    def save(self, path, fingerprint=''):
+        """상태를 .npz 파일로 저장 (fingerprint: 반영한 회차들의 데이터 지문)"""
+        save_arrays(path, fingerprint, last_seen=self.last_seen, appearances=self.appearances,
+                    gap_counts=self.gap_counts, gap_sum=self.gap_sum, gap_max=self.gap_max, num_rounds=self.num_rounds,
+                    last_round=-1 if self.last_round is None else self.last_round)
+
+    @classmethod
+    def load(cls, path):
+        """.npz 파일에서 상태 로드 (반환값: (상태, 데이터 지문))"""
+        stored, fingerprint = load_arrays(path)
+        tracker = cls()
+        tracker.last_seen = stored['last_seen'].astype(np.int64)
+        tracker.appearances = stored['appearances'].astype(np.int64)
+        tracker.gap_counts = stored['gap_counts'].astype(np.int64)
+        tracker.gap_sum = stored['gap_sum'].astype(np.int64)
+        tracker.gap_max = stored['gap_max'].astype(np.int64)
+        tracker.num_rounds = int(stored['num_rounds'])
+        tracker.last_round = int(stored['last_round']) if int(stored['last_round']) >= 0 else None
+        return tracker, fingerprint
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권720+ 티켓 당첨 조회 엔진
+- 대량의 티켓(조 + 6자리)을 저장된 전체 회차의 당첨번호와 비교
+- 티켓×회차 끝자리를 브로드캐스트 비교하고, 끝자리가 일치한 쌍만 나머지 자리를 비교하여 일치한 끝자리 수 계산
+- 메모리 한도 안의 티켓 묶음(chunk) 단위로 처리, 프로세스 풀로 묶음 병렬 처리
+- 티켓별 최고 등급과 그 회차, 등급별 당첨 횟수 집계
+
+등급 (회차마다 티켓 하나는 가장 높은 등급 하나만 인정)
+- 1등: 조 + 6자리 일치, 2등: 6자리 일치 (조 불일치)
+- 3등~7등: 끝 5자리 ~ 끝 1자리 일치
+- 보너스: 보너스 번호 6자리 일치 (보너스 번호가 있는 데이터만)
+
+사용법: python ticket_checker.py <티켓 파일(.csv|.npy)> [--type 720] [--workers N] [--chunk 32768] [--output 파일]
+"""
+
+import os
+import sys
+import time
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from digit_engine import build_digit_matrix, NUM_POSITIONS, POSITION_SCALES
+
+# 등급 코드 (클수록 높은 등급): 0 낙첨, 1 7등, ..., 5 3등, 6 보너스, 7 2등, 8 1등
+PRIZE_TIERS = ['낙첨', '7등', '6등', '5등', '4등', '3등', '보너스', '2등', '1등']
+NUM_TIERS = len(PRIZE_TIERS)
+BONUS_TIER = PRIZE_TIERS.index('보너스')
+
+# [조 일치 여부, 일치한 끝자리 수] -> 등급 코드
+TIER_TABLE = np.array([
+    [0, 1, 2, 3, 4, 5, 7],
+    [0, 1, 2, 3, 4, 5, 8]
+], dtype=np.int8)
+
+# 등급별 당첨금 (원, 연금식 당첨금은 지급 총액 기준)
+PRIZE_AMOUNTS = {
+    '1등': 7000000 * 12 * 20,
+    '2등': 1000000 * 12 * 10,
+    '보너스': 1000000 * 12 * 10,
+    '3등': 1000000,
+    '4등': 100000,
+    '5등': 50000,
+    '6등': 5000,
+    '7등': 1000,
+    '낙첨': 0
+}
+
+DEFAULT_CHUNK_SIZE = 32768
+
+
+def tier_name(code):
+    """등급 코드의 이름"""
+    return PRIZE_TIERS[int(code)]
+
+
+def tier_amounts():
+    """등급 코드 순서의 당첨금 배열"""
+    return np.array([PRIZE_AMOUNTS[name] for name in PRIZE_TIERS], dtype=np.int64)
+
+
+def trailing_matches(ticket_codes, draw_codes):
+    """짝지은 티켓·당첨번호(6자리 정수)의 끝에서부터 연속으로 일치한 자리 수
+
+    끝 k자리가 같으면 두 번호의 차이가 10^k의 배수이므로, 차이가 10, 100, ...으로
+    나누어 떨어지는 쌍만 남겨 가며 센다 (단계마다 후보가 약 1/10로 줄어든다).
+    """
+    differences = np.asarray(ticket_codes, dtype=np.int32) - np.asarray(draw_codes, dtype=np.int32)
+    matched = (differences % 10 == 0).view(np.int8)
+
+    candidates = np.flatnonzero(matched)
+    for scale in 10 ** np.arange(2, NUM_POSITIONS + 1, dtype=np.int32):
+        candidates = candidates[differences[candidates] % scale == 0]
+        matched[candidates] += 1
+
+    return matched
+
+
+def match_tiers(ticket_jos, ticket_digits, draw_jos, draw_digits, bonus_digits=None):
+    """티켓 묶음(T×6)과 회차들(R×6)의 회차별 등급 코드 행렬 (T×R, int8)
+
+    winning_pairs의 참조 구현으로, 조회에는 쓰지 않고 benchmark.py --verify에서 결과 대조에만 쓴다.
+    뒷자리부터 한 자리씩 브로드캐스트 비교하여 연속으로 일치한 끝자리 수를 센다.
+    일치가 끊긴 쌍은 이후 자리에서 다시 늘어나지 않으므로 모든 쌍이 끊기면 비교를 멈춘다.
+    """
+    ticket_digits = np.asarray(ticket_digits, dtype=np.int8)
+    draw_digits = np.asarray(draw_digits, dtype=np.int8)
+
+    matched = np.zeros((len(ticket_digits), len(draw_digits)), dtype=np.int8)
+    running = np.ones(matched.shape, dtype=bool)
+    for position in range(NUM_POSITIONS - 1, -1, -1):
+        running &= ticket_digits[:, None, position] == draw_digits[None, :, position]
+        if not running.any():
+            break
+        matched += running
+
+    jo_match = np.asarray(ticket_jos)[:, None] == np.asarray(draw_jos)[None, :]
+    tiers = TIER_TABLE[jo_match.view(np.int8), matched]
+
+    # 보너스: 6자리 모두 일치 (조 무관), 2등 이상이 아닌 경우에만 등급을 올린다
+    if bonus_digits is not None:
+        bonus_digits = np.asarray(bonus_digits, dtype=np.int8)
+        bonus_match = (ticket_digits[:, None, :] == bonus_digits[None, :, :]).all(axis=2)
+        np.maximum(tiers, np.where(bonus_match, np.int8(BONUS_TIER), np.int8(0)), out=tiers)
+
+    return tiers
+
+
+def _bonus_pairs(ticket_digits, draws):
+    """보너스 번호 6자리가 일치하는 (티켓 인덱스, 회차 인덱스) 쌍 (정렬된 보너스 번호에서 이진 탐색)"""
+    ticket_codes = ticket_digits @ POSITION_SCALES
+    start = np.searchsorted(draws.bonus_codes, ticket_codes, side='left')
+    counts = np.searchsorted(draws.bonus_codes, ticket_codes, side='right') - start
+
+    rows = np.repeat(np.arange(len(ticket_codes)), counts)
+    offsets = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, draws.bonus_order[np.repeat(start, counts) + offsets]
+
+
+def winning_pairs(ticket_jos, ticket_digits, draws):
+    """티켓 묶음과 전체 회차 중 당첨(7등 이상)인 (티켓 인덱스, 회차 인덱스, 등급 코드)
+
+    끝자리를 T×R로 브로드캐스트 비교해 끝 1자리가 일치한 쌍(약 10%)만 골라낸 뒤,
+    그 쌍들만 나머지 자리와 조를 비교한다. 결과는 티켓·회차 순으로 정렬되어 있다.
+    """
+    num_rounds = len(draws)
+    rows, cols = np.nonzero(ticket_digits[:, None, -1] == draws.digits[None, :, -1])
+
+    ticket_codes = (ticket_digits @ POSITION_SCALES).astype(np.int32)
+    matched = trailing_matches(ticket_codes[rows], draws.codes[cols])
+    jo_match = ticket_jos[rows] == draws.jos[cols]
+    tiers = TIER_TABLE[jo_match.view(np.int8), matched]
+
+    if draws.bonus_codes is not None:
+        bonus_rows, bonus_cols = _bonus_pairs(ticket_digits, draws)
+        if len(bonus_rows):
+            keys = rows * num_rounds + cols
+            bonus_keys = bonus_rows * num_rounds + bonus_cols
+            position = np.minimum(np.searchsorted(keys, bonus_keys), max(len(keys) - 1, 0))
+            found = (keys[position] == bonus_keys) if len(keys) else np.zeros(len(bonus_keys), dtype=bool)
+
+            # 이미 당첨인 쌍은 등급을 올리고 (2등 이상은 유지), 나머지는 보너스 쌍으로 추가
+            np.maximum.at(tiers, position[found], np.int8(BONUS_TIER))
+            order = np.argsort(np.concatenate([keys, bonus_keys[~found]]), kind='stable')
+            rows = np.concatenate([rows, bonus_rows[~found]])[order]
+            cols = np.concatenate([cols, bonus_cols[~found]])[order]
+            tiers = np.concatenate([tiers, np.full((~found).sum(), BONUS_TIER, dtype=np.int8)])[order]
+
+    return rows, cols, tiers
+
+
+def summarize_pairs(rows, cols, tiers, num_tickets, rounds):
+    """당첨 쌍에서 티켓별 최고 등급, 그 회차(같은 등급이면 처음 회차), 등급별 횟수(T×9)"""
+    num_rounds = len(rounds)
+    tier_counts = np.bincount(rows * NUM_TIERS + tiers, minlength=num_tickets * NUM_TIERS)
+    tier_counts = tier_counts.reshape(num_tickets, NUM_TIERS)
+    tier_counts[:, 0] = num_rounds - tier_counts[:, 1:].sum(axis=1)
+
+    best_tiers = np.zeros(num_tickets, dtype=np.int8)
+    best_rounds = np.full(num_tickets, -1, dtype=np.int64)
+    if len(rows):
+        # 등급이 높을수록, 같은 등급이면 회차가 빠를수록 큰 값 -> 티켓별 최댓값
+        keys = tiers.astype(np.int64) * (num_rounds + 1) + (num_rounds - cols)
+        starts = np.flatnonzero(np.diff(rows, prepend=-1))
+        best_keys = np.maximum.reduceat(keys, starts)
+
+        tickets = rows[starts]
+        best_tiers[tickets] = best_keys // (num_rounds + 1)
+        best_rounds[tickets] = np.asarray(rounds)[num_rounds - best_keys % (num_rounds + 1)]
+
+    return best_tiers, best_rounds, tier_counts
+
+
+class Draws:
+    """비교 대상 회차들의 조, 1등 번호 숫자 행렬, 보너스 번호 숫자 행렬(없으면 None)"""
+
+    def __init__(self, rounds, jos, numbers, bonus_numbers=None):
+        self.rounds = np.asarray(rounds, dtype=np.int64)
+        self.jos = np.asarray(jos, dtype=np.int8)
+        self.digits = build_digit_matrix(numbers)
+        self.codes = (self.digits @ POSITION_SCALES).astype(np.int32)
+        self.bonus_digits = None
+        self.bonus_codes = None
+        self.bonus_order = None
+
+        if bonus_numbers is not None:
+            # 보너스 번호가 없는 회차는 -1 (어떤 숫자와도 일치하지 않음)
+            bonus = pd.to_numeric(pd.Series(bonus_numbers), errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+            self.bonus_digits = np.where(bonus[:, None] >= 0, build_digit_matrix(np.maximum(bonus, 0)), -1)
+            self.bonus_digits = self.bonus_digits.astype(np.int8)
+
+            # 티켓 번호로 이진 탐색할 수 있도록 보너스 번호를 정렬해 둔다
+            has_bonus = np.flatnonzero(bonus >= 0)
+            self.bonus_order = has_bonus[np.argsort(bonus[has_bonus], kind='stable')]
+            self.bonus_codes = bonus[self.bonus_order]
+
+    def __len__(self):
+        return len(self.rounds)
+
+    @classmethod
+    def from_dataframe(cls, data):
+        """분석기 데이터프레임(round, jo, first_number)에서 생성
+
+        크롤링 데이터의 second_number는 끝자리 한 자리뿐이므로 보너스 등급은 계산하지 않는다.
+        """
+        numbers = pd.to_numeric(data['first_number'], errors='coerce')
+        valid = numbers.notna().to_numpy() & (numbers >= 0).to_numpy()
+        return cls(data['round'].to_numpy()[valid], data['jo'].to_numpy()[valid],
+                   numbers.to_numpy()[valid].astype(np.int64))
+
+    @classmethod
+    def from_data_file(cls, data_file):
+        """크롤링 CSV 파일에서 생성 (분석기와 같은 정제 규칙 적용)"""
+        data = pd.read_csv(data_file, encoding='utf-8')
+        data['round'] = pd.to_numeric(data['round'], errors='coerce')
+        data['jo'] = pd.to_numeric(data['jo'], errors='coerce')
+        data = data.dropna(subset=['round', 'jo'])
+        return cls.from_dataframe(data)
+
+    @classmethod
+    def from_results_db(cls, db_name, round_number=None):
+        """lottery_results 테이블("5조162265" 형태 1등 번호, 6자리 보너스 번호)에서 생성"""
+        query = 'SELECT round_number, first_prize_numbers, bonus_numbers FROM lottery_results'
+        params = ()
+        if round_number is not None:
+            query += ' WHERE round_number = ?'
+            params = (int(round_number),)
+
+        conn = sqlite3.connect(db_name)
+        try:
+            data = pd.read_sql_query(query + ' ORDER BY round_number', conn, params=params)
+        finally:
+            conn.close()
+
+        parsed = data['first_prize_numbers'].astype(str).str.extract(r'(\d+)\s*조\s*(\d{6})')
+        valid = parsed.notna().all(axis=1).to_numpy()
+        bonus = data['bonus_numbers'].astype(str).str.extract(r'(\d{6})')[0]
+
+        return cls(data['round_number'].to_numpy()[valid], parsed[0].to_numpy()[valid].astype(np.int64),
+                   parsed[1].to_numpy()[valid].astype(np.int64), bonus.to_numpy()[valid])
+
+
+def parse_tickets(jos, numbers):
+    """티켓의 조와 번호를 검증하여 (조 배열, N×6 숫자 행렬)로 변환"""
+    jos = np.asarray(jos, dtype=np.int64)
+    numbers = np.asarray(numbers, dtype=np.int64)
+
+    if jos.shape != numbers.shape or jos.ndim != 1:
+        raise ValueError("티켓의 조와 번호 개수가 다릅니다.")
+    if len(jos) and (jos.min() < 1 or jos.max() > 5):
+        raise ValueError("조는 1~5 사이여야 합니다.")
+    if len(numbers) and (numbers.min() < 0 or numbers.max() >= 10 ** NUM_POSITIONS):
+        raise ValueError("번호는 000000~999999 사이여야 합니다.")
+
+    return jos.astype(np.int8), build_digit_matrix(numbers)
+
+
+def read_tickets(source):
+    """티켓 파일(.npy: N×2 [조, 번호] 배열, 그 외: jo/number 열이 있는 CSV)을 (조, 번호)로 읽기
+
+    CSV에 "5조162265" 형태의 ticket 열만 있어도 된다. source는 파일 경로 또는 파일 객체.
+    """
+    name = getattr(source, 'filename', None) or getattr(source, 'name', None) or str(source)
+    if name.endswith('.npy'):
+        tickets = np.load(source, allow_pickle=False)
+        if tickets.ndim != 2 or tickets.shape[1] != 2:
+            raise ValueError("티켓 배열은 N×2 [조, 번호] 형태여야 합니다.")
+        return tickets[:, 0], tickets[:, 1]
+
+    data = pd.read_csv(source, dtype=str, encoding='utf-8')
+    data.columns = [column.strip().lower() for column in data.columns]
+
+    if {'jo', 'number'} <= set(data.columns):
+        jos, numbers = data['jo'], data['number']
+    elif 'ticket' in data.columns:
+        parsed = data['ticket'].str.extract(r'(\d+)\s*조\s*(\d{6})')
+        jos, numbers = parsed[0], parsed[1]
+    else:
+        raise ValueError("CSV에 jo, number 열 또는 ticket 열이 필요합니다.")
+
+    jos = pd.to_numeric(jos, errors='coerce')
+    numbers = pd.to_numeric(numbers, errors='coerce')
+    if jos.isna().any() or numbers.isna().any():
+        raise ValueError("숫자가 아닌 조 또는 번호가 있습니다.")
+
+    return jos.to_numpy(dtype=np.int64), numbers.to_numpy(dtype=np.int64)
+
+
+def check_chunk(ticket_jos, ticket_digits, draws):
+    """티켓 묶음 하나를 전체 회차와 비교하여 (최고 등급, 최고 등급 회차, 등급별 횟수)"""
+    rows, cols, tiers = winning_pairs(ticket_jos, ticket_digits, draws)
+    return summarize_pairs(rows, cols, tiers, len(ticket_jos), draws.rounds)
+
+
+def _check_range(ticket_jos, ticket_digits, draws, chunk_size):
+    """작업 프로세스: 티켓 구간을 chunk_size개씩 나누어 순서대로 비교"""
+    results = [check_chunk(ticket_jos[start:start + chunk_size], ticket_digits[start:start + chunk_size], draws)
+               for start in range(0, len(ticket_jos), chunk_size)]
+    if not results:
+        return (np.zeros(0, np.int8), np.zeros(0, np.int64), np.zeros((0, NUM_TIERS), np.int64))
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+
+def check_tickets(jos, numbers, draws, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """티켓 전체를 모든 회차와 비교
+
+    메모리 사용량은 티켓 묶음 크기 × 회차 수에 비례하며 티켓 수와 무관하다.
+    workers가 2 이상이면 티켓을 작업 수만큼 나누어 프로세스 풀에서 처리한다.
+    반환값: {'best_tiers', 'best_rounds', 'tier_counts'} (티켓 순서)
+    """
+    ticket_jos, ticket_digits = parse_tickets(jos, numbers)
+    if len(draws) == 0:
+        raise ValueError("비교할 회차 데이터가 없습니다.")
+
+    if workers > 1 and len(ticket_jos) > chunk_size:
+        bounds = np.linspace(0, len(ticket_jos), workers + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_check_range, ticket_jos[start:end], ticket_digits[start:end], draws, chunk_size)
+                       for start, end in zip(bounds[:-1], bounds[1:])]
+            parts = [future.result() for future in futures]
+        best_tiers, best_rounds, tier_counts = (np.concatenate(values) for values in zip(*parts))
+    else:
+        best_tiers, best_rounds, tier_counts = _check_range(ticket_jos, ticket_digits, draws, chunk_size)
+
+    return {'best_tiers': best_tiers, 'best_rounds': best_rounds, 'tier_counts': tier_counts}
+
+
+def tier_summary(result):
+    """조회 결과 요약: 최고 등급별 티켓 수, 등급별 전체 당첨 횟수, 당첨금 합계"""
+    best_counts = np.bincount(result['best_tiers'], minlength=NUM_TIERS)
+    win_counts = result['tier_counts'].sum(axis=0)
+
+    return {
+        'best_tier_tickets': {name: int(best_counts[code]) for code, name in enumerate(PRIZE_TIERS)},
+        'total_wins': {name: int(win_counts[code]) for code, name in enumerate(PRIZE_TIERS) if code > 0},
+        'total_prize': int(win_counts @ tier_amounts())
+    }
+
+
+def ticket_rows(jos, numbers, result, limit=None):
+    """티켓별 결과 목록 (높은 등급 순, 같은 등급은 입력 순서)"""
+    order = np.argsort(-result['best_tiers'], kind='stable')
+    if limit is not None:
+        order = order[:limit]
+
+    jos, numbers = np.asarray(jos), np.asarray(numbers)
+    return [{
+        'jo': int(jos[i]),
+        'number': f'{int(numbers[i]):06d}',
+        'best_tier': tier_name(result['best_tiers'][i]),
+        'best_round': int(result['best_rounds'][i]) if result['best_rounds'][i] >= 0 else None,
+        'wins': {name: int(count) for name, count in zip(PRIZE_TIERS[1:], result['tier_counts'][i, 1:]) if count}
+    } for i in order]
+
+
+def save_results(path, jos, numbers, result):
+    """티켓별 결과를 CSV로 저장"""
+    columns = {'jo': np.asarray(jos), 'number': [f'{int(n):06d}' for n in numbers],
+               'best_tier': np.array(PRIZE_TIERS)[result['best_tiers']], 'best_round': result['best_rounds']}
+    for code in range(1, NUM_TIERS):
+        columns[f'wins_{PRIZE_TIERS[code]}'] = result['tier_counts'][:, code]
+    pd.DataFrame(columns).to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def main():
+    """메인 함수"""
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    workers = 1
+    chunk_size = DEFAULT_CHUNK_SIZE
+    output = None
+    db_name = None
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--workers' and i + 1 < len(sys.argv):
+            workers = int(sys.argv[i + 1])
+        elif arg == '--chunk' and i + 1 < len(sys.argv):
+            chunk_size = int(sys.argv[i + 1])
+        elif arg == '--output' and i + 1 < len(sys.argv):
+            output = sys.argv[i + 1]
+        elif arg == '--db' and i + 1 < len(sys.argv):
+            db_name = sys.argv[i + 1]
+
+    if len(sys.argv) < 2 or sys.argv[1].startswith('--'):
+        print("사용법: python ticket_checker.py <티켓 파일(.csv|.npy)> [--type 720] [--db lottery_data.db] "
+              "[--workers N] [--chunk 32768] [--output 결과.csv]")
+        return
+
+    try:
+        jos, numbers = read_tickets(sys.argv[1])
+        if db_name:
+            draws = Draws.from_results_db(db_name)
+        else:
+            draws = Draws.from_data_file(f'lottery_data/pension_lottery_{lottery_type}_all.csv')
+
+        started = time.perf_counter()
+        result = check_tickets(jos, numbers, draws, chunk_size, workers)
+        seconds = time.perf_counter() - started
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ 당첨 조회 실패: {e}")
+        sys.exit(1)
+
+    summary = tier_summary(result)
+    print(f"=== 티켓 {len(jos):,}장 × {len(draws)}개 회차 당첨 조회 ({seconds:.2f}초) ===")
+    for name in reversed(PRIZE_TIERS):
+        print(f"  최고 등급 {name}: {summary['best_tier_tickets'][name]:,}장")
+    print(f"  전체 당첨금 합계: {summary['total_prize']:,}원")
+
+    if output:
+        save_results(output, jos, numbers, result)
+        print(f"티켓별 결과가 {output}에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 조건부 번호 생성기
+- 조(1~5) × 6자리 번호(000000~999999) 전체 티켓 공간을 번호 특성 테이블(길이 10^6 배열)과 조 목록으로 표현
+- 조건마다 번호 공간 전체의 불리언 마스크를 벡터 연산으로 만들고 AND로 결합
+  (값 하나는 ==, 연속 구간은 비교 두 번, 그 외 값 목록은 허용 표 인덱싱)
+- 이미 당첨된 (조, 번호)는 선택적으로 제외하고, 남은 티켓 중에서 균등하게 중복 없이 추출
+
+조건 (값은 "3", "20-35", "1,3,5", "even", "odd" 형식, 문자열 목록은 쉼표로 구분):
+- 번호 특성: odd_count, parity_code, max_consecutive_length, total_consecutive, gap_sequence_code,
+  max_gap, min_gap, gap_sum, digit_sum, repeat_count (feature_tables.FEATURES)
+- parity_pattern: 홀짝 패턴 문자열 (예: "홀짝홀짝홀짝,짝짝짝홀홀홀")
+- p1 ~ p6: 자리별 숫자, jo: 조
+- contains / excludes: 반드시 포함할 / 포함하지 않을 숫자 (동반 출현시킬 숫자 조합)
+- exclude_drawn: 이미 당첨된 (조, 번호) 제외
+
+사용법: python ticket_generator.py --where odd_count=3 --where max_consecutive_length=0-2 --where digit_sum=20-35
+                                  [--exclude-drawn] [--count 10] [--seed N] [--type 720]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from digit_engine import build_digit_matrix, NUM_DIGITS, NUM_JOS, PARITY_PATTERN_STRINGS
+from feature_tables import FeatureTables, FEATURES, NUMBER_SPACE, DEFAULT_TABLE_DIR
+from bitmap_index import parse_values
+from draw_index import DrawIndex, NUMBER_BASE
+
+DEFAULT_COUNT = 10
+
+# 특성 테이블 외의 조건: 설명
+EXTRA_CONSTRAINTS = {
+    'parity_pattern': '홀짝 패턴 문자열',
+    'p1': '1번째 자리 숫자', 'p2': '2번째 자리 숫자', 'p3': '3번째 자리 숫자',
+    'p4': '4번째 자리 숫자', 'p5': '5번째 자리 숫자', 'p6': '6번째 자리 숫자',
+    'jo': '조',
+    'contains': '반드시 포함할 숫자',
+    'excludes': '포함하지 않을 숫자',
+    'exclude_drawn': '이미 당첨된 (조, 번호) 제외'
+}
+CONSTRAINTS = {**{name: label for name, (label, _) in FEATURES.items()}, **EXTRA_CONSTRAINTS}
+
+
+def value_text(value):
+    """조건 값(정수, 목록, 문자열)을 "1,3,5" 형식 문자열로 변환"""
+    if isinstance(value, (list, tuple)):
+        return ','.join(str(item) for item in value)
+    return str(value)
+
+
+def values_mask(table, values):
+    """테이블 값이 values 중 하나인 번호 마스크 (값 하나·연속 구간은 비교, 그 외는 허용 표 인덱싱)"""
+    low, high = values[0], values[-1]
+    if low == high:
+        return table == low
+    if high - low + 1 == len(values):
+        return (table >= low) & (table <= high)
+
+    allowed = np.zeros(high + 1, dtype=bool)
+    allowed[values] = True
+    return np.take(allowed, table, mode='clip') & (table <= high)
+
+
+class TicketGenerator:
+    """조 × 번호 티켓 공간에서 조건을 만족하는 티켓을 균등 추출하는 생성기"""
+
+    def __init__(self, tables=None, drawn_codes=None):
+        self.tables = tables if tables is not None else FeatureTables()
+        # 이미 당첨된 티켓 부호 (조 * 10^6 + 번호, 정렬·중복 제거)
+        self.drawn_codes = np.unique(np.asarray(drawn_codes if drawn_codes is not None else [], dtype=np.int64))
+        self._position_digits = None
+        self._digit_presence = None
+
+    @classmethod
+    def from_dataframe(cls, data, table_dir=DEFAULT_TABLE_DIR):
+        """분석기 데이터프레임(round, jo, first_number)의 당첨번호를 제외 대상으로 하는 생성기"""
+        return cls(FeatureTables(table_dir), DrawIndex.from_dataframe(data).codes)
+
+    @property
+    def position_digits(self):
+        """자리별 숫자 테이블 (6×10^6, 처음 사용할 때 한 번 생성)"""
+        if self._position_digits is None:
+            self._position_digits = np.ascontiguousarray(build_digit_matrix(np.arange(NUMBER_SPACE)).T)
+        return self._position_digits
+
+    @property
+    def digit_presence(self):
+        """번호에 나타나는 숫자 집합 비트마스크 테이블 (숫자 d가 있으면 d번째 비트 1, 길이 10^6)"""
+        if self._digit_presence is None:
+            bits = np.left_shift(np.uint16(1), self.position_digits.astype(np.uint16))
+            self._digit_presence = np.bitwise_or.reduce(bits, axis=0)
+        return self._digit_presence
+
+    def number_mask(self, constraints):
+        """번호(000000~999999) 조건을 모두 만족하는 번호 마스크 (조·당첨 이력 조건은 제외)"""
+        mask = np.ones(NUMBER_SPACE, dtype=bool)
+
+        for name, value in constraints.items():
+            if name in ('jo', 'exclude_drawn'):
+                continue
+            if name not in CONSTRAINTS:
+                raise ValueError(f"알 수 없는 조건입니다: {name} (가능: {', '.join(CONSTRAINTS)})")
+
+            text = value_text(value)
+            if name in FEATURES:
+                table = self.tables[name]
+                mask &= values_mask(table, parse_values(text, int(table.max()) + 1))
+            elif name == 'parity_pattern':
+                patterns = [pattern.strip() for pattern in text.split(',')]
+                unknown = [pattern for pattern in patterns if pattern not in PARITY_PATTERN_STRINGS]
+                if unknown:
+                    raise ValueError(f"홀짝 패턴은 '홀'/'짝' 6글자여야 합니다: {', '.join(unknown)}")
+                codes = sorted(PARITY_PATTERN_STRINGS.index(pattern) for pattern in patterns)
+                mask &= values_mask(self.tables['parity_code'], codes)
+            elif name in ('contains', 'excludes'):
+                bits = np.uint16(sum(1 << digit for digit in parse_values(text, NUM_DIGITS)))
+                present = self.digit_presence & bits
+                mask &= (present == bits) if name == 'contains' else (present == 0)
+            else:
+                position = int(name[1:]) - 1
+                mask &= values_mask(self.position_digits[position], parse_values(text, NUM_DIGITS))
+
+        return mask
+
+    def candidates(self, constraints):
+        """조건을 만족하는 (허용 조 배열, 후보 번호 배열, 제외할 전체 인덱스 배열, 후보 티켓 수)
+
+        후보 티켓은 (조 순번, 번호 순번)을 조 순번 * 번호 수 + 번호 순번으로 나열한 공간이며,
+        exclude_drawn이면 그 공간 안의 당첨 티켓 위치를 정렬하여 함께 반환한다.
+        """
+        jos = np.arange(1, NUM_JOS + 1)
+        if 'jo' in constraints:
+            jos = np.array(parse_values(value_text(constraints['jo']), NUM_JOS + 1))
+            if jos[0] < 1:
+                raise ValueError(f"조는 1~{NUM_JOS} 사이여야 합니다: {constraints['jo']}")
+
+        numbers = np.flatnonzero(self.number_mask(constraints))
+        excluded = np.zeros(0, dtype=np.int64)
+
+        exclude_drawn = str(constraints.get('exclude_drawn', '')).lower() in ('1', 'true', 'yes')
+        if exclude_drawn and len(self.drawn_codes) and len(numbers):
+            drawn_jos, drawn_numbers = np.divmod(self.drawn_codes, NUMBER_BASE)
+            jo_positions = np.searchsorted(jos, drawn_jos)
+            number_positions = np.searchsorted(numbers, drawn_numbers)
+            inside = ((jo_positions < len(jos)) & (jos[np.minimum(jo_positions, len(jos) - 1)] == drawn_jos)
+                      & (number_positions < len(numbers))
+                      & (numbers[np.minimum(number_positions, len(numbers) - 1)] == drawn_numbers))
+            excluded = np.sort(jo_positions[inside] * len(numbers) + number_positions[inside])
+
+        return jos, numbers, excluded, len(jos) * len(numbers) - len(excluded)
+
+    def generate(self, constraints, count=DEFAULT_COUNT, seed=None):
+        """조건을 만족하는 티켓 중 count장을 중복 없이 균등 추출
+
+        후보 공간에서 제외 위치를 뺀 순번을 뽑은 뒤, 각 순번 앞에 있는 제외 위치 수를 더해
+        전체 공간의 위치로 되돌린다 (후보 티켓 배열을 만들지 않음).
+        반환값: {'jos', 'numbers', 'candidates', 'number_candidates', 'seconds'}
+        """
+        started = time.perf_counter()
+        jos, numbers, excluded, total = self.candidates(constraints)
+        count = min(max(int(count), 0), total)
+
+        rng = np.random.default_rng(seed)
+        picks = rng.choice(total, size=count, replace=False) if count else np.zeros(0, dtype=np.int64)
+        positions = picks + np.searchsorted(excluded - np.arange(len(excluded)), picks, side='right')
+        jo_index, number_index = np.divmod(positions, max(len(numbers), 1))
+
+        return {
+            'jos': jos[jo_index],
+            'numbers': numbers[number_index],
+            'candidates': int(total),
+            'number_candidates': len(numbers),
+            'seconds': time.perf_counter() - started
+        }
+
+
+def generated_rows(result):
+    """생성 결과를 티켓 목록으로 변환 (JSON 응답용)"""
+    return [{'jo': int(jo), 'number': f'{int(number):06d}', 'ticket': f'{int(jo)}조{int(number):06d}'}
+            for jo, number in zip(result['jos'], result['numbers'])]
+
+
+def main():
+    """메인 함수"""
+    lottery_type = os.environ.get('LOTTERY_TYPE', '720')
+    constraints = {}
+    count = DEFAULT_COUNT
+    seed = None
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--type' and i + 1 < len(sys.argv):
+            lottery_type = sys.argv[i + 1]
+        elif arg == '--where' and i + 1 < len(sys.argv) and '=' in sys.argv[i + 1]:
+            name, value = sys.argv[i + 1].split('=', 1)
+            constraints[name.strip()] = value.strip()
+        elif arg == '--exclude-drawn':
+            constraints['exclude_drawn'] = 'true'
+        elif arg == '--count' and i + 1 < len(sys.argv):
+            count = int(sys.argv[i + 1])
+        elif arg == '--seed' and i + 1 < len(sys.argv):
+            seed = int(sys.argv[i + 1])
+
+    drawn_codes = None
+    if 'exclude_drawn' in constraints:
+        data_file = f'lottery_data/pension_lottery_{lottery_type}_all.csv'
+        try:
+            data = pd.read_csv(data_file, encoding='utf-8')
+        except FileNotFoundError:
+            print(f"❌ 데이터 파일을 찾을 수 없습니다: {data_file}")
+            sys.exit(1)
+        data['jo'] = pd.to_numeric(data['jo'], errors='coerce')
+        data = data.dropna(subset=['jo'])
+        drawn_codes = DrawIndex.from_dataframe(data).codes
+
+    generator = TicketGenerator(FeatureTables(), drawn_codes)
+    try:
+        result = generator.generate(constraints, count, seed)
+    except ValueError as e:
+        print(f"❌ 번호 생성 실패: {e}")
+        sys.exit(1)
+
+    conditions = ', '.join(f'{name}={value}' for name, value in constraints.items()) or '조건 없음'
+    print(f"=== 조건부 번호 생성 ({conditions}) ===")
+    print(f"후보 티켓 {result['candidates']:,}장 (번호 {result['number_candidates']:,}개 × 조), "
+          f"{result['seconds'] * 1000:.2f}ms")
+    for row in generated_rows(result):
+        print(f"  {row['ticket']}")
+
+
+if __name__ == "__main__":
+    main()
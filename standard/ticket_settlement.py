@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권720+ 판매 티켓 대량 정산 모듈
+- 고정 길이 이진 티켓 파일(레코드: 조 uint8 + 번호 uint32, 5바이트)을 메모리 매핑으로 열기
+- 파일 전체를 읽지 않고 묶음(chunk) 단위로 순서대로 읽어 한 회차의 당첨번호와 비교
+- 등급별 당첨 티켓 수와 당첨금 합계 집계, 처리 속도(티켓/초) 보고
+- 메모리 사용량은 묶음 크기에만 비례하며 파일 크기와 무관
+
+사용법:
+  python ticket_settlement.py <티켓 파일(.bin)> [--db ../basic/lottery_data.db] [--round N] [--chunk 1048576]
+  python ticket_settlement.py --generate <티켓 파일(.bin)> --count 100000000 [--seed 0]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from ticket_checker import (Draws, PRIZE_TIERS, NUM_TIERS, BONUS_TIER, TIER_TABLE,
+                            tier_amounts, trailing_matches)
+
+# 티켓 레코드 (패딩 없는 5바이트, 리틀 엔디언)
+TICKET_DTYPE = np.dtype([('jo', 'u1'), ('number', '<u4')])
+
+DEFAULT_DB = '../basic/lottery_data.db'
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def write_tickets(path, jos, numbers, append=False):
+    """조·번호 배열을 이진 티켓 파일로 저장 (append=True면 파일 끝에 추가)"""
+    records = np.empty(len(jos), dtype=TICKET_DTYPE)
+    records['jo'] = jos
+    records['number'] = numbers
+    with open(path, 'ab' if append else 'wb') as f:
+        records.tofile(f)
+
+
+def generate_ticket_file(path, count, seed=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """임의 티켓 count장의 이진 티켓 파일 생성 (묶음 단위로 기록하여 메모리 사용량 일정)"""
+    rng = np.random.default_rng(seed)
+    open(path, 'wb').close()
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        write_tickets(path, rng.integers(1, 6, size), rng.integers(0, 10 ** 6, size), append=True)
+
+
+def open_ticket_file(path):
+    """이진 티켓 파일을 읽기 전용 메모리 매핑 레코드 배열로 열기"""
+    size = os.path.getsize(path)
+    if size % TICKET_DTYPE.itemsize:
+        raise ValueError(f"티켓 파일 크기({size:,}바이트)가 레코드 크기({TICKET_DTYPE.itemsize}바이트)의 배수가 아닙니다.")
+    if size == 0:
+        return np.zeros(0, dtype=TICKET_DTYPE)
+    return np.memmap(path, dtype=TICKET_DTYPE, mode='r')
+
+
+def load_round(db_name, round_number=None):
+    """lottery_results에서 정산할 회차 하나 (round_number가 없으면 최신 회차)"""
+    if not os.path.exists(db_name):
+        raise FileNotFoundError(f"데이터베이스 파일이 없습니다: {db_name}")
+    draws = Draws.from_results_db(db_name, round_number)
+    if len(draws) == 0:
+        target = f"{round_number}회" if round_number is not None else "정산할"
+        raise ValueError(f"{target} 당첨번호가 없습니다.")
+
+    index = len(draws) - 1
+    bonus = None
+    if draws.bonus_order is not None:
+        # 보너스 번호는 정렬된 배열에 있으므로 해당 회차 위치를 찾아 꺼낸다
+        found = np.flatnonzero(draws.bonus_order == index)
+        bonus = int(draws.bonus_codes[found[0]]) if len(found) else None
+
+    return {
+        'round': int(draws.rounds[index]),
+        'jo': int(draws.jos[index]),
+        'number': int(draws.codes[index]),
+        'bonus': bonus
+    }
+
+
+def settle_chunk(jos, numbers, draw):
+    """티켓 묶음 하나의 (등급별 티켓 수, 잘못된 레코드 수)
+
+    조가 1~5가 아니거나 번호가 999999를 넘는 레코드는 정산하지 않고 따로 센다.
+    """
+    jos = np.asarray(jos)
+    numbers = np.asarray(numbers)
+    valid = (jos >= 1) & (jos <= 5) & (numbers < 10 ** 6)
+    num_invalid = len(valid) - int(np.count_nonzero(valid))
+    if num_invalid:
+        jos, numbers = jos[valid], numbers[valid]
+
+    numbers = numbers.astype(np.int32)
+    matched = trailing_matches(numbers, np.int32(draw['number']))
+    tiers = TIER_TABLE[(jos == draw['jo']).view(np.int8), matched]
+
+    # 보너스: 6자리 일치 (1등·2등은 이미 더 높은 등급)
+    if draw['bonus'] is not None:
+        np.maximum(tiers, np.where(numbers == draw['bonus'], np.int8(BONUS_TIER), np.int8(0)), out=tiers)
+
+    return np.bincount(tiers, minlength=NUM_TIERS), num_invalid
+
+
+def settle_tickets(tickets, draw, chunk_size=DEFAULT_CHUNK_SIZE):
+    """티켓 레코드 배열(메모리 매핑 가능)을 묶음 단위로 정산
+
+    반환값: {'tier_counts', 'payouts', 'total_tickets', 'invalid_tickets', 'seconds', 'tickets_per_second'}
+    """
+    tier_counts = np.zeros(NUM_TIERS, dtype=np.int64)
+    invalid = 0
+
+    started = time.perf_counter()
+    for start in range(0, len(tickets), chunk_size):
+        chunk = tickets[start:start + chunk_size]
+        counts, num_invalid = settle_chunk(chunk['jo'], chunk['number'], draw)
+        tier_counts += counts
+        invalid += num_invalid
+    seconds = time.perf_counter() - started
+
+    return {
+        'tier_counts': tier_counts,
+        'payouts': tier_counts * tier_amounts(),
+        'total_tickets': len(tickets),
+        'invalid_tickets': invalid,
+        'seconds': seconds,
+        'tickets_per_second': len(tickets) / seconds if seconds > 0 else 0.0
+    }
+
+
+def settlement_summary(result, draw):
+    """정산 결과 요약 (등급별 티켓 수와 당첨금)"""
+    return {
+        'round': draw['round'],
+        'winning_number': f"{draw['jo']}조{draw['number']:06d}",
+        'bonus_number': f"{draw['bonus']:06d}" if draw['bonus'] is not None else None,
+        'total_tickets': int(result['total_tickets']),
+        'invalid_tickets': int(result['invalid_tickets']),
+        'tiers': {name: {'tickets': int(result['tier_counts'][code]), 'payout': int(result['payouts'][code])}
+                  for code, name in enumerate(PRIZE_TIERS)},
+        'total_payout': int(result['payouts'].sum()),
+        'tickets_per_second': round(result['tickets_per_second'])
+    }
+
+
+def main():
+    """메인 함수"""
+    db_name = DEFAULT_DB
+    round_number = None
+    chunk_size = DEFAULT_CHUNK_SIZE
+    count = None
+    seed = 0
+    generate = None
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--db' and i + 1 < len(sys.argv):
+            db_name = sys.argv[i + 1]
+        elif arg == '--round' and i + 1 < len(sys.argv):
+            round_number = int(sys.argv[i + 1])
+        elif arg == '--chunk' and i + 1 < len(sys.argv):
+            chunk_size = int(sys.argv[i + 1])
+        elif arg == '--generate' and i + 1 < len(sys.argv):
+            generate = sys.argv[i + 1]
+        elif arg == '--count' and i + 1 < len(sys.argv):
+            count = int(sys.argv[i + 1])
+        elif arg == '--seed' and i + 1 < len(sys.argv):
+            seed = int(sys.argv[i + 1])
+
+    if generate:
+        if count is None:
+            print("사용법: python ticket_settlement.py --generate <티켓 파일(.bin)> --count N [--seed 0]")
+            return
+        generate_ticket_file(generate, count, seed, chunk_size)
+        print(f"임의 티켓 {count:,}장을 {generate}에 저장했습니다. ({os.path.getsize(generate):,}바이트)")
+        return
+
+    if len(sys.argv) < 2 or sys.argv[1].startswith('--'):
+        print("사용법: python ticket_settlement.py <티켓 파일(.bin)> [--db ../basic/lottery_data.db] "
+              "[--round N] [--chunk 1048576]")
+        return
+
+    try:
+        draw = load_round(db_name, round_number)
+        tickets = open_ticket_file(sys.argv[1])
+        result = settle_tickets(tickets, draw, chunk_size)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ 정산 실패: {e}")
+        sys.exit(1)
+
+    summary = settlement_summary(result, draw)
+    bonus = f", 보너스 {summary['bonus_number']}" if summary['bonus_number'] else ""
+    print(f"=== {summary['round']}회 정산 (1등 {summary['winning_number']}{bonus}) ===")
+    print(f"티켓 {summary['total_tickets']:,}장 ({result['seconds']:.2f}초, {summary['tickets_per_second']:,}장/초)")
+    if summary['invalid_tickets']:
+        print(f"  잘못된 레코드: {summary['invalid_tickets']:,}장 (정산 제외)")
+    for name in reversed(PRIZE_TIERS[1:]):
+        tier = summary['tiers'][name]
+        print(f"  {name}: {tier['tickets']:,}장, {tier['payout']:,}원")
+    print(f"  당첨금 합계: {summary['total_payout']:,}원")
+
+
+if __name__ == "__main__":
+    main()
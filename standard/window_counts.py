@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연금복권 회차 구간 빈도 질의 모듈
+- 자리별 숫자 누적 카운트 C[회차, 자리, 숫자]와 조별 누적 카운트를 한 번만 생성
+- 임의 구간 [start, end)의 빈도를 누적값 차이로 O(1) 계산
+- 트렌드 점수, 조별 트렌드, 핫/콜드 숫자를 임의 구간 크기·오프셋으로 계산
+"""
+
+import numpy as np
+
+from digit_engine import build_digit_matrix, NUM_POSITIONS
+
+
+class RoundWindowCounts:
+    """회차 구간별 자리 숫자·조 빈도를 누적합으로 조회"""
+
+    def __init__(self, digits, jos, rounds):
+        digits = np.asarray(digits, dtype=np.int8)
+        jos = np.asarray(jos, dtype=np.int64)
+
+        self.rounds = np.asarray(rounds, dtype=np.int64)
+        self.num_rounds = len(self.rounds)
+        self.num_jos = max(6, int(jos.max(initial=0)) + 1)
+
+        # position_cumsum[t]는 앞에서부터 t개 회차의 자리별 숫자 빈도 (6×10)
+        self.position_cumsum = np.zeros((self.num_rounds + 1, NUM_POSITIONS, 10), dtype=np.int32)
+        np.cumsum(digits[:, :, None] == np.arange(10, dtype=np.int8), axis=0, out=self.position_cumsum[1:])
+
+        self.jo_cumsum = np.zeros((self.num_rounds + 1, self.num_jos), dtype=np.int32)
+        np.cumsum(jos[:, None] == np.arange(self.num_jos), axis=0, out=self.jo_cumsum[1:])
+
+    @classmethod
+    def from_dataframe(cls, data):
+        """분석기 데이터프레임(round, jo, first_number)에서 생성"""
+        return cls(build_digit_matrix(data['first_number']), data['jo'].to_numpy(), data['round'].to_numpy())
+
+    def window_bounds(self, window, offset=0):
+        """최근 offset회차를 건너뛴 직전 window개 회차의 [start, end) 인덱스"""
+        window, offset = int(window), int(offset)
+        if window < 1 or offset < 0:
+            raise ValueError("구간 크기는 1 이상, 오프셋은 0 이상이어야 합니다.")
+
+        end = self.num_rounds - offset
+        start = end - window
+        if start < 0:
+            raise ValueError(f"데이터가 부족합니다: {window + offset}개 회차 필요, {self.num_rounds}개 보유")
+
+        return start, end
+
+    def position_counts(self, start, end):
+        """구간 [start, end)의 자리별 숫자 빈도 (6×10)"""
+        return self.position_cumsum[end] - self.position_cumsum[start]
+
+    def jo_counts(self, start, end):
+        """구간 [start, end)의 조별 빈도"""
+        return self.jo_cumsum[end] - self.jo_cumsum[start]
+
+    def round_range(self, start, end):
+        """구간 [start, end)의 첫 회차와 마지막 회차"""
+        return int(self.rounds[start:end].min()), int(self.rounds[start:end].max())
+
+    def period_label(self, start, end, offset=0):
+        """구간 [start, end)의 표시 문자열 (실제 회차 수와 회차 범위, offset이 있으면 건너뛴 최근 회차 수)"""
+        first_round, last_round = self.round_range(start, end)
+        label = f"{end - start}회차 ({first_round}회 ~ {last_round}회"
+        return f"{label}, 최근 {offset}회차 제외)" if offset else f"최근 {label})"
+
+
+def number_trend_scores(counts, window=30, offset=0):
+    """최근 window회차와 그 이전 window회차의 자리별 숫자 빈도 비율 (트렌드 점수)
+
+    트렌드 점수 = (최근 빈도 / 이전 빈도) * 100, 이전 빈도가 0이면 1로 계산
+    """
+    recent = counts.position_counts(*counts.window_bounds(window, offset)).tolist()
+    previous = counts.position_counts(*counts.window_bounds(window, offset + window)).tolist()
+
+    trend_scores = {}
+    for pos in range(NUM_POSITIONS):
+        trend_scores[f'자리{pos + 1}'] = {}
+        for digit in range(10):
+            previous_count = previous[pos][digit] if previous[pos][digit] > 0 else 1
+            trend_score = (recent[pos][digit] / previous_count) * 100
+            trend_scores[f'자리{pos + 1}'][str(digit)] = round(trend_score, 2)
+
+    return trend_scores
+
+
+def jo_trends(counts, window=50, offset=0, jos=range(1, 6)):
+    """최근 구간 조별 비율과 전체 비율의 차이 (2%p 초과 변화를 상승/하락으로 표시)"""
+    start, end = counts.window_bounds(window, offset)
+    overall = counts.jo_counts(0, counts.num_rounds).tolist()
+    recent = counts.jo_counts(start, end).tolist()
+    recent_total = end - start
+
+    trend_changes = {}
+    for jo in jos:
+        overall_pct = (overall[jo] / counts.num_rounds if overall[jo] else 0) * 100
+        recent_pct = (recent[jo] / recent_total if recent[jo] else 0) * 100
+        change = recent_pct - overall_pct
+
+        trend_changes[jo] = {
+            'overall_percentage': round(overall_pct, 2),
+            'recent_percentage': round(recent_pct, 2),
+            'change': round(change, 2),
+            'trend': 'up' if change > 2 else ('down' if change < -2 else 'stable')
+        }
+
+    return {
+        'trend_period': counts.period_label(start, end, offset),
+        'jo_trends': trend_changes
+    }
+
+
+def hot_cold_digits(counts, window=20, offset=0, top=5):
+    """구간 내 자리별 핫(최다 출현)/콜드(미출현) 숫자"""
+    start, end = counts.window_bounds(window, offset)
+    window_counts = counts.position_counts(start, end)
+    overall_counts = counts.position_counts(0, counts.num_rounds)
+
+    result = {}
+    for pos in range(NUM_POSITIONS):
+        # 빈도 내림차순, 같은 빈도는 작은 숫자 우선
+        order = np.argsort(-window_counts[pos], kind='stable')
+        result[f'자리{pos + 1}'] = {
+            'hot': [int(d) for d in order[:top] if window_counts[pos][d] > 0],
+            'cold': np.flatnonzero(window_counts[pos] == 0).tolist(),
+            'window_frequency': {str(d): int(c) for d, c in enumerate(window_counts[pos])},
+            'overall_frequency': {str(d): int(c) for d, c in enumerate(overall_counts[pos])}
+        }
+
+    return {
+        'period': counts.period_label(start, end, offset),
+        'positions': result
+    }